@@ -9,7 +9,10 @@ import time
 import threading
 from datetime import datetime
 from ..modules.speech_utils import speak
-from ..modules.web_search import search_web
+from ..modules.web_search import search_web, prefetch_summary
+from ..modules.http_client import Prefetch
+from ..modules.weather import get_weather_service
+from ..modules.news import get_news_service
 
 class AdvancedFeatures:
     def __init__(self):
@@ -43,6 +46,34 @@ class AdvancedFeatures:
         self.media_process = None
         self.media_thread = None
         self.is_playing = False
+        
+        # Media file lists scanned ahead of time (see scan_media_library)
+        self.media_scan = {}
+    
+    def _find_media_files(self, directory, extensions):
+        """List media files in a directory with the given extensions"""
+        files = []
+        for ext in extensions:
+            files.extend(glob.glob(os.path.join(directory, f"*{ext}")))
+        return files
+    
+    def scan_media_library(self, kind):
+        """Scan the audio or video library ahead of a play command, returning the file list"""
+        files = None
+        if kind == 'audio':
+            files = self.media_scan['audio'] = self._find_media_files(self.audio_dir, self.audio_extensions)
+        elif kind == 'video':
+            files = self.media_scan['video'] = self._find_media_files(self.video_dir, self.video_extensions)
+        return files
+    
+    def discard_media_scan(self, kind, files=None):
+        """Drop the audio or video list scanned ahead of time
+        
+        With files given, the list is only dropped if it is still that scan,
+        so a newer scan of the same kind survives.
+        """
+        if files is None or self.media_scan.get(kind) is files:
+            self.media_scan.pop(kind, None)
     
     def _is_media_player_running(self):
         """Check if any known media player is running"""
@@ -540,10 +571,10 @@ class AdvancedFeatures:
             # Clean up any existing playlist before creating a new one
             self._cleanup_playlist()
             
-            # Get all audio files
-            audio_files = []
-            for ext in self.audio_extensions:
-                audio_files.extend(glob.glob(os.path.join(self.audio_dir, f"*{ext}")))
+            # Get all audio files, using a pre-scan if one is waiting
+            audio_files = self.media_scan.pop('audio', None)
+            if audio_files is None:
+                audio_files = self._find_media_files(self.audio_dir, self.audio_extensions)
             
             if not audio_files:
                 speak("No audio files found in the audio directory. Please add some audio files to the media/audio folder.")
@@ -586,10 +617,10 @@ class AdvancedFeatures:
             # Clean up any existing playlist before creating a new one
             self._cleanup_playlist()
             
-            # Get all video files
-            video_files = []
-            for ext in self.video_extensions:
-                video_files.extend(glob.glob(os.path.join(self.video_dir, f"*{ext}")))
+            # Get all video files, using a pre-scan if one is waiting
+            video_files = self.media_scan.pop('video', None)
+            if video_files is None:
+                video_files = self._find_media_files(self.video_dir, self.video_extensions)
             
             if not video_files:
                 speak("No video files found in the video directory. Please add some video files to the media/video folder.")
@@ -715,23 +746,53 @@ class AdvancedFeatures:
         speak(info)
         return info
     
-    def get_weather_info(self, city):
-        """Get weather information using web search"""
+    def prefetch_weather(self, city):
+        """Start fetching the weather for a city in the background"""
+        service = get_weather_service()
+        if service is None:
+            return prefetch_summary(f"weather in {city} today")
+        return Prefetch(f"Weather '{city}'", service.get_forecast, city)
+    
+    def get_weather_info(self, city, prefetch=None):
+        """Get weather information from the weather provider, or web search if it fails"""
         try:
             search_query = f"weather in {city} today"
-            speak(f"Searching for weather information in {city}")
-            return search_web(search_query, speak_result=True)
+            service = get_weather_service()
+            # A cached forecast is answered at once, without an acknowledgement
+            if service is None or not service.is_cached(city):
+                # Fetch while the acknowledgement is spoken
+                prefetch = prefetch or self.prefetch_weather(city)
+                speak(f"Searching for weather information in {city}")
+            if service is not None:
+                forecast = prefetch.result() if prefetch else service.get_forecast(city)
+                if forecast:
+                    speak(forecast.summary())
+                    return True
+                prefetch = None  # the provider failed, fall back to the search page
+            return search_web(search_query, speak_result=True, summary=prefetch)
         except Exception as e:
             print(f"Error getting weather info: {e}")
             speak("Sorry, I couldn't get the weather information.")
             return False
     
-    def get_news(self):
-        """Get news using web search"""
+    def prefetch_news(self):
+        """Start refreshing the news headlines in the background (a no-op when they are fresh)"""
+        return Prefetch("News", get_news_service().refresh_if_stale)
+    
+    def get_news(self, prefetch=None):
+        """Read out the latest headlines from the news feeds, or web search if there are none"""
         try:
-            search_query = "latest news headlines today"
-            speak("Searching for the latest news")
-            return search_web(search_query, speak_result=True)
+            service = get_news_service()
+            # Fresh headlines are answered from memory at once
+            if service.is_stale():
+                prefetch = prefetch or self.prefetch_news()
+                speak("Searching for the latest news")
+                prefetch.result()
+            summary = service.summary()
+            if summary:
+                speak(summary)
+                return True
+            return search_web("latest news headlines today", speak_result=True)
         except Exception as e:
             print(f"Error getting news: {e}")
             speak("Sorry, I couldn't get the latest news.")
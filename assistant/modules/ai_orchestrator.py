@@ -4,17 +4,24 @@ AI Orchestrator for managing all AI features seamlessly
 import threading
 from queue import Queue
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable
 from .huggingface_utils import HuggingFaceHelper
 from .nlp_learning import CommandLearner
+from .response_policy import ResponsePolicy
+from .conversation_context import ConversationContext
+from .speculation import Speculator
 
 logger = logging.getLogger(__name__)
 
+# Categories whose handlers speak their own results, so no response line is used
+SELF_SPOKEN_CATEGORIES = ["web_search", "info_request", "youtube"]
+
 class AIOrchestrator:
     def __init__(self):
         """Initialize AI components with background processing"""
         self.hf_helper = HuggingFaceHelper()
         self.command_learner = CommandLearner()
+        self.response_policy = ResponsePolicy(self.hf_helper)
         
         # Queue for background processing
         self.ai_queue = Queue()
@@ -24,9 +31,17 @@ class AIOrchestrator:
         self.bg_thread = threading.Thread(target=self._process_ai_queue, daemon=True)
         self.bg_thread.start()
         
-        # Context memory for better conversation flow
-        self.context_memory = []
+        # Context memory for better conversation flow, bounded by GPT-2 tokens
         self.max_context_items = 5
+        self.max_context_tokens = 256
+        self.context_memory = ConversationContext(
+            max_items=self.max_context_items,
+            max_tokens=self.max_context_tokens,
+            tokenizer=self.hf_helper.text_generator.tokenizer
+        )
+        
+        # Speculative pre-warming driven by interim speech transcripts
+        self.speculator = Speculator(self.command_learner.predict_category)
     
     def _process_ai_queue(self):
         """Background thread for processing AI tasks"""
@@ -58,16 +73,44 @@ class AIOrchestrator:
     
     def add_to_context(self, item: Dict[str, Any]):
         """Add item to context memory"""
-        self.context_memory.append(item)
-        if len(self.context_memory) > self.max_context_items:
-            self.context_memory.pop(0)
+        self.context_memory.add(item["user"], item.get("assistant"))
     
     def get_context(self) -> str:
-        """Get formatted context string"""
-        return "\n".join([
-            f"User: {item['user']}\nAssistant: {item['assistant']}"
-            for item in self.context_memory
-        ])
+        """Get formatted context string (cached, not rebuilt per call)"""
+        return self.context_memory.render()
+    
+    def register_prewarm(self, category: str, warm: Callable[[], Any],
+                         discard: Optional[Callable[[Any], Any]] = None):
+        """Register work to start early when a partial command looks like category
+        
+        discard is called with the result of warm if the final command turns
+        out to be something else (see Speculator.register).
+        """
+        self.speculator.register(category, warm, discard)
+    
+    def begin_utterance(self):
+        """Accept interim transcripts for speculation again (call before recognizing speech)"""
+        self.speculator.begin_utterance()
+    
+    def speculate(self, partial_command: str):
+        """Classify an interim transcript and pre-warm the likely action"""
+        self.speculator.speculate(partial_command)
+    
+    def commit_speculation(self, category: str) -> bool:
+        """Settle the current speculation against the final command category
+        
+        Returns:
+            Whether the speculation hit
+        """
+        return self.speculator.commit(category)
+    
+    def action_started(self) -> Optional[float]:
+        """Record the current turn's latency from final command to action, by speculation outcome"""
+        return self.speculator.action_started()
+    
+    def get_speculation_stats(self) -> Dict[str, Any]:
+        """Get hit rate and the turn latency saved by speculation"""
+        return self.speculator.get_stats()
     
     def preprocess_command(self, command: str) -> Dict[str, Any]:
         """Preprocess command with sentiment and intent analysis"""
@@ -81,10 +124,15 @@ class AIOrchestrator:
         # Add command to context
         self.add_to_context({"user": command, "assistant": None})
         
+        # Reuse the speculative classification when the final text matches it
+        category = self.speculator.predicted_category(command)
+        if category is None:
+            category = self.command_learner.predict_category(command)
+        
         # Return immediate basic analysis
         return {
             "command": command,
-            "category": self.command_learner.predict_category(command),
+            "category": category,
             "context": self.get_context()
         }
     
@@ -100,8 +148,42 @@ class AIOrchestrator:
         # Return immediate response while background processing continues
         return self.hf_helper.generate_response(prompt, max_length=50)
     
+    def begin_turn(self):
+        """Start the response latency budget and turn timing for a new command"""
+        self.response_policy.begin_turn()
+        self.speculator.begin_turn()
+    
+    def respond(self, command: str, category: str, context: Optional[ConversationContext] = None,
+                stream: bool = False):
+        """Get a response line, from a template or generated within the turn budget
+        
+        Generation continues the cached token ids of context (usually
+        self.context_memory) instead of re-tokenizing the conversation.
+        With stream=True generated text comes back as an iterator of chunks
+        for speech_utils.speak_stream.
+        """
+        return self.response_policy.respond(command, category, context, stream=stream)
+    
+    def _record_reply(self, command: str, reply: str):
+        """Write the reply to a command back to the context, if the command is its newest turn"""
+        items = self.context_memory.items()
+        if reply and items and items[-1]["user"] == command and items[-1]["assistant"] is None:
+            self.context_memory.update_last(reply)
+    
+    def _record_streamed_reply(self, command: str, chunks):
+        """Pass streamed chunks through, recording the whole reply once they are spoken"""
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        self._record_reply(command, "".join(parts).strip())
+    
     def answer_question(self, question: str, context: Optional[str] = None) -> Dict[str, Any]:
-        """Answer questions using context"""
+        """Answer questions using context
+        
+        The QA model has its own tokenizer, so it is given the rendered text
+        rather than the GPT-2 token ids cached by the context.
+        """
         if not context:
             context = self.get_context()
             
@@ -117,8 +199,15 @@ class AIOrchestrator:
         # Get sentiment to adjust response style
         sentiment = self.hf_helper.analyze_sentiment(command)
         
-        # Generate natural response
-        response = self.generate_response(command)
+        # Template response, or text streamed from the generator if the turn budget allows
+        # (not asked for when the handler speaks for itself, so the path counts stay honest)
+        response = None
+        if category not in SELF_SPOKEN_CATEGORIES:
+            response = self.respond(command, category, self.context_memory, stream=True)
+            if isinstance(response, str):
+                self._record_reply(command, response)
+            else:
+                response = self._record_streamed_reply(command, response)
         
         # Add to learning system
         self.command_learner.add_command(command, category)
@@ -138,6 +227,15 @@ class AIOrchestrator:
             self.ai_queue.put(None)
             self.bg_thread.join(timeout=1)
             
+            stats = self.get_speculation_stats()
+            if stats["hits"] or stats["misses"]:
+                saved = f"{stats['saved_ms']:.0f} ms" if stats["saved_ms"] is not None else "not yet measurable"
+                logger.info(
+                    f"Speculation: {stats['hits']} hits ({stats['late']} late), {stats['misses']} misses, "
+                    f"turn latency saved per hit: {saved}"
+                )
+            logger.info(f"Response paths: {self.response_policy.get_stats()}")
+            
             # Clear caches
             self.results_cache.clear()
             self.context_memory.clear()
@@ -0,0 +1,146 @@
+"""
+Speech recognition backends: Google Web Speech (online) and local CPU engines
+"""
+import os
+import re
+import json
+import logging
+import speech_recognition as sr
+
+logger = logging.getLogger(__name__)
+
+# Default locations of locally stored models
+VOSK_MODEL_PATH = os.path.join("models", "vosk-model-small-en-in-0.4")
+WHISPER_MODEL = "tiny.en"  # Name or local directory of a faster-whisper model
+
+
+class ASRBackend:
+    """Turns captured audio into text
+
+    Subclasses implement transcribe(). Both the final and interim recognitions
+    of the capture session go through the selected backend.
+    """
+
+    name = "base"
+
+    def transcribe(self, audio: sr.AudioData):
+        """Return the lower-cased transcript of audio, or None if nothing was understood
+
+        Raises:
+            sr.RequestError: If the backend itself is unavailable
+        """
+        raise NotImplementedError
+
+
+class GoogleBackend(ASRBackend):
+    """Google Web Speech API via speech_recognition (network round trip per call)"""
+
+    name = "google"
+
+    def __init__(self, language="en-IN"):
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, audio):
+        try:
+            text = self.recognizer.recognize_google(audio, language=self.language, show_all=False)
+        except sr.UnknownValueError:
+            return None
+        return text.lower() if text else None
+
+
+class VoskBackend(ASRBackend):
+    """Offline recognition with a local Vosk (Kaldi) model"""
+
+    name = "vosk"
+
+    def __init__(self, model_path=VOSK_MODEL_PATH, sample_rate=16000):
+        try:
+            import vosk
+        except ImportError:
+            raise sr.RequestError("vosk is not installed; run 'pip install vosk'")
+        if not os.path.isdir(model_path):
+            raise sr.RequestError(f"Vosk model not found at {model_path}")
+        vosk.SetLogLevel(-1)
+        self.vosk = vosk
+        self.model = vosk.Model(model_path)
+        self.sample_rate = sample_rate
+
+    def transcribe(self, audio):
+        recognizer = self.vosk.KaldiRecognizer(self.model, self.sample_rate)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2))
+        text = json.loads(recognizer.FinalResult()).get("text", "")
+        return text.lower() if text else None
+
+
+class WhisperBackend(ASRBackend):
+    """Offline recognition with a small Whisper model on the CPU (faster-whisper)"""
+
+    name = "whisper"
+
+    def __init__(self, model=WHISPER_MODEL, language="en"):
+        try:
+            from faster_whisper import WhisperModel
+            import numpy as np
+        except ImportError:
+            raise sr.RequestError("faster-whisper is not installed; run 'pip install faster-whisper'")
+        self.np = np
+        self.model = WhisperModel(model, device="cpu", compute_type="int8")
+        self.language = language
+
+    def transcribe(self, audio):
+        # Whisper expects 16 kHz mono float32 samples in [-1, 1]
+        raw = audio.get_raw_data(convert_rate=16000, convert_width=2)
+        samples = self.np.frombuffer(raw, dtype=self.np.int16).astype(self.np.float32) / 32768.0
+        segments, _ = self.model.transcribe(samples, language=self.language, beam_size=1)
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        return text.lower() if text else None
+
+
+ASR_BACKENDS = {
+    GoogleBackend.name: GoogleBackend,
+    VoskBackend.name: VoskBackend,
+    WhisperBackend.name: WhisperBackend,
+}
+
+
+def create_backend(name, fallback="google", **kwargs):
+    """Create the backend called name, falling back if it cannot be loaded
+
+    Args:
+        name: Key in ASR_BACKENDS
+        fallback: Backend to use instead when name is unavailable (None to raise)
+        **kwargs: Passed to the backend constructor
+    """
+    try:
+        return ASR_BACKENDS[name](**kwargs)
+    except (KeyError, sr.RequestError) as e:
+        if not fallback or fallback == name:
+            raise
+        logger.warning(f"ASR backend '{name}' unavailable ({e}), using '{fallback}'")
+        return ASR_BACKENDS[fallback]()
+
+
+def _normalize_words(text):
+    """Lower-case words with punctuation removed"""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference, hypothesis):
+    """Word error rate of hypothesis against reference (edit distance / reference words)"""
+    ref = _normalize_words(reference)
+    hyp = _normalize_words(hypothesis or "")
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,  # deletion
+                current[j - 1] + 1,  # insertion
+                previous[j - 1] + (ref_word != hyp_word)  # substitution
+            )
+        previous = current
+    return previous[-1] / len(ref)
@@ -0,0 +1,404 @@
+"""
+Long-lived audio capture session for speech recognition
+"""
+import math
+import queue
+import audioop
+import logging
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import speech_recognition as sr
+from .vad import FrameRingBuffer, Endpointer, create_detector
+from .audio_sources import create_source
+
+logger = logging.getLogger(__name__)
+
+# Lowest energy threshold background calibration may settle on
+MIN_ENERGY_THRESHOLD = 50
+
+# During playback, the level of our own voice in the microphone is taken from
+# audio heard at least this long ago, so a user's onset never raises the bar
+# it is compared against
+PLAYBACK_LEVEL_LAG = 0.3  # seconds
+# Once playback gets quieter, the tracked level halves over this many seconds
+PLAYBACK_LEVEL_HALF_LIFE = 1.0
+
+# Interim recognitions run off the capture thread, one at a time
+_partial_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="partial-asr")
+
+def create_recognizer():
+    """Create a recognizer tuned for the assistant"""
+    recognizer = sr.Recognizer()
+    recognizer.energy_threshold = 250  # Lower threshold for softer speech
+    recognizer.dynamic_energy_threshold = True
+    recognizer.pause_threshold = 0.6  # Slightly longer pause for Indian English rhythm
+    recognizer.operation_timeout = None
+    return recognizer
+
+def _publish_partial(transcribe, audio, on_partial):
+    """Recognize the audio captured so far and hand the interim text to the callback"""
+    try:
+        text = transcribe(audio)
+        if text:
+            on_partial(text)
+    except (sr.UnknownValueError, sr.RequestError):
+        pass
+    except Exception as e:
+        logger.error(f"Error publishing partial transcript: {e}")
+
+class CaptureSession:
+    """Keeps an audio source open and hands each utterance to recognition
+
+    A background thread reads the source continuously. Frames quieter than the
+    current energy threshold are treated as silence and used to recalibrate the
+    threshold, so no per-turn ambient noise adjustment is needed. Any entered
+    speech_recognition AudioSource works, including sr.AudioFile for tests.
+
+    With a voice activity detector (vad="webrtc" or "spectral") utterances are
+    endpointed on fixed-size frames by an adaptive Endpointer instead of the
+    energy threshold and pause_threshold.
+
+    For barge-in, playback_active reports whether the assistant is speaking.
+    While it does, the peak level of the microphone signal is tracked as the
+    level of our own voice coming back from the speakers. Speech that starts
+    during playback must be barge_in_ratio times louder than both that level
+    and the energy threshold, and calls on_barge_in, which should cut the
+    playback off. There is no echo reference: the level is only known once
+    playback has been heard for PLAYBACK_LEVEL_LAG seconds, and loud playback
+    can still pass for the user, so barge-in is only safe with headphones or
+    acoustic echo cancellation.
+    """
+
+    def __init__(self, source=None, recognizer=None, partial_interval=1.0, transcribe=None, vad=None,
+                 playback_active=None, on_barge_in=None, barge_in_ratio=3.0):
+        self.source = source if source is not None else create_source()
+        self.recognizer = recognizer or create_recognizer()
+        self.partial_interval = partial_interval
+        self.vad_name = vad
+        self.endpointer = None
+        self.framer = None
+        self.playback_active = playback_active
+        self.on_barge_in = on_barge_in
+        self.barge_in_ratio = barge_in_ratio
+        self.playback_level = 0.0
+        self.playback_recent = collections.deque()
+
+        # Seconds of audio consumed by listen(), i.e. the stream position
+        self.position = 0.0
+
+        # Used for interim transcripts: AudioData -> text or None
+        self.transcribe = transcribe or self._transcribe_google
+
+        self.frames = queue.Queue()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.ended = False
+
+    def open(self, calibration_duration=0.5):
+        """Open the source, calibrate once and start background capture"""
+        if self.thread:
+            return self
+        self.source.__enter__()
+        self.seconds_per_buffer = float(self.source.CHUNK) / self.source.SAMPLE_RATE
+        if self.vad_name:
+            detector = create_detector(self.vad_name, self.source.SAMPLE_RATE)
+            self.framer = FrameRingBuffer(
+                self.source.SAMPLE_RATE, self.source.SAMPLE_WIDTH,
+                history_ms=int(self.recognizer.non_speaking_duration * 1000)
+            )
+            self.endpointer = Endpointer(detector, frame_seconds=self.framer.frame_seconds)
+        if calibration_duration:
+            self.recognizer.adjust_for_ambient_noise(self.source, duration=calibration_duration)
+
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._capture_loop, name="audio-capture", daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        """Stop background capture and release the source"""
+        if not self.thread:
+            return
+        self.stopped.set()
+        self.thread.join(timeout=1)
+        self.thread = None
+        try:
+            self.source.__exit__(None, None, None)
+        except Exception as e:
+            logger.error(f"Error closing audio source: {e}")
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _transcribe_google(self, audio):
+        """Default interim recognizer: Google Web Speech"""
+        text = self.recognizer.recognize_google(audio, language="en-IN", show_all=False)
+        return text.lower() if text else None
+
+    def _recalibrate(self, energy):
+        """Move the energy threshold towards the level of a silence frame"""
+        recognizer = self.recognizer
+        if not recognizer.dynamic_energy_threshold:
+            return
+        # Same asymmetric weighted average as Recognizer.listen
+        damping = recognizer.dynamic_energy_adjustment_damping ** self.seconds_per_buffer
+        target_energy = energy * recognizer.dynamic_energy_ratio
+        threshold = recognizer.energy_threshold * damping + target_energy * (1 - damping)
+        recognizer.energy_threshold = max(MIN_ENERGY_THRESHOLD, threshold)
+
+    def _capture_loop(self):
+        """Read frames from the source until closed or the stream ends"""
+        try:
+            while not self.stopped.is_set():
+                buffer = self.source.stream.read(self.source.CHUNK)
+                if len(buffer) == 0:
+                    break
+                energy = audioop.rms(buffer, self.source.SAMPLE_WIDTH)
+                if energy <= self.recognizer.energy_threshold:
+                    self._recalibrate(energy)
+                self.frames.put((buffer, energy))
+        except Exception as e:
+            logger.error(f"Error capturing audio: {e}")
+        finally:
+            self.frames.put(None)
+
+    def _next_frame(self):
+        """Next captured (buffer, energy) pair, or None once the stream has ended"""
+        if self.ended:
+            return None
+        item = self.frames.get()
+        if item is None:
+            self.ended = True
+        else:
+            self.position += self.seconds_per_buffer
+        return item
+
+    def flush(self):
+        """Drop audio captured while nobody was listening (e.g. our own speech)"""
+        while True:
+            try:
+                item = self.frames.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.ended = True
+                break
+            self.position += self.seconds_per_buffer
+        # Frames already cut for the VAD are just as stale
+        if self.framer:
+            self.position += len(self.framer.ready) * self.framer.frame_seconds
+            self.framer.clear()
+
+    def _next_vad_frame(self):
+        """Next fixed-size frame for the VAD, or None once the stream has ended"""
+        while True:
+            frame = self.framer.pop()
+            if frame is not None:
+                return frame
+            if self.ended:
+                return None
+            item = self.frames.get()
+            if item is None:
+                self.ended = True
+                continue
+            self.framer.push(item[0])
+
+    def wait_for_wake_word(self, spotter, timeout=None, hangover=0.5, pre_roll=0.3):
+        """Block until the keyword spotter fires, keeping CPU use minimal while idle
+
+        The spotter only sees audio around chunks louder than the energy
+        threshold (plus pre_roll seconds before and hangover seconds after);
+        silence costs nothing beyond the capture thread itself.
+
+        Args:
+            spotter: KeywordSpotter (see wake_word.py)
+            timeout: Seconds of audio to wait before giving up
+
+        Returns:
+            True when the wake word was heard, False on timeout or end of stream
+        """
+        framer = FrameRingBuffer(self.source.SAMPLE_RATE, self.source.SAMPLE_WIDTH, frame_ms=spotter.frame_ms)
+        quiet_chunks = collections.deque(maxlen=max(1, int(math.ceil(pre_roll / self.seconds_per_buffer))))
+        hangover_count = int(math.ceil(hangover / self.seconds_per_buffer))
+        open_for = 0
+        waited = 0.0
+        self.spotted_frames = 0
+        while True:
+            item = self._next_frame()
+            if item is None:
+                return False
+            buffer, energy = item
+            waited += self.seconds_per_buffer
+            if timeout and waited > timeout:
+                return False
+
+            if energy > self.recognizer.energy_threshold:
+                if not open_for:
+                    # Gate opens: let the spotter hear the lead-in as well
+                    for chunk in quiet_chunks:
+                        framer.push(chunk)
+                    quiet_chunks.clear()
+                open_for = hangover_count
+            elif open_for:
+                open_for -= 1
+                if not open_for:
+                    # Back to silence: drop the spotter's partial state
+                    framer.clear()
+                    spotter.reset()
+            else:
+                quiet_chunks.append(buffer)
+                continue
+
+            framer.push(buffer)
+            while True:
+                frame = framer.pop()
+                if frame is None:
+                    break
+                self.spotted_frames += 1
+                if spotter.process(frame):
+                    spotter.reset()
+                    return True
+
+    def _audio(self, frames):
+        """Wrap captured frames as AudioData"""
+        return sr.AudioData(b"".join(frames), self.source.SAMPLE_RATE, self.source.SAMPLE_WIDTH)
+
+    def _hear_playback(self, energy, seconds):
+        """Track the level of our own playback in a frame heard while waiting for speech"""
+        if not (self.playback_active and self.playback_active()):
+            self.playback_level = 0.0
+            self.playback_recent.clear()
+            return
+        self.playback_recent.append(energy)
+        if len(self.playback_recent) * seconds > PLAYBACK_LEVEL_LAG:
+            decay = 0.5 ** (seconds / PLAYBACK_LEVEL_HALF_LIFE)
+            self.playback_level = max(self.playback_recent.popleft(), self.playback_level * decay)
+
+    def _accept_onset(self, energy):
+        """Whether speech starting at this energy counts, interrupting playback if needed"""
+        if not (self.playback_active and self.playback_active()):
+            return True
+        if energy <= max(self.recognizer.energy_threshold, self.playback_level) * self.barge_in_ratio:
+            return False
+        logger.info("Barge-in: user started speaking during playback")
+        if self.on_barge_in:
+            self.on_barge_in()
+        return True
+
+    def _listen_vad(self, on_partial, timeout):
+        """Record a single phrase endpointed by the voice activity detector"""
+        endpointer = self.endpointer
+        frame_seconds = self.framer.frame_seconds
+        partial_frame_count = int(math.ceil(self.partial_interval / frame_seconds))
+        trailing_frame_count = int(math.ceil(0.2 / frame_seconds))  # silence kept after speech
+        endpointer.reset()
+
+        segment = None
+        waited = 0.0
+        frames_since_partial = 0
+        pending = None
+        while True:
+            frame = self._next_vad_frame()
+            if frame is None:
+                # Stream ended: hand over whatever speech was captured
+                return self._audio(segment) if segment else None
+            self.position += frame_seconds
+            event = endpointer.process(frame)
+
+            if segment is None:
+                energy = audioop.rms(frame, self.source.SAMPLE_WIDTH)
+                self._hear_playback(energy, frame_seconds)
+                if event == "start":
+                    if self._accept_onset(energy):
+                        segment = self.framer.pre_roll()
+                        continue
+                    endpointer.reset()
+                waited += frame_seconds
+                if timeout and waited > timeout:
+                    return None
+                continue
+
+            if event == "discard":
+                segment = None
+                continue
+            segment.append(frame)
+            if event == "end":
+                drop = endpointer.silence_frames - trailing_frame_count
+                return self._audio(segment[:-drop] if drop > 0 else segment)
+
+            frames_since_partial += 1
+            if on_partial and frames_since_partial >= partial_frame_count and (pending is None or pending.done()):
+                frames_since_partial = 0
+                pending = _partial_executor.submit(_publish_partial, self.transcribe, self._audio(segment), on_partial)
+
+    def listen(self, on_partial=None, timeout=None):
+        """Record a single phrase, like Recognizer.listen, from the open stream
+
+        Args:
+            on_partial: Optional callback; every partial_interval seconds of
+                speech the audio heard so far is recognized in the background
+                and the interim text is passed to it
+            timeout: Seconds of audio to wait for the phrase to start
+
+        Returns:
+            sr.AudioData for the phrase, or None if the stream ended or timed out
+        """
+        if self.endpointer:
+            return self._listen_vad(on_partial, timeout)
+
+        recognizer = self.recognizer
+        seconds_per_buffer = self.seconds_per_buffer
+        pause_buffer_count = int(math.ceil(recognizer.pause_threshold / seconds_per_buffer))
+        non_speaking_buffer_count = int(math.ceil(recognizer.non_speaking_duration / seconds_per_buffer))
+        partial_buffer_count = int(math.ceil(self.partial_interval / seconds_per_buffer))
+        timeout_buffer_count = int(math.ceil(timeout / seconds_per_buffer)) if timeout else None
+
+        # Wait for the phrase to start, keeping a little leading audio
+        frames = collections.deque(maxlen=max(1, non_speaking_buffer_count))
+        waited = 0
+        while True:
+            item = self._next_frame()
+            if item is None:
+                return None
+            buffer, energy = item
+            frames.append(buffer)
+            self._hear_playback(energy, seconds_per_buffer)
+            if energy > recognizer.energy_threshold and self._accept_onset(energy):
+                break
+            waited += 1
+            if timeout_buffer_count and waited > timeout_buffer_count:
+                return None
+
+        # Record until enough trailing silence, publishing partials along the way
+        frames = list(frames)
+        pause_count = 0
+        buffers_since_partial = 0
+        pending = None
+        while True:
+            item = self._next_frame()
+            if item is None:
+                break
+            buffer, energy = item
+            frames.append(buffer)
+
+            if energy > recognizer.energy_threshold:
+                pause_count = 0
+            else:
+                pause_count += 1
+            if pause_count > pause_buffer_count:
+                break
+
+            buffers_since_partial += 1
+            if on_partial and buffers_since_partial >= partial_buffer_count and (pending is None or pending.done()):
+                buffers_since_partial = 0
+                snapshot = sr.AudioData(b"".join(frames), self.source.SAMPLE_RATE, self.source.SAMPLE_WIDTH)
+                pending = _partial_executor.submit(_publish_partial, self.transcribe, snapshot, on_partial)
+
+        # Drop the trailing silence, keeping the same padding as Recognizer.listen
+        for _ in range(min(pause_count - non_speaking_buffer_count, len(frames) - 1)):
+            frames.pop()
+        return sr.AudioData(b"".join(frames), self.source.SAMPLE_RATE, self.source.SAMPLE_WIDTH)
@@ -0,0 +1,86 @@
+"""
+Audio sources for the capture session: the live microphone or replayed recordings
+"""
+import time
+import speech_recognition as sr
+
+# Sample rate used for capture throughout the assistant
+SAMPLE_RATE = 16000
+
+
+class _ReplayStream:
+    """Serves PCM data in chunks, paced like a live device"""
+
+    def __init__(self, data, frame_bytes, sample_rate, speed):
+        self.data = data
+        self.frame_bytes = frame_bytes
+        self.sample_rate = sample_rate
+        self.speed = speed
+        self.offset = 0
+        self.started = None
+
+    def read(self, size):
+        """Read up to size frames, waiting until they would have been recorded"""
+        if self.started is None:
+            self.started = time.perf_counter()
+        chunk = self.data[self.offset:self.offset + size * self.frame_bytes]
+        self.offset += len(chunk)
+        if self.speed and chunk:
+            audio_time = self.offset / self.frame_bytes / self.sample_rate
+            delay = self.started + audio_time / self.speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return chunk
+
+    def close(self):
+        pass
+
+
+class WavReplaySource(sr.AudioSource):
+    """Replays a WAV file as if it were a microphone
+
+    The audio is converted to 16-bit mono at sample_rate and handed out in
+    CHUNK-sized reads, so a CaptureSession sees the same framing as with
+    sr.Microphone. No sound card or PyAudio is needed.
+
+    Args:
+        path: WAV (or AIFF/FLAC) file to replay
+        speed: 1.0 for real time, 4.0 for four times faster, 0 for as fast as possible
+    """
+
+    def __init__(self, path, speed=1.0, sample_rate=SAMPLE_RATE, chunk_size=1024):
+        self.path = path
+        self.speed = speed
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = chunk_size
+        self.stream = None
+
+        with sr.AudioFile(path) as source:
+            audio = sr.Recognizer().record(source)
+        self.data = audio.get_raw_data(convert_rate=sample_rate, convert_width=self.SAMPLE_WIDTH)
+
+    @property
+    def duration(self):
+        """Length of the recording in seconds"""
+        return len(self.data) / self.SAMPLE_WIDTH / self.SAMPLE_RATE
+
+    def __enter__(self):
+        self.stream = _ReplayStream(self.data, self.SAMPLE_WIDTH, self.SAMPLE_RATE, self.speed)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+
+def create_source(name="microphone", speed=1.0):
+    """Audio source for the capture session
+
+    Args:
+        name: "microphone" for the default input device, otherwise the path
+            of a recording to replay
+        speed: Replay speed for recordings (see WavReplaySource)
+    """
+    if not name or name == "microphone":
+        return sr.Microphone(sample_rate=SAMPLE_RATE)
+    return WavReplaySource(name, speed=speed)
@@ -0,0 +1,42 @@
+"""
+Keyword-based routing of recognized commands to categories
+"""
+
+def get_command_category(command):
+    """Determine the category of a command based on keywords"""
+    command = command.lower()
+    
+    # News commands (high priority)
+    if any(word in command for word in ["news", "headlines", "latest news"]):
+        return "info_request"
+    
+    # Weather commands (high priority)
+    if "weather" in command:
+        return "info_request"
+    
+    # Screenshot commands
+    if any(word in command for word in ["screenshot", "capture", "take a picture", "screen capture"]):
+        return "screenshot"
+    
+    # Media control commands
+    if any(word in command for word in ["pause", "stop", "next", "previous", "volume", "mute"]):
+        return "media_control"
+    
+    # Video commands
+    if any(word in command for word in ["play video", "watch video", "movie"]):
+        return "video_control"
+    
+    # Audio commands
+    if any(word in command for word in ["play music", "play song", "audio"]):
+        return "audio_control"
+    
+    # System commands
+    if any(word in command for word in ["open", "start", "launch", "close"]):
+        return "system_control"
+    
+    # Information commands
+    if any(word in command for word in ["cpu", "memory", "system"]):
+        return "info_request"
+    
+    # Web search (default fallback)
+    return "web_search"
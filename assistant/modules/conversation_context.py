@@ -0,0 +1,114 @@
+"""
+Conversation context kept as a ring buffer with a pre-rendered prompt prefix
+"""
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+
+class ConversationContext:
+    def __init__(self, max_items: int = 5, max_tokens: int = 256, tokenizer=None):
+        """Keep the last turns of the conversation within an item and token budget
+
+        Args:
+            max_items: Maximum number of turns kept
+            max_tokens: Maximum number of model tokens in the rendered prefix
+            tokenizer: Tokenizer used to count tokens (e.g. the GPT-2 tokenizer);
+                whitespace words are counted when it is None
+        """
+        self.max_items = max_items
+        self.max_tokens = max_tokens
+        self.tokenizer = tokenizer
+
+        # Each entry keeps its rendered text and token ids, computed once
+        self.entries: deque = deque()
+        self.token_count = 0
+
+        # Cached prompt prefix and its token ids, updated on every change
+        self._rendered = ""
+        self._token_ids: List[int] = []
+
+    def _tokenize(self, text: str) -> List[int]:
+        """Token ids for a piece of text"""
+        if self.tokenizer is None:
+            return list(range(len(text.split())))
+        return self.tokenizer.encode(text)
+
+    def _make_entry(self, user: str, assistant: Optional[str]) -> Dict[str, Any]:
+        """Render and tokenize a single turn"""
+        text = f"User: {user}"
+        if assistant is not None:
+            text += f"\nAssistant: {assistant}"
+        # Entries after the first are joined with a newline, which is part of the entry
+        tokens = self._tokenize(("\n" if self.entries else "") + text)
+        return {"user": user, "assistant": assistant, "text": text, "tokens": tokens}
+
+    def _append_entry(self, entry: Dict[str, Any]):
+        """Add an entry to the buffer and the cached prefix"""
+        self._rendered = f"{self._rendered}\n{entry['text']}" if self.entries else entry["text"]
+        self._token_ids.extend(entry["tokens"])
+        self.token_count += len(entry["tokens"])
+        self.entries.append(entry)
+
+    def _pop_oldest(self):
+        """Drop the oldest entry from the buffer and the cached prefix"""
+        entry = self.entries.popleft()
+        self.token_count -= len(entry["tokens"])
+        del self._token_ids[:len(entry["tokens"])]
+        if self.entries:
+            # The next entry now leads: drop its separator newline as well
+            self._rendered = self._rendered[len(entry["text"]) + 1:]
+            following = self.entries[0]
+            following_tokens = self._tokenize(following["text"])
+            self.token_count += len(following_tokens) - len(following["tokens"])
+            self._token_ids[:len(following["tokens"])] = following_tokens
+            following["tokens"] = following_tokens
+        else:
+            self._rendered = ""
+
+    def _enforce_budget(self):
+        """Evict the oldest turns until both budgets are met (keeping the newest)"""
+        while len(self.entries) > self.max_items:
+            self._pop_oldest()
+        while len(self.entries) > 1 and self.token_count > self.max_tokens:
+            self._pop_oldest()
+
+    def add(self, user: str, assistant: Optional[str] = None):
+        """Add a turn to the context"""
+        self._append_entry(self._make_entry(user, assistant))
+        self._enforce_budget()
+
+    def update_last(self, assistant: str):
+        """Fill in the assistant reply of the most recent turn"""
+        if not self.entries:
+            return
+        entry = self.entries.pop()
+        if self.entries:
+            self._rendered = self._rendered[:-(len(entry["text"]) + 1)]
+        else:
+            self._rendered = ""
+        del self._token_ids[len(self._token_ids) - len(entry["tokens"]):]
+        self.token_count -= len(entry["tokens"])
+        self._append_entry(self._make_entry(entry["user"], assistant))
+        self._enforce_budget()
+
+    def render(self) -> str:
+        """The conversation as a prompt prefix"""
+        return self._rendered
+
+    def token_ids(self) -> List[int]:
+        """Token ids of the rendered prefix"""
+        return list(self._token_ids)
+
+    def items(self) -> List[Dict[str, Any]]:
+        """The turns currently kept, oldest first"""
+        return [{"user": e["user"], "assistant": e["assistant"]} for e in self.entries]
+
+    def clear(self):
+        """Forget the whole conversation"""
+        self.entries.clear()
+        self.token_count = 0
+        self._rendered = ""
+        self._token_ids = []
+
+    def __len__(self):
+        return len(self.entries)
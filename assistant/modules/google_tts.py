@@ -0,0 +1,138 @@
+"""
+In-process Google Cloud TTS: one reused client and a persistent audio output stream
+"""
+import io
+import wave
+import logging
+import threading
+from google.cloud import texttospeech
+
+logger = logging.getLogger(__name__)
+
+# Sample rate requested from Google for LINEAR16 audio
+GOOGLE_SAMPLE_RATE = 24000
+
+
+def decode_wav(audio):
+    """Decode WAV bytes in memory into (pcm, sample_rate, sample_width, channels)"""
+    with wave.open(io.BytesIO(audio), "rb") as wav:
+        return wav.readframes(wav.getnframes()), wav.getframerate(), wav.getsampwidth(), wav.getnchannels()
+
+
+class AudioOutput:
+    """Plays PCM through one PyAudio output stream kept open between utterances
+
+    The stream is only reopened when the audio format changes. Playback is
+    written in short blocks so interrupt() can cut it off quickly.
+    """
+
+    def __init__(self, block_seconds=0.1):
+        self.block_seconds = block_seconds
+        self.pyaudio = None
+        self.stream = None
+        self.format = None
+        self.lock = threading.Lock()
+        self.interrupted = threading.Event()
+
+    def _open(self, sample_rate, sample_width, channels):
+        if self.stream is not None and self.format == (sample_rate, sample_width, channels):
+            return
+        if self.pyaudio is None:
+            try:
+                import pyaudio
+            except ImportError:
+                raise RuntimeError("PyAudio is not installed; run 'pip install pyaudio'")
+            self.pyaudio = pyaudio.PyAudio()
+        if self.stream is not None:
+            self.stream.close()
+        self.stream = self.pyaudio.open(
+            format=self.pyaudio.get_format_from_width(sample_width),
+            channels=channels, rate=sample_rate, output=True
+        )
+        self.format = (sample_rate, sample_width, channels)
+
+    def play(self, pcm, sample_rate, sample_width=2, channels=1):
+        """Play PCM audio, blocking until it has been written or interrupted"""
+        self.interrupted.clear()
+        with self.lock:
+            self._open(sample_rate, sample_width, channels)
+            block = int(sample_rate * self.block_seconds) * sample_width * channels
+            for offset in range(0, len(pcm), block):
+                if self.interrupted.is_set():
+                    break
+                self.stream.write(pcm[offset:offset + block])
+
+    def interrupt(self):
+        """Stop the audio currently playing"""
+        self.interrupted.set()
+
+    def close(self):
+        with self.lock:
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+            if self.pyaudio is not None:
+                self.pyaudio.terminate()
+                self.pyaudio = None
+
+
+class GoogleTTS:
+    """Synthesizes LINEAR16 speech with a single TextToSpeechClient and plays it in-process
+
+    Args:
+        voice_name: Google voice, e.g. "en-IN-Standard-A"
+        gender: texttospeech.SsmlVoiceGender of the voice
+        speaking_rate: Speaking rate (1.0 is normal)
+        client: Client to use instead of creating a TextToSpeechClient
+        output: AudioOutput to play through
+    """
+
+    def __init__(self, voice_name, gender, speaking_rate=1.0, client=None, output=None,
+                 sample_rate=GOOGLE_SAMPLE_RATE):
+        self.voice_name = voice_name
+        self.speaking_rate = speaking_rate
+        self.sample_rate = sample_rate
+        self._client = client
+        self.output = output or AudioOutput()
+
+        # Request parameters are the same for every utterance
+        self.voice = texttospeech.VoiceSelectionParams(
+            language_code="en-IN",
+            name=voice_name,
+            ssml_gender=gender
+        )
+        self.audio_config = texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding.LINEAR16,
+            sample_rate_hertz=sample_rate,
+            speaking_rate=speaking_rate,
+            pitch=0
+        )
+
+    @property
+    def client(self):
+        """The TextToSpeechClient, created on first use and then reused"""
+        if self._client is None:
+            self._client = texttospeech.TextToSpeechClient()
+        return self._client
+
+    @property
+    def cache_voice(self):
+        """Voice identifier for the TTS cache (includes the audio format)"""
+        return f"{self.voice_name}-LINEAR16-{self.sample_rate}"
+
+    def synthesize(self, text):
+        """Synthesize text and return WAV bytes (LINEAR16 responses carry a WAV header)"""
+        response = self.client.synthesize_speech(
+            input=texttospeech.SynthesisInput(text=text),
+            voice=self.voice,
+            audio_config=self.audio_config
+        )
+        return response.audio_content
+
+    def play(self, audio):
+        """Decode WAV bytes in memory and play them"""
+        pcm, sample_rate, sample_width, channels = decode_wav(audio)
+        self.output.play(pcm, sample_rate, sample_width, channels)
+
+    def close(self):
+        self.output.close()
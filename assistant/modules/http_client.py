@@ -0,0 +1,216 @@
+"""
+Shared, pooled HTTP client with timeouts, retries and latency metrics
+"""
+import time
+import logging
+import threading
+import statistics
+from collections import deque, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# (connect, read) timeouts in seconds for requests the user is waiting on
+DEFAULT_TIMEOUT = (3.05, 4)
+
+# Retry failed connections and these statuses, with exponential backoff
+DEFAULT_RETRIES = 1
+DEFAULT_BACKOFF = 0.3
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Background fetches nobody is waiting on (e.g. news polling) can afford more
+BACKGROUND_TIMEOUT = (3.05, 10)
+BACKGROUND_RETRIES = 2
+
+
+def _accept_encoding():
+    """Compression schemes requests can decode here (brotli only if installed)"""
+    try:
+        import brotli  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        return "gzip, deflate"
+
+
+class HTTPClient:
+    """A keep-alive requests.Session with bounded hangs and retries
+
+    Every request gets DEFAULT_TIMEOUT unless one is passed, idempotent
+    requests are retried with backoff on connection errors and RETRY_STATUSES,
+    and the latency of each request is recorded per host.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF,
+                 pool_size=10, compress=True, headers=None, history=500):
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(
+            total=retries, connect=retries, read=retries, status=retries,
+            backoff_factor=backoff, status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET", "HEAD"]), raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.session.headers["User-Agent"] = USER_AGENT
+        self.session.headers["Accept-Encoding"] = _accept_encoding() if compress else "identity"
+        if headers:
+            self.session.headers.update(headers)
+
+        # Recent (host, status, seconds, bytes) samples; status None means the request failed
+        self.samples = deque(maxlen=history)
+        self.lock = threading.Lock()
+
+    def _record(self, url, status, elapsed, size):
+        with self.lock:
+            self.samples.append((urlsplit(url).netloc, status, elapsed, size))
+
+    def request(self, method, url, **kwargs):
+        """Send a request with the default timeout, recording its latency"""
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self._record(url, None, time.perf_counter() - start, 0)
+            raise
+        # Reading the body is part of the request unless the caller streams it
+        size = len(response.content) if not kwargs.get("stream") else 0
+        elapsed = time.perf_counter() - start
+        self._record(url, response.status_code, elapsed, size)
+        logger.debug(f"{method} {url}: {response.status_code} in {elapsed * 1000:.0f} ms")
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+    def get_stats(self):
+        """Per-host request counts, failures and latency in milliseconds"""
+        with self.lock:
+            samples = list(self.samples)
+        by_host = defaultdict(list)
+        for sample in samples:
+            by_host[sample[0]].append(sample)
+
+        stats = {}
+        for host, host_samples in by_host.items():
+            times = sorted(sample[2] * 1000 for sample in host_samples)
+            stats[host] = {
+                "requests": len(host_samples),
+                "failures": sum(1 for sample in host_samples if sample[1] is None or sample[1] >= 400),
+                "median_ms": statistics.median(times),
+                "p90_ms": times[min(len(times) - 1, int(0.9 * len(times)))],
+                "bytes": sum(sample[3] for sample in host_samples)
+            }
+        return stats
+
+    def log_stats(self):
+        """Log a latency summary per host"""
+        for host, stats in self.get_stats().items():
+            logger.info(
+                f"HTTP {host}: {stats['requests']} requests, {stats['failures']} failed, "
+                f"median {stats['median_ms']:.0f} ms, p90 {stats['p90_ms']:.0f} ms"
+            )
+
+    def close(self):
+        self.session.close()
+
+
+# Save every response under this directory (see http_fixtures.py)
+HTTP_RECORD_DIR = None
+
+# Serve recorded responses from this directory instead of the network,
+# with this latency (seconds per request) and bandwidth (bytes per second)
+HTTP_REPLAY_DIR = None
+HTTP_REPLAY_LATENCY = 0.0
+HTTP_REPLAY_BANDWIDTH = None
+
+# Clients shared by all web modules: one for requests the user is waiting on,
+# one for background fetches
+_client = None
+_background_client = None
+_replay_server = None
+
+def _create_client(**kwargs):
+    """Create an HTTPClient, wired to the replay server or recorder if configured"""
+    global _replay_server
+    client = HTTPClient(**kwargs)
+    if HTTP_REPLAY_DIR:
+        from .http_fixtures import FixtureStore, ReplayServer, replay
+        if _replay_server is None:
+            _replay_server = ReplayServer(
+                FixtureStore(HTTP_REPLAY_DIR), HTTP_REPLAY_LATENCY, HTTP_REPLAY_BANDWIDTH
+            ).start()
+        replay(client, _replay_server)
+    elif HTTP_RECORD_DIR:
+        from .http_fixtures import record
+        record(client, HTTP_RECORD_DIR)
+    return client
+
+def get_client(background=False):
+    """Get a shared HTTP client, creating it on first use
+
+    The default client keeps a voice command's request within DEFAULT_TIMEOUT
+    and DEFAULT_RETRIES; background=True gives the client with
+    BACKGROUND_TIMEOUT and BACKGROUND_RETRIES for fetches nobody waits on.
+    """
+    global _client, _background_client
+    if background:
+        if _background_client is None:
+            _background_client = _create_client(timeout=BACKGROUND_TIMEOUT, retries=BACKGROUND_RETRIES)
+        return _background_client
+    if _client is None:
+        _client = _create_client()
+    return _client
+
+
+# Runs web fetches while the assistant is still speaking or thinking
+_fetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="web-fetch")
+
+class Prefetch:
+    """A fetch started in the background, awaited only when its result is needed
+
+    result() logs how long the fetch took and how much of it overlapped the
+    work done between starting and awaiting it.
+    """
+
+    def __init__(self, label, fetch, *args):
+        self.label = label
+        self.started = time.perf_counter()
+        self.finished = None
+        self.waited = None
+        self.future = _fetch_executor.submit(self._run, fetch, *args)
+
+    def _run(self, fetch, *args):
+        try:
+            return fetch(*args)
+        finally:
+            self.finished = time.perf_counter()
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        """The fetch result (re-raising its exception), waiting if it is still running"""
+        start = time.perf_counter()
+        try:
+            return self.future.result(timeout)
+        finally:
+            if self.waited is None and self.finished is not None:
+                self.waited = time.perf_counter() - start
+                fetch_time = self.finished - self.started
+                logger.info(
+                    f"{self.label}: fetch took {fetch_time * 1000:.0f} ms, "
+                    f"{max(0.0, fetch_time - self.waited) * 1000:.0f} ms overlapped, "
+                    f"waited {self.waited * 1000:.0f} ms"
+                )
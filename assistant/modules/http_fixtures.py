@@ -0,0 +1,231 @@
+"""
+Record real HTTP responses once and replay them from a local stand-in server
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Headers about how the body travelled, not what it is (bodies are stored decoded)
+HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+# Header carrying the real URL of a request sent to the stand-in server
+ORIGINAL_URL_HEADER = "X-Original-URL"
+
+# Bytes written per step when bandwidth is limited
+SEND_BLOCK = 4096
+
+
+def fixture_key(method, url):
+    """File name stem of the fixture for a request"""
+    return hashlib.sha256(f"{method.upper()} {url}".encode("utf-8")).hexdigest()[:24]
+
+
+class FixtureStore:
+    """Recorded responses on disk: KEY.json (method, url, status, headers) and KEY.body per request"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+
+    def _paths(self, method, url):
+        stem = os.path.join(self.directory, fixture_key(method, url))
+        return stem + ".json", stem + ".body"
+
+    def put(self, method, url, status, headers, body):
+        """Save a response, replacing any earlier recording of the same request"""
+        meta_path, body_path = self._paths(method, url)
+        meta = {
+            "method": method.upper(),
+            "url": url,
+            "status": status,
+            "headers": {name: value for name, value in headers.items() if name.lower() not in HOP_HEADERS},
+            "recorded": time.time()
+        }
+        with self.lock:
+            # Write to temporary files first so a fixture is never half-written
+            for path, data in ((body_path, body), (meta_path, json.dumps(meta, indent=2).encode("utf-8"))):
+                with open(path + ".tmp", "wb") as f:
+                    f.write(data)
+                os.replace(path + ".tmp", path)
+
+    def get(self, method, url):
+        """(status, headers, body) recorded for a request, or None"""
+        meta_path, body_path = self._paths(method, url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return meta["status"], meta["headers"], body
+
+    def urls(self):
+        """(method, url) of every recorded request"""
+        entries = []
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(".json"):
+                try:
+                    with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                        meta = json.load(f)
+                    entries.append((meta["method"], meta["url"]))
+                except (OSError, ValueError, KeyError):
+                    continue
+        return entries
+
+    def __contains__(self, request):
+        return os.path.exists(self._paths(*request)[0])
+
+    def __len__(self):
+        return len(self.urls())
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Transport adapter that saves every response it receives to a FixtureStore"""
+
+    def __init__(self, store, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        # Streaming callers are served from the body read here
+        self.store.put(request.method, request.url, response.status_code, response.headers, response.content)
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Transport adapter that sends every request to a ReplayServer instead of its host"""
+
+    def __init__(self, base_url, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):
+        original = request
+        request = request.copy()
+        request.headers[ORIGINAL_URL_HEADER] = original.url
+        request.url = f"{self.base_url}/replay"
+        response = super().send(request, **kwargs)
+        # Callers (and redirects) see the URL they asked for
+        response.url = original.url
+        response.request = original
+        return response
+
+
+class ReplayServer:
+    """Serves a FixtureStore on a local port with simulated latency and bandwidth
+
+    Args:
+        store (FixtureStore): Recorded responses
+        latency (float): Seconds before each response starts
+        bandwidth (float): Bytes per second of response bodies, None for unlimited
+    """
+
+    def __init__(self, store, latency=0.0, bandwidth=None, host="127.0.0.1", port=0):
+        self.store = store
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.address = (host, port)
+        self.server = None
+        self.served = 0
+        self.missing = []
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real hosts
+
+            def _serve(self, send_body=True):
+                url = self.headers.get(ORIGINAL_URL_HEADER, "")
+                fixture = replay.store.get(self.command, url)
+                if fixture is None:
+                    replay.missing.append((self.command, url))
+                    logger.warning(f"No recorded response for {self.command} {url}")
+                    status, headers, body = 404, {"X-Fixture-Missing": "1"}, b"no recorded response"
+                else:
+                    replay.served += 1
+                    status, headers, body = fixture
+                if replay.latency:
+                    time.sleep(replay.latency)
+                try:
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    if send_body:
+                        replay._write(self.wfile, body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client stopped reading early
+
+            def do_GET(self):
+                self._serve()
+
+            def do_HEAD(self):
+                self._serve(send_body=False)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def _write(self, wfile, body):
+        if not self.bandwidth:
+            wfile.write(body)
+            return
+        for start in range(0, len(body), SEND_BLOCK):
+            block = body[start:start + SEND_BLOCK]
+            # Each block arrives once the time to transfer it has passed
+            time.sleep(len(block) / self.bandwidth)
+            wfile.write(block)
+            wfile.flush()
+
+    def start(self):
+        self.server = ThreadingHTTPServer(self.address, self._handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True, name="http-replay").start()
+        logger.info(f"Replaying {len(self.store)} recorded responses from {self.url}")
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def _mount(client, adapter):
+    client.session.mount("http://", adapter)
+    client.session.mount("https://", adapter)
+
+def record(client, directory):
+    """Save every response the client receives under directory, returning the FixtureStore"""
+    store = FixtureStore(directory)
+    current = client.session.get_adapter("https://")
+    _mount(client, RecordingAdapter(store, max_retries=current.max_retries))
+    return store
+
+def replay(client, server):
+    """Send all requests of the client to a started ReplayServer"""
+    _mount(client, ReplayAdapter(server.url, max_retries=0))
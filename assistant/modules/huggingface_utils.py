@@ -1,11 +1,21 @@
 from transformers import pipeline, AutoModelForSequenceClassification, AutoTokenizer
+from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
 import torch
 import os
+import threading
 from config import HUGGINGFACE_API_KEY
 
 # Set the Hugging Face API token
 os.environ["HUGGINGFACE_TOKEN"] = HUGGINGFACE_API_KEY
 
+class _StopOnEvent(StoppingCriteria):
+    """Stops generation once the consumer of a stream has gone away"""
+    def __init__(self, event):
+        self.event = event
+    
+    def __call__(self, input_ids, scores, **kwargs):
+        return self.event.is_set()
+
 class HuggingFaceHelper:
     def __init__(self):
         """Initialize the Hugging Face pipelines"""
@@ -27,10 +37,12 @@ class HuggingFaceHelper:
             model="deepset/roberta-base-squad2"
         )
         
-        # Intent classification for better command understanding
-        self.intent_classifier = pipeline(
-            "text-classification",
-            model="facebook/bart-large-mnli"
+        # Zero-shot intent classification (NLI) for better command understanding.
+        # The model is driven directly so all hypotheses for a command run in
+        # one batched forward pass.
+        self.intent_classifier = ZeroShotIntentClassifier(
+            AutoTokenizer.from_pretrained("facebook/bart-large-mnli"),
+            AutoModelForSequenceClassification.from_pretrained("facebook/bart-large-mnli")
         )
     
     def analyze_sentiment(self, text):
@@ -45,12 +57,31 @@ class HuggingFaceHelper:
             print(f"Error in sentiment analysis: {e}")
             return {'sentiment': 'neutral', 'score': 0.5}
     
-    def generate_response(self, prompt, max_length=100):
-        """Generate a natural language response"""
+    def generate_response(self, prompt, max_length=100, max_time=None, stream=False, prefix_ids=None):
+        """Generate a natural language response
+        
+        Args:
+            prompt: Text to continue
+            max_length: Maximum length in tokens, prompt included
+            max_time: Optional time limit in seconds; generation stops after
+                the step that crosses it
+            stream: If True, return an iterator over the generated text (prompt
+                excluded) that yields pieces as soon as tokens are decoded
+            prefix_ids: Optional GPT-2 token ids of text that comes before the
+                prompt (e.g. ConversationContext.token_ids()). They are used as
+                they are, so only the prompt is tokenized; max_length counts
+                from the end of the prefix, and the returned text starts at
+                the prompt.
+        """
+        if stream:
+            return self._stream_response(prompt, max_length, max_time, prefix_ids)
         try:
+            if prefix_ids:
+                return self._generate_from_ids(prompt, max_length, max_time, prefix_ids)
             response = self.text_generator(
                 prompt,
                 max_length=max_length,
+                max_time=max_time,
                 num_return_sequences=1,
                 pad_token_id=self.text_generator.tokenizer.eos_token_id
             )
@@ -59,6 +90,54 @@ class HuggingFaceHelper:
             print(f"Error in text generation: {e}")
             return prompt
     
+    def _encode_prompt(self, prompt, prefix_ids):
+        """Model inputs for a prompt following already tokenized prefix ids"""
+        ids = list(prefix_ids or []) + self.text_generator.tokenizer.encode(prompt)
+        input_ids = torch.tensor([ids], dtype=torch.long)
+        return {"input_ids": input_ids, "attention_mask": torch.ones_like(input_ids)}
+    
+    def _generate_from_ids(self, prompt, max_length, max_time, prefix_ids):
+        """Blocking generation from cached prefix ids, returning the prompt and its continuation"""
+        tokenizer = self.text_generator.tokenizer
+        inputs = self._encode_prompt(prompt, prefix_ids)
+        output = self.text_generator.model.generate(
+            **inputs,
+            max_length=len(prefix_ids) + max_length,
+            max_time=max_time,
+            pad_token_id=tokenizer.eos_token_id
+        )
+        generated = output[0, inputs["input_ids"].shape[1]:]
+        return prompt + tokenizer.decode(generated, skip_special_tokens=True)
+    
+    def _stream_response(self, prompt, max_length, max_time, prefix_ids=None):
+        """Run generation in a worker thread and yield decoded text as it arrives"""
+        stop = threading.Event()
+        try:
+            tokenizer = self.text_generator.tokenizer
+            inputs = self._encode_prompt(prompt, prefix_ids)
+            streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+            worker = threading.Thread(
+                target=self.text_generator.model.generate,
+                kwargs=dict(
+                    **inputs,
+                    max_length=len(prefix_ids or []) + max_length,
+                    max_time=max_time,
+                    streamer=streamer,
+                    stopping_criteria=StoppingCriteriaList([_StopOnEvent(stop)]),
+                    pad_token_id=tokenizer.eos_token_id
+                ),
+                daemon=True
+            )
+            worker.start()
+            for text in streamer:
+                if text:
+                    yield text
+        except Exception as e:
+            print(f"Error in streaming text generation: {e}")
+        finally:
+            # Stop the worker if the caller stopped reading early
+            stop.set()
+    
     def answer_question(self, context, question):
         """Answer a specific question based on context"""
         try:
@@ -75,28 +154,112 @@ class HuggingFaceHelper:
             return {'answer': "I'm not sure about that.", 'confidence': 0}
     
     def classify_intent(self, text, possible_intents):
-        """Classify the intent of user's input"""
+        """Classify the intent of user's input with zero-shot NLI
+        
+        Returns:
+            dict with the best 'intent', its 'confidence' and the
+            temperature-scaled 'scores' of every intent (summing to 1)
+        """
         try:
-            # Create pairs of text with each possible intent
-            pairs = [f"{text} </s></s> {intent}" for intent in possible_intents]
-            results = self.intent_classifier(pairs)
-            
-            # Find the best matching intent
-            best_score = 0
-            best_intent = possible_intents[0]
-            
-            for i, result in enumerate(results):
-                if result['label'] == 'ENTAILMENT' and result['score'] > best_score:
-                    best_score = result['score']
-                    best_intent = possible_intents[i]
-            
-            return {
-                'intent': best_intent,
-                'confidence': best_score
-            }
+            return self.intent_classifier.classify(text, possible_intents)
         except Exception as e:
             print(f"Error in intent classification: {e}")
-            return {'intent': 'unknown', 'confidence': 0}
+            return {'intent': 'unknown', 'confidence': 0, 'scores': {}}
+
+class ZeroShotIntentClassifier:
+    def __init__(self, tokenizer, model, hypothesis_template="This command is about {}.", temperature=1.0):
+        """Score intents as NLI hypotheses about a command, all in one forward pass
+        
+        Args:
+            tokenizer: Tokenizer of the NLI model (BART style <s> a </s></s> b </s> pairs)
+            model: Sequence classification model with an entailment label
+            hypothesis_template: Turns an intent label into a hypothesis
+            temperature: Softmax temperature of the entailment logits; 1.0
+                keeps the raw model scores until calibrate() has fitted one
+        """
+        self.tokenizer = tokenizer
+        self.model = model
+        self.model.eval()
+        self.hypothesis_template = hypothesis_template
+        self.temperature = temperature
+        
+        label2id = {label.lower(): idx for label, idx in model.config.label2id.items()}
+        self.entailment_id = label2id.get("entailment", 2)
+        
+        # Hypothesis token ids cached per intent label
+        self.hypothesis_cache = {}
+    
+    def _encode_hypothesis(self, intent):
+        """Return cached token ids for the hypothesis built from an intent label"""
+        ids = self.hypothesis_cache.get(intent)
+        if ids is None:
+            hypothesis = self.hypothesis_template.format(intent.replace('_', ' '))
+            ids = self.tokenizer(hypothesis, add_special_tokens=False)['input_ids']
+            self.hypothesis_cache[intent] = ids
+        return ids
+    
+    def entailment_logits(self, text, intents):
+        """Entailment logit of every intent for a command, from one batched forward pass
+        
+        The command is tokenized once and paired with the cached hypothesis
+        encodings of every intent.
+        """
+        tokenizer = self.tokenizer
+        
+        # Leave room for the longest hypothesis and the special tokens
+        hypotheses = [self._encode_hypothesis(intent) for intent in intents]
+        max_premise = tokenizer.model_max_length - max(len(h) for h in hypotheses) - 4
+        premise = tokenizer(text, add_special_tokens=False)['input_ids'][:max_premise]
+        
+        # <s> premise </s></s> hypothesis </s>, right padded
+        bos, eos = tokenizer.bos_token_id, tokenizer.eos_token_id
+        sequences = [[bos] + premise + [eos, eos] + h + [eos] for h in hypotheses]
+        width = max(len(seq) for seq in sequences)
+        input_ids = torch.full((len(sequences), width), tokenizer.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(sequences), width), dtype=torch.long)
+        for i, seq in enumerate(sequences):
+            input_ids[i, :len(seq)] = torch.tensor(seq, dtype=torch.long)
+            attention_mask[i, :len(seq)] = 1
+        
+        with torch.no_grad():
+            logits = self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+        return logits[:, self.entailment_id]
+    
+    def classify(self, text, intents):
+        """Best intent, its confidence and the scores of every intent (summing to 1)"""
+        # Single-label zero-shot: softmax of entailment logits across intents
+        entailment = self.entailment_logits(text, intents) / self.temperature
+        probabilities = torch.softmax(entailment, dim=0).tolist()
+        best = max(range(len(intents)), key=lambda i: probabilities[i])
+        return {
+            'intent': intents[best],
+            'confidence': probabilities[best],
+            'scores': dict(zip(intents, probabilities))
+        }
+    
+    def calibrate(self, examples, intents, temperatures=None):
+        """Fit the softmax temperature to labelled commands (temperature scaling)
+        
+        Args:
+            examples: (command text, correct intent) pairs; the intent must be
+                one of intents
+            intents: Intents scored for every example
+            temperatures: Candidate temperatures (default: 0.1 to 10, log spaced)
+        
+        Returns:
+            The temperature with the lowest negative log-likelihood of the
+            correct intents, which is also kept for classify()
+        """
+        if temperatures is None:
+            temperatures = [10 ** (i / 20) for i in range(-20, 21)]
+        logits = torch.stack([self.entailment_logits(text, intents) for text, _ in examples])
+        targets = torch.tensor([intents.index(intent) for _, intent in examples])
+        losses = [
+            torch.nn.functional.cross_entropy(logits / temperature, targets).item()
+            for temperature in temperatures
+        ]
+        self.temperature = temperatures[min(range(len(temperatures)), key=lambda i: losses[i])]
+        return self.temperature
 
 # Example usage functions
 def example_sentiment():
@@ -135,6 +298,8 @@ def example_intent():
     print(f"Text: {text}")
     print(f"Detected Intent: {result['intent']}")
     print(f"Confidence: {result['confidence']:.2f}")
+    for intent, score in result['scores'].items():
+        print(f"  {intent}: {score:.2f}")
 
 if __name__ == "__main__":
     # Run examples
@@ -0,0 +1,301 @@
+"""
+Headlines from RSS/Atom feeds, polled in the background into a small local store
+"""
+import os
+import re
+import json
+import time
+import html
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from datetime import datetime
+from xml.etree.ElementTree import XMLPullParser, ParseError
+from .http_client import get_client
+
+logger = logging.getLogger(__name__)
+
+# (source, feed URL) polled for headlines
+NEWS_FEEDS = [
+    ("BBC News", "https://feeds.bbci.co.uk/news/rss.xml"),
+    ("NPR", "https://feeds.npr.org/1001/rss.xml"),
+    ("Al Jazeera", "https://www.aljazeera.com/xml/rss/all.xml"),
+]
+
+NEWS_POLL_INTERVAL = 900  # seconds between background polls
+NEWS_MAX_AGE = 3600  # headlines older than this are refreshed before being read out
+NEWS_STORE_PATH = os.path.join("news_cache", "headlines.json")
+
+# Stop reading a feed after this many items in a row that are already stored
+KNOWN_ITEMS_TO_STOP = 5
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+# Fetches the feeds of a poll. Polls themselves may run on the shared HTTP
+# fetch executor (prefetch_news), so feeds must not queue behind them there.
+_feed_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="news-feed")
+
+
+def describe_age(seconds):
+    """Spoken form of how long ago something happened"""
+    if seconds < 90:
+        return "just now"
+    if seconds < 5400:
+        return f"{round(seconds / 60)} minutes ago"
+    hours = round(seconds / 3600)
+    return "an hour ago" if hours == 1 else f"{hours} hours ago"
+
+def _timestamp(text):
+    """Epoch seconds of an RSS (RFC 822) or Atom (ISO 8601) date, or None"""
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        return parsedate_to_datetime(text).timestamp()
+    except (TypeError, ValueError, IndexError):
+        pass
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+def _child_text(element, *tags):
+    for tag in tags:
+        child = element.find(tag)
+        if child is not None and child.text:
+            return child.text.strip()
+    return None
+
+def parse_item(element, source):
+    """Headline dict of an RSS <item> or Atom <entry>, or None without a title"""
+    title = _child_text(element, "title", f"{ATOM}title")
+    if not title:
+        return None
+    link = _child_text(element, "link")
+    if link is None:
+        atom_link = element.find(f"{ATOM}link")
+        link = atom_link.get("href") if atom_link is not None else None
+    return {
+        "id": _child_text(element, "guid", f"{ATOM}id") or link or title,
+        "title": " ".join(html.unescape(title).split()),
+        "link": link,
+        "source": source,
+        "published": _timestamp(_child_text(element, "pubDate", f"{ATOM}published", f"{ATOM}updated")),
+    }
+
+def iter_feed_items(chunks, source):
+    """Headlines of an RSS or Atom feed, parsed as its bytes arrive
+
+    Stops quietly at malformed XML, keeping the items parsed before it.
+    """
+    parser = XMLPullParser(events=("end",))
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+            for _, element in parser.read_events():
+                if element.tag in ("item", f"{ATOM}entry"):
+                    headline = parse_item(element, source)
+                    element.clear()
+                    if headline:
+                        yield headline
+    except ParseError as e:
+        logger.warning(f"{source} feed is malformed ({e}), keeping the items before it")
+
+
+def _title_key(title):
+    return re.sub(r"[^\w\s]", "", title.lower()).strip()
+
+
+class HeadlineStore:
+    """Deduplicated headlines and feed validators, saved as JSON
+
+    Headlines are unique by id and by title, so a story repeated under a new
+    GUID (or by another feed) is stored once.
+    """
+
+    def __init__(self, path=NEWS_STORE_PATH, max_items=200):
+        self.path = path
+        self.max_items = max_items
+        self.lock = threading.Lock()
+        self.headlines = []
+        self.feeds = {}  # url -> {"etag", "last_modified", "checked"}
+        self.updated = None  # time of the last successful poll
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.headlines = data.get("headlines", [])
+            self.feeds = data.get("feeds", {})
+            self.updated = data.get("updated")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load headlines from {self.path}: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            data = {"headlines": self.headlines, "feeds": self.feeds, "updated": self.updated}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(self.path + ".tmp", self.path)
+
+    def _find(self, headline):
+        key = _title_key(headline["title"])
+        for stored in self.headlines:
+            if stored["id"] == headline["id"] or _title_key(stored["title"]) == key:
+                return stored
+        return None
+
+    def add(self, headline):
+        """Store a headline, returning False if it is already known"""
+        with self.lock:
+            if self._find(headline) is not None:
+                return False
+            headline = dict(headline, seen=time.time())
+            self.headlines.append(headline)
+            self.headlines.sort(key=lambda item: item["published"] or item["seen"], reverse=True)
+            del self.headlines[self.max_items:]
+            return True
+
+    def latest(self, count=5):
+        with self.lock:
+            return [dict(headline) for headline in self.headlines[:count]]
+
+    def age(self):
+        """Seconds since the last successful poll, or None if there never was one"""
+        return None if self.updated is None else time.time() - self.updated
+
+    def __len__(self):
+        return len(self.headlines)
+
+
+class NewsService:
+    """Polls feeds with conditional GETs into a HeadlineStore, in the background or on demand"""
+
+    def __init__(self, feeds=None, store=None, interval=NEWS_POLL_INTERVAL, client=None):
+        self.feeds = list(NEWS_FEEDS if feeds is None else feeds)
+        self.store = store if store is not None else HeadlineStore()
+        self.interval = interval
+        self.client = client
+        self.poll_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def poll_feed(self, source, url):
+        """Fetch one feed if it changed, returning the number of new headlines"""
+        state = self.store.feeds.get(url, {})
+        headers = {}
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+
+        response = (self.client or get_client(background=True)).get(url, headers=headers, stream=True)
+        try:
+            if response.status_code == 304:
+                logger.debug(f"{source} feed unchanged")
+                return 0
+            response.raise_for_status()
+
+            new = known_in_a_row = 0
+            for headline in iter_feed_items(response.iter_content(8192), source):
+                if self.store.add(headline):
+                    new += 1
+                    known_in_a_row = 0
+                else:
+                    known_in_a_row += 1
+                    # Feeds list the newest items first: the rest were read before
+                    if known_in_a_row >= KNOWN_ITEMS_TO_STOP:
+                        break
+        finally:
+            response.close()
+
+        with self.store.lock:
+            self.store.feeds[url] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "checked": time.time()
+            }
+        return new
+
+    def poll(self):
+        """Poll every feed once, returning the number of new headlines"""
+        with self.poll_lock:
+            start = time.perf_counter()
+            new = 0
+            succeeded = False
+            # Feeds are fetched in parallel, so a poll takes as long as the slowest feed
+            fetches = [(source, _feed_executor.submit(self.poll_feed, source, url)) for source, url in self.feeds]
+            for source, future in fetches:
+                try:
+                    new += future.result()
+                    succeeded = True
+                except Exception as e:
+                    logger.warning(f"Polling {source} failed: {e}")
+            if succeeded:
+                self.store.updated = time.time()
+                self.store.save()
+            logger.info(f"Polled {len(self.feeds)} news feeds in {(time.perf_counter() - start) * 1000:.0f} ms, "
+                        f"{new} new headlines")
+            return new
+
+    def is_stale(self, max_age=NEWS_MAX_AGE):
+        """Whether the store is empty or was last polled more than max_age seconds ago"""
+        age = self.store.age()
+        return age is None or age > max_age or not len(self.store)
+
+    def refresh_if_stale(self, max_age=NEWS_MAX_AGE, count=5):
+        """Latest headlines, polling first only if the store is stale"""
+        if self.is_stale(max_age):
+            self.poll()
+        return self.store.latest(count)
+
+    def summary(self, count=3):
+        """The latest headlines as speech, with how fresh they are, or None if there are none"""
+        headlines = self.store.latest(count)
+        if not headlines:
+            return None
+        age = self.store.age()
+        freshness = f", updated {describe_age(age)}" if age is not None else ""
+        items = " ".join(f"From {item['source']}: {item['title'].rstrip('.')}." for item in headlines)
+        return f"Here are the latest headlines{freshness}. {items}"
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            age = self.store.age()
+            if age is None or age >= self.interval:
+                self.poll()
+                age = 0
+            self.stop_event.wait(self.interval - age)
+
+    def start(self):
+        """Poll in the background every interval seconds"""
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, daemon=True, name="news-poller")
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+
+
+# Service shared by the assistant
+_service = None
+
+def get_news_service():
+    """Get the shared news service, creating it on first use"""
+    global _service
+    if _service is None:
+        _service = NewsService()
+    return _service
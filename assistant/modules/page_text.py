@@ -0,0 +1,201 @@
+"""
+Streaming extraction of readable text from web pages
+"""
+import codecs
+from html.parser import HTMLParser
+
+# Elements whose content is never read aloud
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "head", "nav", "aside", "footer", "form", "button", "select"}
+
+# Elements that separate words even without whitespace between them
+BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "tr", "td", "th", "table", "section", "article", "main",
+    "header", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "dd", "dt", "hr"
+}
+
+# Text inside these replaces whatever was collected before them
+MAIN_TAGS = {"main", "article"}
+
+# Bytes read from the response per step
+STREAM_CHUNK = 16384
+
+
+class TextCollector:
+    """Collects visible text from parser events until max_chars are found
+
+    `done` turns True once enough text is collected, so the caller can stop
+    reading. Content of SKIP_TAGS is dropped, and text found in a <main> or
+    <article> replaces any page chrome read before it. The start/end/data/close
+    methods double as an lxml parser target.
+    """
+
+    def __init__(self, max_chars=200):
+        self.max_chars = max_chars
+        self.parts = []
+        self.size = 0  # collected characters, not counting repeated whitespace
+        self.skipping = {}  # open SKIP_TAGS -> depth
+        self.in_main = False
+
+    @property
+    def done(self):
+        return self.size >= self.max_chars
+
+    def start(self, tag, attrs=None):
+        if tag in SKIP_TAGS:
+            self.skipping[tag] = self.skipping.get(tag, 0) + 1
+        elif tag in MAIN_TAGS and not self.in_main and not self.skipping:
+            self.in_main = True
+            self.parts = []
+            self.size = 0
+        elif tag in BLOCK_TAGS:
+            self.parts.append(" ")
+
+    def end(self, tag):
+        if tag in self.skipping:
+            self.skipping[tag] -= 1
+            if not self.skipping[tag]:
+                del self.skipping[tag]
+        elif tag in BLOCK_TAGS:
+            self.parts.append(" ")
+
+    def data(self, data):
+        if self.skipping or self.done:
+            return
+        self.parts.append(data)
+        self.size += len(" ".join(data.split()))
+
+    def close(self):
+        return self.text()
+
+    def text(self):
+        """Collected text with whitespace collapsed"""
+        return " ".join("".join(self.parts).split())
+
+
+class ReadableTextParser(HTMLParser):
+    """Incremental pure-Python parser feeding a TextCollector"""
+
+    def __init__(self, max_chars=200):
+        super().__init__(convert_charrefs=True)
+        self.collector = TextCollector(max_chars)
+
+    @property
+    def done(self):
+        return self.collector.done
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        # Self-closing tags never open a skipped region
+        if tag in BLOCK_TAGS:
+            self.collector.start(tag)
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+    def text(self):
+        return self.collector.text()
+
+
+class LxmlTextParser:
+    """Incremental libxml2 parser (lxml) feeding a TextCollector"""
+
+    def __init__(self, max_chars=200):
+        try:
+            from lxml import etree
+        except ImportError:
+            raise RuntimeError("lxml is not installed. Install it with: pip install lxml")
+        self.collector = TextCollector(max_chars)
+        self.parser = etree.HTMLParser(target=self.collector, no_network=True)
+
+    @property
+    def done(self):
+        return self.collector.done
+
+    def feed(self, data):
+        if data:
+            self.parser.feed(data)
+
+    def close(self):
+        try:
+            self.parser.close()
+        except Exception:
+            pass  # nothing was fed, or the page ended mid-tag
+
+    def text(self):
+        return self.collector.text()
+
+
+# Text parsers by name, fastest first
+TEXT_PARSERS = {
+    "lxml": LxmlTextParser,
+    "html.parser": ReadableTextParser,
+}
+
+def create_text_parser(name="auto", max_chars=200):
+    """Create a text parser by name; "auto" picks the fastest one installed
+
+    Raises:
+        RuntimeError: if the parser is unknown or its package is not installed
+    """
+    if name == "auto":
+        for parser_class in TEXT_PARSERS.values():
+            try:
+                return parser_class(max_chars)
+            except RuntimeError:
+                continue
+    if name not in TEXT_PARSERS:
+        raise RuntimeError(f"Unknown HTML parser '{name}'. Choose from: {', '.join(TEXT_PARSERS)}")
+    return TEXT_PARSERS[name](max_chars)
+
+def available_parsers():
+    """Names of the text parsers that can be created here"""
+    names = []
+    for name in TEXT_PARSERS:
+        try:
+            create_text_parser(name)
+            names.append(name)
+        except RuntimeError:
+            pass
+    return names
+
+
+def extract_text(chunks, max_chars=200, encoding="utf-8", parser="auto"):
+    """Readable text from an iterable of byte chunks, reading no more than needed
+
+    Returns:
+        (text, bytes_read) where text is at most max_chars characters
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    text_parser = create_text_parser(parser, max_chars)
+    bytes_read = 0
+    for chunk in chunks:
+        bytes_read += len(chunk)
+        text_parser.feed(decoder.decode(chunk))
+        if text_parser.done:
+            break
+    else:
+        text_parser.feed(decoder.decode(b"", final=True))
+        text_parser.close()
+    return text_parser.text()[:max_chars], bytes_read
+
+
+def read_page_text(response, max_chars=200, parser="auto"):
+    """Readable text of a streamed requests response, closing it once enough is read
+
+    Returns:
+        (text, bytes_read) with bytes_read counted after decompression
+    """
+    try:
+        try:
+            codecs.lookup(response.encoding or "utf-8")
+            encoding = response.encoding or "utf-8"
+        except LookupError:
+            encoding = "utf-8"
+        return extract_text(response.iter_content(STREAM_CHUNK), max_chars, encoding, parser)
+    finally:
+        response.close()
@@ -0,0 +1,172 @@
+"""
+Response policy: canned templates first, GPT-2 only when the turn can afford it
+"""
+import time
+import logging
+from collections import Counter
+from datetime import datetime
+from string import Template
+from typing import Dict, Any, Optional, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Confirmation lines for actions that need no generated text (screenshots,
+# volume and playback changes, the farewell). Compiled once; placeholders are
+# filled from the command parameters.
+RESPONSE_TEMPLATES = {
+    "screenshot": Template("Your screenshot has been saved."),
+    "media_control": Template("Done."),
+    "goodbye": Template("Goodbye! Have a great $part_of_day!"),
+}
+
+DEFAULT_TEMPLATE = Template("Command executed successfully!")
+
+# Per-turn latency budget in seconds for generated responses
+DEFAULT_LATENCY_BUDGET = 0.8
+
+
+class ResponsePolicy:
+    def __init__(self, hf_helper, budget: float = DEFAULT_LATENCY_BUDGET):
+        """Serve template responses and gate text generation on a latency budget"""
+        self.hf_helper = hf_helper
+        self.budget = budget
+        self.turn_deadline: Optional[float] = None
+
+        # Moving average of generation time, used to skip hopeless attempts
+        self.generation_estimate: Optional[float] = None
+
+        # How often each path is taken: template, generated, truncated (cut off
+        # at the budget after some text was produced), cancelled, skipped
+        self.path_counts = Counter()
+
+    def begin_turn(self, budget: Optional[float] = None):
+        """Start the latency budget for a new user turn"""
+        self.turn_deadline = time.perf_counter() + (budget if budget is not None else self.budget)
+
+    def remaining_budget(self) -> float:
+        """Seconds left in the current turn's budget"""
+        if self.turn_deadline is None:
+            return self.budget
+        return max(0.0, self.turn_deadline - time.perf_counter())
+
+    def render_template(self, category: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Fill the template for a category (or the default one)"""
+        values = {"part_of_day": "evening" if datetime.now().hour >= 17 else "day"}
+        values.update(params or {})
+        template = RESPONSE_TEMPLATES.get(category, DEFAULT_TEMPLATE)
+        return template.safe_substitute(values)
+
+    def respond(self, command: str, category: str, context=None,
+                params: Optional[Dict[str, Any]] = None, stream: bool = False):
+        """Get a response line for a command
+
+        Known categories are answered from templates. Anything else is generated
+        only if the expected generation time fits the remaining turn budget;
+        generation that runs past the budget is cut off and the template
+        fallback is used instead.
+
+        The conversation so far comes from context (a ConversationContext),
+        whose cached token ids are handed to the generator as they are.
+
+        With stream=True a generated response is returned as an iterator of
+        text chunks (see speech_utils.speak_stream); templates stay strings.
+        """
+        params = dict(params or {}, command=command)
+
+        if category in RESPONSE_TEMPLATES:
+            self.path_counts["template"] += 1
+            return self.render_template(category, params)
+
+        if not self._can_generate():
+            self.path_counts["skipped"] += 1
+            return self.render_template(category, params)
+
+        prompt, prefix_ids = self._build_prompt(command, context)
+        if stream:
+            return self._stream_generated(prompt, prefix_ids, category, params)
+
+        remaining = self.remaining_budget()
+        start = time.perf_counter()
+        generated = self.hf_helper.generate_response(prompt, max_length=50, max_time=remaining,
+                                                     prefix_ids=prefix_ids)
+        elapsed = time.perf_counter() - start
+        self._update_estimate(elapsed)
+
+        if elapsed >= remaining:
+            self.path_counts["cancelled"] += 1
+            logger.info(f"Response generation cancelled after {elapsed * 1000:.0f} ms")
+            return self.render_template(category, params)
+
+        # Keep only the first line the model wrote after the prompt
+        reply = generated[len(prompt):] if generated.startswith(prompt) else generated
+        reply = reply.strip().split("\n")[0].strip()
+        if not reply:
+            self.path_counts["skipped"] += 1
+            return self.render_template(category, params)
+
+        self.path_counts["generated"] += 1
+        return reply
+
+    def _can_generate(self) -> bool:
+        """Whether the expected generation time fits the remaining budget"""
+        remaining = self.remaining_budget()
+        return remaining > 0 and not (self.generation_estimate and self.generation_estimate > remaining)
+
+    def _build_prompt(self, command: str, context) -> Tuple[str, Optional[List[int]]]:
+        """Build the generation prompt for a command
+
+        Returns:
+            (prompt, prefix_ids): the text still to be tokenized, and the token
+            ids of the conversation before it (None without a conversation)
+        """
+        if context is None or not len(context):
+            return f"User: {command}\nAssistant:", None
+        last = context.items()[-1]
+        if last["user"] == command and last["assistant"] is None:
+            # The command is already the newest turn of the context
+            return "\nAssistant:", context.token_ids()
+        return f"\nUser: {command}\nAssistant:", context.token_ids()
+
+    def _stream_generated(self, prompt: str, prefix_ids: Optional[List[int]], category: str,
+                          params: Dict[str, Any]):
+        """Yield the first generated line chunk by chunk, within the turn budget"""
+        remaining = self.remaining_budget()
+        if remaining <= 0:
+            self.path_counts["skipped"] += 1
+            yield self.render_template(category, params)
+            return
+
+        start = time.perf_counter()
+        produced = False
+        chunks = self.hf_helper.generate_response(prompt, max_length=50, max_time=remaining, stream=True,
+                                                  prefix_ids=prefix_ids)
+        for chunk in chunks:
+            line, newline, _ = chunk.partition("\n")
+            if line.strip() or produced:
+                produced = True
+                yield line
+            if newline and produced:
+                break
+        elapsed = time.perf_counter() - start
+        self._update_estimate(elapsed)
+
+        if not produced:
+            self.path_counts["cancelled" if elapsed >= remaining else "skipped"] += 1
+            yield self.render_template(category, params)
+        elif elapsed >= remaining:
+            # The text produced so far has been passed on (and spoken) already
+            self.path_counts["truncated"] += 1
+            logger.info(f"Streamed response cut off at the budget after {elapsed * 1000:.0f} ms")
+        else:
+            self.path_counts["generated"] += 1
+
+    def _update_estimate(self, elapsed: float):
+        """Fold a generation time into the moving average"""
+        if self.generation_estimate is None:
+            self.generation_estimate = elapsed
+        else:
+            self.generation_estimate = 0.7 * self.generation_estimate + 0.3 * elapsed
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get how many responses took each path"""
+        return dict(self.path_counts)
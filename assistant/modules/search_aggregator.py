@@ -0,0 +1,261 @@
+"""
+Parallel search over several sources, bounded by an overall deadline
+"""
+import re
+import html
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import quote, unquote, urlsplit
+from .http_client import get_client
+from .page_text import read_page_text
+
+logger = logging.getLogger(__name__)
+
+# Sources queried for every search, and how long the whole search may take
+SEARCH_SOURCES = ["wikipedia", "duckduckgo", "google"]
+SEARCH_DEADLINE = 2.0  # seconds
+
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+DUCKDUCKGO_API_URL = "https://api.duckduckgo.com/"
+GOOGLE_SEARCH_URL = "https://www.google.com/search"
+
+# How sources are named when an answer is read out
+SOURCE_NAMES = {"wikipedia": "Wikipedia", "duckduckgo": "DuckDuckGo", "google": "Google"}
+
+# Reciprocal rank fusion constant: higher values flatten the advantage of the top ranks
+RANK_CONSTANT = 10
+
+# Queries the sources; stragglers past the deadline finish here unobserved
+_search_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="search")
+
+
+def _strip_tags(text):
+    return " ".join(html.unescape(re.sub(r"<[^>]+>", " ", text or "")).split())
+
+
+class SearchProvider:
+    """Returns ranked results for a query from one source
+
+    Subclasses implement search(). Each result is a dict with 'title', 'url'
+    and 'snippet'. Base URLs are constructor arguments so a local stand-in
+    server can take the place of the real service.
+    """
+
+    name = "base"
+    weight = 1.0
+
+    def __init__(self, client=None):
+        self.client = client
+
+    def _get(self, url, timeout, **kwargs):
+        # The connect timeout stays the client default; reading may not outlast the deadline
+        response = (self.client or get_client()).get(url, timeout=(3.05, timeout), **kwargs)
+        response.raise_for_status()
+        return response
+
+    def search(self, query, max_results=5, timeout=SEARCH_DEADLINE):
+        raise NotImplementedError
+
+
+class WikipediaProvider(SearchProvider):
+    """Wikipedia full-text search with the lead sentences of each article"""
+
+    name = "wikipedia"
+
+    def __init__(self, url=WIKIPEDIA_API_URL, client=None):
+        super().__init__(client)
+        self.url = url
+
+    def search(self, query, max_results=5, timeout=SEARCH_DEADLINE):
+        data = self._get(self.url, timeout, params={
+            "action": "query", "format": "json", "generator": "search", "gsrsearch": query,
+            "gsrlimit": max_results, "prop": "extracts", "exintro": 1, "explaintext": 1, "exsentences": 2
+        }).json()
+        pages = sorted(data.get("query", {}).get("pages", {}).values(), key=lambda page: page.get("index", 0))
+        return [{
+            "title": page["title"],
+            "url": f"https://en.wikipedia.org/wiki/{quote(page['title'].replace(' ', '_'))}",
+            "snippet": " ".join(page.get("extract", "").split())
+        } for page in pages]
+
+
+class DuckDuckGoProvider(SearchProvider):
+    """DuckDuckGo Instant Answer API (direct answers, abstracts and related topics)"""
+
+    name = "duckduckgo"
+
+    def __init__(self, url=DUCKDUCKGO_API_URL, client=None):
+        super().__init__(client)
+        self.url = url
+
+    def search(self, query, max_results=5, timeout=SEARCH_DEADLINE):
+        data = self._get(self.url, timeout, params={
+            "q": query, "format": "json", "no_html": 1, "skip_disambig": 1
+        }).json()
+        results = []
+        heading = data.get("Heading") or query
+        if data.get("Answer"):
+            results.append({"title": heading, "url": f"https://duckduckgo.com/?q={quote(query)}",
+                            "snippet": _strip_tags(str(data["Answer"]))})
+        if data.get("AbstractText"):
+            results.append({"title": heading, "url": data.get("AbstractURL"), "snippet": data["AbstractText"]})
+
+        topics = []
+        for topic in data.get("RelatedTopics", []):
+            # Grouped topics hold their own list
+            topics.extend(topic.get("Topics", [topic]))
+        for topic in topics:
+            if topic.get("Text") and topic.get("FirstURL"):
+                results.append({"title": topic["Text"].split(" - ")[0], "url": topic["FirstURL"],
+                                "snippet": topic["Text"]})
+        return results[:max_results]
+
+
+class GooglePageProvider(SearchProvider):
+    """Leading text of the Google results page (the previous spoken summary)"""
+
+    name = "google"
+    weight = 0.5  # page text is often navigation or a consent notice
+
+    def __init__(self, url=GOOGLE_SEARCH_URL, max_chars=200, parser="auto", client=None):
+        super().__init__(client)
+        self.url = url
+        self.max_chars = max_chars
+        self.parser = parser
+
+    def search(self, query, max_results=5, timeout=SEARCH_DEADLINE):
+        response = self._get(self.url, timeout, params={"q": query}, stream=True)
+        text, _ = read_page_text(response, self.max_chars, self.parser)
+        if not text:
+            return []
+        return [{"title": query, "url": response.url, "snippet": text}]
+
+
+SEARCH_PROVIDERS = {
+    "wikipedia": WikipediaProvider,
+    "duckduckgo": DuckDuckGoProvider,
+    "google": GooglePageProvider,
+}
+
+def create_provider(name, **kwargs):
+    """Create a search provider by name
+
+    Raises:
+        RuntimeError: If the provider is unknown
+    """
+    if name not in SEARCH_PROVIDERS:
+        raise RuntimeError(f"Unknown search provider '{name}'. Choose from: {', '.join(SEARCH_PROVIDERS)}")
+    return SEARCH_PROVIDERS[name](**kwargs)
+
+
+def normalize_url(url):
+    """Key under which two links to the same page match"""
+    parts = urlsplit(unquote(url or "").lower())
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{host}{parts.path.rstrip('/')}{query}"
+
+def merge_results(results_by_source, weights=None):
+    """Rank results of several sources together, dropping duplicates
+
+    Each result scores weight / (RANK_CONSTANT + rank) per source listing it
+    (reciprocal rank fusion), so pages several sources agree on rise to the
+    top. Merged results keep the fields of the first source listing them (in
+    the order of results_by_source) plus a 'sources' list and their 'score'.
+    """
+    weights = weights or {}
+    merged = {}
+    for source, results in results_by_source.items():
+        weight = weights.get(source, 1.0)
+        for rank, result in enumerate(results):
+            key = normalize_url(result.get("url")) or result["title"].lower()
+            score = weight / (RANK_CONSTANT + rank)
+            if key not in merged:
+                merged[key] = dict(result, sources=[source], score=score)
+                continue
+            entry = merged[key]
+            entry["score"] += score
+            if source not in entry["sources"]:
+                entry["sources"].append(source)
+            if not entry.get("snippet") and result.get("snippet"):
+                entry["snippet"] = result["snippet"]
+    return sorted(merged.values(), key=lambda entry: entry["score"], reverse=True)
+
+
+class SearchAggregator:
+    """Queries providers in parallel and ranks whatever arrived by the deadline"""
+
+    def __init__(self, providers, deadline=SEARCH_DEADLINE, max_results=5):
+        self.providers = providers
+        self.deadline = deadline
+        self.max_results = max_results
+        self.last_timings = {}  # source -> seconds, or None if it missed the deadline
+
+    def _timed(self, provider, query, start, deadline):
+        results = provider.search(query, self.max_results, deadline)
+        return results, time.perf_counter() - start
+
+    def search(self, query, deadline=None):
+        """Ranked, deduplicated results of all sources that answered within the deadline"""
+        deadline = self.deadline if deadline is None else deadline
+        start = time.perf_counter()
+        futures = {
+            _search_executor.submit(self._timed, provider, query, start, deadline): provider
+            for provider in self.providers
+        }
+        done, late = wait(futures, timeout=deadline)
+
+        results_by_source = {}
+        timings = {}
+        # In provider order, so ties and merged fields do not depend on arrival order
+        for future, provider in futures.items():
+            if future not in done:
+                continue
+            try:
+                results, elapsed = future.result()
+            except Exception as e:
+                logger.warning(f"{provider.name} search failed: {e}")
+                timings[provider.name] = None
+                continue
+            results_by_source[provider.name] = results
+            timings[provider.name] = elapsed
+        for future in late:
+            # Never started ones are dropped; running ones finish unobserved
+            future.cancel()
+            timings[futures[future].name] = None
+        self.last_timings = timings
+
+        logger.info(f"Search '{query}' in {(time.perf_counter() - start) * 1000:.0f} ms: " + ", ".join(
+            f"{name} {'late or failed' if seconds is None else f'{seconds * 1000:.0f} ms'}"
+            for name, seconds in timings.items()
+        ))
+        weights = {provider.name: provider.weight for provider in self.providers}
+        return merge_results(results_by_source, weights)
+
+
+def spoken_answer(results, max_chars=300):
+    """Speech for the best result with text, or None"""
+    for result in results:
+        snippet = result.get("snippet")
+        if not snippet:
+            continue
+        if len(snippet) > max_chars:
+            # Cut at the last sentence end that fits, else at a word
+            cut = snippet[:max_chars]
+            end = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+            snippet = cut[:end + 1] if end > max_chars // 3 else cut.rsplit(" ", 1)[0] + "..."
+        source = result["sources"][0] if result.get("sources") else None
+        return f"According to {SOURCE_NAMES.get(source, source)}: {snippet}" if source else snippet
+    return None
+
+
+# Aggregator shared by the assistant
+_aggregator = None
+
+def get_search_aggregator():
+    """Get the shared search aggregator over SEARCH_SOURCES, creating it on first use"""
+    global _aggregator
+    if _aggregator is None:
+        _aggregator = SearchAggregator([create_provider(name) for name in SEARCH_SOURCES], SEARCH_DEADLINE)
+    return _aggregator
@@ -0,0 +1,195 @@
+"""
+Speculative pre-warming: start the likely action while the user is still speaking
+"""
+import time
+import logging
+import threading
+from typing import Dict, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class Speculator:
+    def __init__(self, classify: Callable[[str], Optional[str]], clock: Callable[[], float] = time.perf_counter):
+        """Classify interim transcripts and run pre-warm hooks for the guessed category
+
+        Args:
+            classify: Maps command text to a category (or None), e.g.
+                CommandLearner.predict_category
+            clock: Time source for pre-warm and turn timing
+        """
+        self.classify = classify
+        self.clock = clock
+        self.hooks: Dict[str, list] = {}
+        self.current: Optional[Dict[str, Any]] = None
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "late": 0}
+
+        # Partials are ignored from commit() until the next utterance starts
+        self.accepting = True
+
+        # The turn being timed: when its final command arrived and whether the
+        # speculation hit; finished turns' latencies by category and outcome
+        self.turn: Optional[Dict[str, Any]] = None
+        self.turn_latency: Dict[str, Dict[str, list]] = {}
+
+    def register(self, category: str, warm: Callable[[], Any],
+                 discard: Optional[Callable[[Any], Any]] = None):
+        """Register work to start early when a partial command looks like category
+
+        Args:
+            category: Command category that triggers the hook
+            warm: Called in the background when the category is speculated
+            discard: Called with the result of warm if the final command turns
+                out to be something else (never before warm has returned)
+        """
+        self.hooks.setdefault(category, []).append((warm, discard))
+
+    def _run(self, speculation: Dict[str, Any]):
+        """Run the pre-warm hooks of a speculation, then any discard that came in meanwhile"""
+        for warm, discard in self.hooks.get(speculation["category"], []):
+            try:
+                speculation["results"].append((warm(), discard))
+            except Exception as e:
+                logger.error(f"Error in pre-warm for {speculation['category']}: {e}")
+        with self.lock:
+            speculation["finished"] = self.clock()
+            discarded = speculation["discarded"]
+        if discarded:
+            self._run_discards(speculation)
+
+    def _run_discards(self, speculation: Dict[str, Any]):
+        for result, discard in speculation["results"]:
+            if discard:
+                try:
+                    discard(result)
+                except Exception as e:
+                    logger.error(f"Error discarding pre-warm for {speculation['category']}: {e}")
+
+    def _discard(self, speculation: Dict[str, Any]):
+        """Undo the pre-warm work of a speculation that did not pan out
+
+        Work still running is undone by its own thread once it returns, so a
+        late result cannot outlive the discard.
+        """
+        with self.lock:
+            speculation["discarded"] = True
+            running = speculation["finished"] is None
+        if not running:
+            self._run_discards(speculation)
+
+    def begin_utterance(self):
+        """Accept interim transcripts again, for the utterance being recognized next"""
+        self.accepting = True
+
+    def begin_turn(self):
+        """Start timing a turn: its final command has just been recognized"""
+        self.turn = {"started": self.clock(), "category": None, "outcome": "miss"}
+
+    def speculate(self, partial_command: str):
+        """Classify an interim transcript and pre-warm the likely action"""
+        if not self.accepting:
+            return
+        category = self.classify(partial_command)
+        if not category:
+            return
+
+        with self.lock:
+            previous = self.current
+            if previous and previous["category"] == category:
+                previous["text"] = partial_command
+                return
+            speculation = self.current = {
+                "text": partial_command,
+                "category": category,
+                "started": self.clock(),
+                "finished": None,
+                "discarded": False,
+                "results": []
+            }
+            if category not in self.hooks:
+                speculation["finished"] = speculation["started"]
+
+        if previous:
+            self._discard(previous)
+
+        logger.info(f"Speculating '{category}' from partial command: {partial_command}")
+        if category in self.hooks:
+            threading.Thread(target=self._run, args=(speculation,), daemon=True).start()
+
+    def predicted_category(self, command: str) -> Optional[str]:
+        """The speculated category if it was made from exactly this text"""
+        speculation = self.current
+        if speculation and speculation["text"] == command:
+            return speculation["category"]
+        return None
+
+    def commit(self, category: str) -> bool:
+        """Settle the current speculation against the final command category
+
+        Interim transcripts arriving after this are ignored until
+        begin_utterance(), so a stale partial cannot start a new speculation.
+
+        Returns:
+            Whether the speculation hit (False on a miss or with no speculation)
+        """
+        with self.lock:
+            speculation, self.current = self.current, None
+            self.accepting = False
+            finished = speculation["finished"] if speculation else None
+        hit = bool(speculation) and speculation["category"] == category
+        if self.turn is not None:
+            self.turn.update(category=category, outcome="hit" if hit else "miss")
+        if not speculation:
+            return False
+
+        if not hit:
+            self.stats["misses"] += 1
+            self._discard(speculation)
+            logger.info(f"Speculation missed: guessed '{speculation['category']}', got '{category}'")
+            return False
+
+        self.stats["hits"] += 1
+        if finished is None:
+            self.stats["late"] += 1
+            logger.info(f"Speculation hit for '{category}', but the pre-warm is still running")
+        else:
+            logger.info(f"Speculation hit for '{category}': pre-warm ready after "
+                        f"{(finished - speculation['started']) * 1000:.0f} ms")
+        return True
+
+    def action_started(self) -> Optional[float]:
+        """Record the latency of the current turn, from its final command to its action
+
+        Returns:
+            Seconds since begin_turn(), or None if no committed turn is being timed
+        """
+        turn, self.turn = self.turn, None
+        if turn is None or turn["category"] is None:
+            return None
+        latency = self.clock() - turn["started"]
+        outcomes = self.turn_latency.setdefault(turn["category"], {"hit": [], "miss": []})
+        outcomes[turn["outcome"]].append(latency)
+        return latency
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit rate and the turn latency saved by speculation
+
+        saved_ms compares turns of the same category: for every category with
+        both hit and miss turns, the average miss latency minus the average hit
+        latency, averaged over those categories.
+        """
+        stats = dict(self.stats)
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / total if total else 0.0
+
+        hits = [latency for outcomes in self.turn_latency.values() for latency in outcomes["hit"]]
+        misses = [latency for outcomes in self.turn_latency.values() for latency in outcomes["miss"]]
+        stats["avg_hit_ms"] = sum(hits) * 1000 / len(hits) if hits else None
+        stats["avg_miss_ms"] = sum(misses) * 1000 / len(misses) if misses else None
+        savings = [
+            sum(outcomes["miss"]) / len(outcomes["miss"]) - sum(outcomes["hit"]) / len(outcomes["hit"])
+            for outcomes in self.turn_latency.values() if outcomes["hit"] and outcomes["miss"]
+        ]
+        stats["saved_ms"] = sum(savings) * 1000 / len(savings) if savings else None
+        return stats
@@ -1,9 +1,18 @@
 import speech_recognition as sr
 import pyttsx3
 import logging
-import os
+import re
+import time
+import collections
+from concurrent.futures import ThreadPoolExecutor
 from google.cloud import texttospeech
-from pathlib import Path
+from .audio_capture import CaptureSession
+from .audio_sources import create_source
+from .asr_backends import create_backend
+from .tts_worker import SpeechWorker, PRIORITY_NORMAL
+from .tts_cache import TTSCache, prerender
+from .wake_word import create_spotter
+from .google_tts import GoogleTTS
 
 # Set up logging to show only important information
 logging.basicConfig(
@@ -24,127 +33,452 @@ logging.getLogger('urllib3').setLevel(logging.WARNING)
 VOICE_TYPE = "local"  # Can be "local" or "google"
 GOOGLE_VOICE_NAME = "en-IN-Standard-A"  # Indian English female voice
 GOOGLE_VOICE_GENDER = texttospeech.SsmlVoiceGender.FEMALE
+GOOGLE_SPEAKING_RATE = 1.0
 
-def recognize_speech():
-    """Captures voice command and converts it to text"""
-    recognizer = sr.Recognizer()
+# Fixed phrases pre-rendered into the TTS cache at startup
+COMMON_PHRASES = [
+    "Good morning! I'm your AI Assistant. How can I help you today?",
+    "Good afternoon! I'm your AI Assistant. How can I help you today?",
+    "Good evening! I'm your AI Assistant. How can I help you today?",
+    "Goodbye! Have a great day!",
+    "Command executed successfully!",
+    "Screenshot taken successfully",
+    "Increasing volume",
+    "Decreasing volume",
+    "Muting audio",
+    "Pausing playback",
+    "Resuming playback",
+    "Playing next track",
+    "Playing previous track",
+    "Searching for the latest news",
+    "Getting the latest news...",
+    "I encountered an error. Please try again.",
+]
+
+# Streaming recognition settings
+STREAMING_RECOGNITION = False  # Publish interim transcripts while the user is speaking
+PARTIAL_INTERVAL = 1.0  # Seconds of new speech between interim recognitions
+
+# Speech recognition backend settings
+ASR_BACKEND = "google"  # Can be "google", "vosk" or "whisper" (see asr_backends.py)
+ASR_FALLBACK_BACKEND = None  # Offline backend to use when ASR_BACKEND fails, e.g. "vosk"
+
+# Voice activity detection for endpointing: "webrtc", "spectral" or None for the energy threshold
+VAD_BACKEND = "webrtc"
+
+# Audio input: "microphone", or the path of a WAV file to replay (e.g. on a headless machine)
+AUDIO_SOURCE = "microphone"
+REPLAY_SPEED = 1.0  # 1.0 replays recordings in real time, 0 as fast as possible
+
+# Let the user interrupt the assistant by speaking over it. Our own voice is only
+# told apart from the user's by its level, so enable this with headphones or
+# acoustic echo cancellation; with open speakers the assistant may cut itself off
+BARGE_IN = False
+
+# Wake-word mode: only recognize speech after the wake word is heard
+WAKE_WORD_MODE = False
+WAKE_WORD_ENGINE = "vosk"  # Can be "vosk" or "porcupine" (see wake_word.py)
+WAKE_WORD = "zenith"  # For Porcupine a built-in keyword such as "jarvis" or a .ppn file
+
+# Capture session and backends shared by all recognize_speech calls
+_capture_session = None
+_asr_backends = {}
+_spotter = None
+
+def get_asr_backend(name=None):
+    """Get a recognition backend by name (ASR_BACKEND by default), loading it once"""
+    name = name or ASR_BACKEND
+    if name not in _asr_backends:
+        _asr_backends[name] = create_backend(name)
+    return _asr_backends[name]
+
+def transcribe(audio):
+    """Transcribe captured audio with the configured backend
+    
+    Falls back to ASR_FALLBACK_BACKEND when the primary backend cannot be
+    reached. Recognition latency is logged for every utterance.
     
+    Raises:
+        sr.RequestError: If no backend could process the audio
+    """
+    backend = get_asr_backend()
+    start = time.perf_counter()
     try:
-        with sr.Microphone() as source:
-            print("\nListening...")
-            
-            # Make it more sensitive to speech
-            recognizer.energy_threshold = 250  # Lower threshold for softer speech
-            recognizer.dynamic_energy_threshold = True
-            recognizer.pause_threshold = 0.6  # Slightly longer pause for Indian English rhythm
-            recognizer.operation_timeout = None
-            
-            # Shorter duration for ambient noise adjustment
-            recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            print("Ready to listen.")
-            
-            try:
-                audio = recognizer.listen(source)
-                print("Processing speech...")
-
-                try:
-                    # Using en-IN for Indian English
-                    text = recognizer.recognize_google(
-                        audio,
-                        language="en-IN",  # Indian English
-                        show_all=False  # Only return most confident result
-                    )
-                    print(f"You said: {text}")
-                    return text.lower()
-                except sr.UnknownValueError:
-                    print("Sorry, I couldn't understand what you said.")
-                    return None
-                except sr.RequestError as e:
-                    print("Could not request results from speech service.")
-                    return None
-            except Exception as e:
-                print("Error during listening. Please try again.")
-                return None
-                
+        text = backend.transcribe(audio)
+    except sr.RequestError as e:
+        if not ASR_FALLBACK_BACKEND:
+            raise
+        logger.warning(f"{backend.name} recognition failed ({e}), using {ASR_FALLBACK_BACKEND}")
+        backend = get_asr_backend(ASR_FALLBACK_BACKEND)
+        text = backend.transcribe(audio)
+    logger.info(f"{backend.name} recognition took {(time.perf_counter() - start) * 1000:.0f} ms")
+    return text
+
+def get_capture_session():
+    """Get the long-lived microphone session, opening it on first use"""
+    global _capture_session
+    if _capture_session is None:
+        session = CaptureSession(
+            source=create_source(AUDIO_SOURCE, REPLAY_SPEED),
+            partial_interval=PARTIAL_INTERVAL, transcribe=transcribe, vad=VAD_BACKEND,
+            playback_active=is_speaking if BARGE_IN else None, on_barge_in=stop_speaking
+        )
+        session.open()
+        _capture_session = session
+    return _capture_session
+
+def close_capture_session():
+    """Release the microphone held by the capture session"""
+    global _capture_session
+    if _capture_session is not None:
+        _capture_session.close()
+        _capture_session = None
+
+def wait_for_wake_word(timeout=None):
+    """Block until the wake word is heard
+    
+    Returns True straight away when the keyword spotter cannot be loaded, so
+    the assistant falls back to recognizing every utterance.
+    """
+    global _spotter
+    if _spotter is False:
+        return True
+    try:
+        session = get_capture_session()
+        if _spotter is None:
+            _spotter = create_spotter(WAKE_WORD_ENGINE, session.source.SAMPLE_RATE, WAKE_WORD)
+    except Exception as e:
+        logger.warning(f"Wake word unavailable ({e}), listening for every command")
+        _spotter = False
+        return True
+    
+    wait_for_speech()
+    session.flush()
+    print(f"\nWaiting for '{WAKE_WORD}'...")
+    start = session.position
+    heard = session.wait_for_wake_word(_spotter, timeout=timeout)
+    if heard:
+        logger.info(f"Wake word heard after {session.position - start:.1f} s of audio")
+    return heard
+
+def recognize_speech(on_partial=None, flush=True):
+    """Captures voice command and converts it to text
+    
+    The microphone stays open between calls (see CaptureSession), so there is
+    no per-call device setup or ambient noise adjustment.
+    
+    Args:
+        on_partial: Optional callback receiving interim transcripts while the
+            user is still speaking (streaming mode)
+        flush: Drop audio captured before the call; pass False right after the
+            wake word so a command said in the same breath is kept
+    """
+    try:
+        session = get_capture_session()
     except Exception as e:
         print("Error accessing microphone. Please check your microphone settings.")
         return None
-
-def speak_google(text):
-    """Converts text to speech using Google Cloud TTS"""
+    
+    # Without barge-in, don't listen to ourselves: let queued speech finish first
+    if not BARGE_IN:
+        wait_for_speech()
+    print("\nListening...")
+    
+    # Ignore anything heard while we were busy (including our own voice)
+    if flush:
+        session.flush()
+    print("Ready to listen.")
+    
     try:
-        # Initialize the client
-        client = texttospeech.TextToSpeechClient()
+        audio = session.listen(on_partial=on_partial)
+        if audio is None:
+            return None
+        print("Processing speech...")
+        
+        try:
+            text = transcribe(audio)
+            if not text:
+                print("Sorry, I couldn't understand what you said.")
+                return None
+            print(f"You said: {text}")
+            return text
+        except sr.RequestError as e:
+            print("Could not request results from speech service.")
+            return None
+    except Exception as e:
+        print("Error during listening. Please try again.")
+        return None
 
-        # Set the text input to be synthesized
-        synthesis_input = texttospeech.SynthesisInput(text=text)
+# Cache of synthesized Google TTS audio, created on first use
+_tts_cache = None
 
-        # Build the voice request
-        voice = texttospeech.VoiceSelectionParams(
-            language_code="en-IN",
-            name=GOOGLE_VOICE_NAME,
-            ssml_gender=GOOGLE_VOICE_GENDER
-        )
+def get_tts_cache():
+    """Get the synthesized audio cache"""
+    global _tts_cache
+    if _tts_cache is None:
+        _tts_cache = TTSCache()
+    return _tts_cache
 
-        # Select the type of audio file
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3,
-            speaking_rate=1.0,
-            pitch=0
-        )
+# Google TTS client and audio output, created on first use
+_google_tts = None
 
-        # Perform the text-to-speech request
-        response = client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config
-        )
+# Bumped by stop_speaking so chunks of interrupted Google speech are not played
+_speech_generation = 0
 
-        # Create output directory if it doesn't exist
-        output_dir = Path("temp_audio")
-        output_dir.mkdir(exist_ok=True)
-        
-        # Save the audio file
-        output_file = output_dir / "output.mp3"
-        with open(output_file, "wb") as out:
-            out.write(response.audio_content)
-            
-        # Play the audio file using system default player
-        os.system(f'start {output_file}')
-        
+def get_google_tts():
+    """Get the shared Google TTS synthesizer and player"""
+    global _google_tts
+    if _google_tts is None:
+        _google_tts = GoogleTTS(GOOGLE_VOICE_NAME, GOOGLE_VOICE_GENDER, GOOGLE_SPEAKING_RATE)
+    return _google_tts
+
+def synthesize_google(text):
+    """Synthesize text with Google Cloud TTS and return the WAV bytes"""
+    return get_google_tts().synthesize(text)
+
+def google_audio(text):
+    """Audio for text from the TTS cache, synthesizing it with Google Cloud TTS on a miss"""
+    cache = get_tts_cache()
+    tts = get_google_tts()
+    cached_file = cache.get(text, tts.cache_voice, GOOGLE_SPEAKING_RATE)
+    if cached_file is not None:
+        return cached_file.read_bytes()
+    audio = tts.synthesize(text)
+    cache.put(text, tts.cache_voice, GOOGLE_SPEAKING_RATE, audio, extension="wav")
+    return audio
+
+def speak_google(text, generation=None):
+    """Converts text to speech using Google Cloud TTS
+    
+    Long text is spoken in sentence chunks, each synthesized while the one
+    before it plays. Audio is looked up in the TTS cache first; only unseen
+    text is synthesized. Playback goes through a persistent output stream.
+    """
+    tts = get_google_tts()
+    
+    def play(audio):
+        if generation is None or generation == _speech_generation:
+            tts.play(audio)
+    
+    try:
+        play_pipelined(split_for_speech(text), google_audio, play)
     except Exception as e:
         print(f"Error with Google TTS: {e}")
         # Fallback to local TTS
         speak_local(text)
 
-def speak_local(text):
-    """Converts text to speech using local Windows TTS"""
-    engine = pyttsx3.init()
-    engine.setProperty("rate", 150)  # Adjust speed
-    
-    # Get available voices
-    voices = engine.getProperty('voices')
+def play_google(text):
+    """Speak text with Google Cloud TTS on the calling thread, with no local fallback
     
-    # Try to find an Indian English voice
-    indian_voice_found = False
-    for voice in voices:
-        if "indian" in voice.name.lower() or "en-in" in voice.id.lower():
-            engine.setProperty('voice', voice.id)
-            indian_voice_found = True
-            break
-    
-    if not indian_voice_found:
-        print("No Indian English voice found, using default voice")
+    Used by the speech worker when the local engine cannot be created.
+    """
+    play_pipelined(split_for_speech(text), google_audio, get_google_tts().play)
+
+def prerender_common_phrases(phrases=None):
+    """Synthesize COMMON_PHRASES into the TTS cache in the background"""
+    if VOICE_TYPE != "google":
+        return None
+    tts = get_google_tts()
+    return prerender(get_tts_cache(), phrases or COMMON_PHRASES, tts.synthesize,
+                     tts.cache_voice, GOOGLE_SPEAKING_RATE, extension="wav")
+
+def prerender_phrase(text):
+    """Synthesize one phrase into the TTS cache, returning once it is there"""
+    thread = prerender_common_phrases([text])
+    if thread is not None:
+        thread.join()
+
+# Speech worker owning the local TTS engine
+_speech_worker = None
+
+# Google TTS runs on its own thread so synthesis never blocks the caller
+_google_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="google-tts")
+_google_speech = None
+
+def get_speech_worker():
+    """Get the TTS worker thread, starting it on first use"""
+    global _speech_worker
+    if _speech_worker is None:
+        _speech_worker = SpeechWorker(rate=150, fallback=play_google)
+    return _speech_worker
+
+def is_speaking():
+    """Whether the assistant is speaking or has speech queued"""
+    if _speech_worker is not None and _speech_worker.is_speaking():
+        return True
+    return _google_speech is not None and not _google_speech.done()
+
+def wait_for_speech(timeout=None):
+    """Block until everything queued for speech has been spoken"""
+    if _speech_worker is not None:
+        _speech_worker.wait_until_idle(timeout)
+    if _google_speech is not None:
+        try:
+            _google_speech.result(timeout)
+        except Exception:
+            pass
+
+def stop_speaking():
+    """Cut off the current utterance and drop queued speech"""
+    global _speech_generation
+    if _speech_worker is not None:
+        _speech_worker.interrupt()
+    if _google_tts is not None:
+        _speech_generation += 1
+        _google_tts.output.interrupt()
+
+def close_speech_worker(drain=True):
+    """Stop the TTS worker and Google TTS output, by default after they finish speaking"""
+    global _speech_worker, _google_tts
+    if _speech_worker is not None:
+        stats = _speech_worker.get_stats()
+        if stats["utterances"]:
+            logger.info(f"TTS time to first audio: median {stats['median_ms']:.0f} ms over {stats['utterances']} utterances")
+        _speech_worker.close(drain=drain)
+        _speech_worker = None
+    if _google_tts is not None:
+        if drain:
+            wait_for_speech(timeout=10)
+        else:
+            stop_speaking()
+        _google_tts.close()
+        _google_tts = None
+    if _tts_cache is not None and (_tts_cache.hits or _tts_cache.misses):
+        stats = _tts_cache.get_stats()
+        logger.info(f"TTS cache: {stats['hits']} hits, {stats['misses']} misses, {stats['bytes'] // 1024} KB")
+
+def speak_local(text, priority=PRIORITY_NORMAL):
+    """Queues text for the local TTS engine without waiting for it to be spoken
     
-    engine.say(text)
-    engine.runAndWait()
+    Long text is queued in sentence chunks so speech starts after the first
+    one is synthesized. Returns the Utterance of the last chunk.
+    """
+    worker = get_speech_worker()
+    utterance = None
+    for chunk in split_for_speech(text):
+        utterance = worker.say(chunk, priority)
+    return utterance
 
-def speak(text):
-    """Main speak function that chooses between Google Cloud TTS and local TTS"""
+def speak(text, priority=PRIORITY_NORMAL):
+    """Main speak function that chooses between Google Cloud TTS and local TTS
+    
+    Speech is queued and plays asynchronously: local speech returns an
+    Utterance handle, Google speech a Future.
+    """
+    global _google_speech
     if VOICE_TYPE == "google":
-        speak_google(text)
+        _google_speech = _google_executor.submit(speak_google, text, _speech_generation)
+        return _google_speech
     else:
-        speak_local(text)
+        return speak_local(text, priority)
+
+# A sentence ends at ., ! or ? followed by whitespace (so "3.5" is not split)
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+def iter_sentences(chunks):
+    """Group streamed text chunks into complete sentences
+    
+    Each sentence is yielded as soon as the text that ends it has arrived;
+    whatever is left when the stream ends is yielded last.
+    """
+    pending = ""
+    for chunk in chunks:
+        pending += chunk
+        parts = SENTENCE_END.split(pending)
+        for sentence in parts[:-1]:
+            if sentence.strip():
+                yield sentence.strip()
+        pending = parts[-1]
+    if pending.strip():
+        yield pending.strip()
+
+# Text longer than this is spoken in chunks, split at sentence and then clause boundaries
+LONG_TEXT_CHARS = 150
+CLAUSE_END = re.compile(r'(?<=[,;:])\s+')
+
+# Synthesizes upcoming chunks while the current one plays
+_synthesis_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-synthesis")
+
+def split_for_speech(text, max_chars=LONG_TEXT_CHARS):
+    """Split long text into sentence-sized chunks for pipelined synthesis
+    
+    Text up to max_chars is kept whole (so cached phrases still match);
+    longer sentences are split further at commas, semicolons and colons.
+    """
+    if len(text) <= max_chars:
+        return [text.strip()] if text.strip() else []
+    chunks = []
+    for sentence in iter_sentences([text]):
+        if len(sentence) <= max_chars:
+            chunks.append(sentence)
+            continue
+        current = ""
+        for clause in CLAUSE_END.split(sentence):
+            if current and len(current) + len(clause) + 1 > max_chars:
+                chunks.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}" if current else clause
+        if current:
+            chunks.append(current)
+    return chunks
+
+def play_pipelined(chunks, synthesize, play, lookahead=1):
+    """Play chunks in order while the following ones are synthesized
+    
+    Args:
+        chunks: Text chunks, e.g. from split_for_speech
+        synthesize: Function chunk -> audio (runs on the synthesis thread)
+        play: Function audio -> None that blocks while the audio plays
+        lookahead: Number of chunks synthesized ahead of the one playing
+    
+    Returns:
+        (seconds until the first chunk started playing, total seconds)
+    """
+    start = time.perf_counter()
+    chunks = iter(chunks)
+    pending = collections.deque()
+    
+    def submit_next():
+        chunk = next(chunks, None)
+        if chunk is not None:
+            pending.append(_synthesis_executor.submit(synthesize, chunk))
+    
+    for _ in range(lookahead + 1):
+        submit_next()
+    first_audio = None
+    while pending:
+        audio = pending.popleft().result()
+        submit_next()
+        if first_audio is None:
+            first_audio = time.perf_counter() - start
+        play(audio)
+    return first_audio, time.perf_counter() - start
+
+def speak_stream(text_or_chunks, speak_fn=None):
+    """Speak streamed text sentence by sentence while the rest is produced
+    
+    Args:
+        text_or_chunks: A string, or an iterable of text chunks (e.g. from
+            HuggingFaceHelper.generate_response(stream=True))
+        speak_fn: Function used to speak each sentence (defaults to speak)
+    
+    Returns:
+        Seconds from the call until the first sentence was handed to speech,
+        or None if there was nothing to say
+    """
+    speak_fn = speak_fn or speak
+    if isinstance(text_or_chunks, str):
+        text_or_chunks = [text_or_chunks]
+    
+    start = time.perf_counter()
+    first_audio = None
+    for sentence in iter_sentences(text_or_chunks):
+        if first_audio is None:
+            first_audio = time.perf_counter() - start
+            logger.info(f"Time to first audio: {first_audio * 1000:.0f} ms")
+        speak_fn(sentence)
+    return first_audio
 
 def list_available_voices():
     """Lists all available voices (both local and Google Cloud)"""
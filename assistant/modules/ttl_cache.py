@@ -0,0 +1,73 @@
+"""
+Small in-memory cache whose entries expire after a time-to-live
+"""
+import time
+import threading
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Maps keys to values for ttl seconds, keeping at most max_items (least recently used dropped first)"""
+
+    def __init__(self, ttl, max_items=64, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_items = max_items
+        self.clock = clock
+        self.entries = OrderedDict()  # key -> (stored, expires, value)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """The value for key, or default if it is missing or expired"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] <= self.clock():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, value, ttl=None):
+        """Store value under key for ttl seconds (the cache default if None)"""
+        with self.lock:
+            now = self.clock()
+            self.entries[key] = (now, now + (self.ttl if ttl is None else ttl), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_items:
+                self.entries.popitem(last=False)
+
+    def age(self, key):
+        """Seconds since key was stored, or None if it is missing or expired"""
+        with self.lock:
+            entry = self.entries.get(key)
+            now = self.clock()
+            if entry is None or entry[1] <= now:
+                return None
+            return now - entry[0]
+
+    def values(self):
+        """Values that have not expired, least recently used first"""
+        with self.lock:
+            now = self.clock()
+            return [entry[2] for entry in self.entries.values() if entry[1] > now]
+
+    def pop(self, key, default=None):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            return default if entry is None else entry[2]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __contains__(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry is not None and entry[1] > self.clock()
+
+    def __len__(self):
+        return len(self.entries)
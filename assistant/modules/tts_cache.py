@@ -0,0 +1,151 @@
+"""
+Disk-backed LRU cache of synthesized speech audio
+"""
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Default cache location and size bound
+TTS_CACHE_DIR = os.path.join("temp_audio", "cache")
+TTS_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+
+def cache_key(text, voice, rate):
+    """Content address of an utterance: the same text, voice and rate give the same audio"""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{voice}|{rate}|{normalized}".encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Synthesized audio files keyed by text, voice and rate
+
+    Entries are files named after their key, so the cache survives restarts.
+    Recency is kept in memory (seeded from file modification times) and the
+    least recently used files are deleted once the total size exceeds max_bytes.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (path, size), least recently used first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        """Index the files already on disk, oldest first"""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            files = [p for p in self.directory.iterdir() if p.is_file() and not p.name.endswith(".tmp")]
+        except OSError as e:
+            logger.error(f"Error reading TTS cache: {e}")
+            return
+        for path in sorted(files, key=lambda p: p.stat().st_mtime):
+            size = path.stat().st_size
+            self.entries[path.stem] = (path, size)
+            self.total_bytes += size
+        self._evict()
+
+    def get(self, text, voice, rate):
+        """Path of the cached audio for an utterance, or None on a miss"""
+        key = cache_key(text, voice, rate)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or not entry[0].exists():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, text, voice, rate, audio, extension="mp3"):
+        """Store synthesized audio bytes and return the path of the cached file"""
+        key = cache_key(text, voice, rate)
+        path = self.directory / f"{key}.{extension}"
+        # Write to a temporary name first so a reader never sees a partial file
+        temp_path = self.directory / f"{key}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as out:
+            out.write(audio)
+        os.replace(temp_path, path)
+
+        with self.lock:
+            if key in self.entries:
+                self._remove(key, delete=False)
+            self.entries[key] = (path, len(audio))
+            self.total_bytes += len(audio)
+            self._evict(keep=key)
+        return path
+
+    def __contains__(self, item):
+        text, voice, rate = item
+        with self.lock:
+            return cache_key(text, voice, rate) in self.entries
+
+    def _remove(self, key, delete=True):
+        path, size = self.entries.pop(key)
+        self.total_bytes -= size
+        if delete:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _evict(self, keep=None):
+        """Delete least recently used files until the cache fits in max_bytes"""
+        while self.total_bytes > self.max_bytes and self.entries:
+            key = next(iter(self.entries))
+            if key == keep:
+                break
+            self._remove(key)
+
+    def get_stats(self):
+        """Hit/miss counts and size of the cache"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+def prerender(cache, phrases, synthesize, voice, rate, extension="mp3"):
+    """Synthesize the phrases missing from the cache on a background thread
+
+    Args:
+        cache: TTSCache to fill
+        phrases: Fixed phrases the assistant says often
+        synthesize: Function text -> audio bytes
+        voice, rate: Voice settings the phrases will be spoken with
+
+    Returns:
+        The started thread
+    """
+    def run():
+        rendered = 0
+        for phrase in phrases:
+            if (phrase, voice, rate) in cache:
+                continue
+            try:
+                cache.put(phrase, voice, rate, synthesize(phrase), extension)
+                rendered += 1
+            except Exception as e:
+                logger.error(f"Error pre-rendering '{phrase}': {e}")
+                return
+        if rendered:
+            logger.info(f"Pre-rendered {rendered} common phrases")
+
+    thread = threading.Thread(target=run, name="tts-prerender", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,213 @@
+"""
+Long-lived text-to-speech worker thread with a prioritized speech queue
+"""
+import os
+import time
+import queue
+import logging
+import itertools
+import threading
+import statistics
+import pyttsx3
+
+logger = logging.getLogger(__name__)
+
+# Utterance priorities: lower values are spoken first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+
+class Utterance:
+    """A queued piece of text and its timing"""
+
+    def __init__(self, text, priority=PRIORITY_NORMAL):
+        self.text = text
+        self.priority = priority
+        self.enqueued = time.perf_counter()
+        self.started = None
+        self.cancelled = False
+        self.done = threading.Event()
+
+    @property
+    def time_to_first_audio(self):
+        """Seconds from enqueue until the engine started speaking (None if it never did)"""
+        return self.started - self.enqueued if self.started else None
+
+    def wait(self, timeout=None):
+        """Block until the utterance has been spoken, skipped or interrupted"""
+        return self.done.wait(timeout)
+
+
+class SpeechWorker:
+    """Owns one initialized pyttsx3 engine and speaks queued utterances in order
+
+    The engine is created and the voice chosen once, on the worker thread.
+    say() only enqueues, so callers never wait for synthesis; use wait_until_idle()
+    where the assistant must not talk over itself (e.g. before listening).
+    If the engine cannot be created, utterances go to fallback (a blocking
+    function text -> None, e.g. Google TTS) when one is given.
+    """
+
+    def __init__(self, rate=150, engine_factory=None, fallback=None):
+        self.rate = rate
+        self.engine_factory = engine_factory or self._init_engine
+        self.fallback = fallback
+        self.queue = queue.PriorityQueue()
+        self.sequence = itertools.count()
+        self.current = None
+        self.interrupt_requested = False
+        self.idle = threading.Event()
+        self.idle.set()
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.first_audio_times = []
+
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+        self.thread.start()
+
+    def _init_engine(self):
+        """Create the engine, set the rate and pick an Indian English voice once"""
+        engine = pyttsx3.init()
+        engine.setProperty("rate", self.rate)
+
+        voice_found = False
+        for voice in engine.getProperty('voices'):
+            if "indian" in voice.name.lower() or "en-in" in voice.id.lower():
+                engine.setProperty('voice', voice.id)
+                voice_found = True
+                break
+        if not voice_found:
+            logger.info("No Indian English voice found, using default voice")
+        return engine
+
+    def _on_started(self, name):
+        if self.current and self.current.started is None:
+            self.current.started = time.perf_counter()
+
+    def _on_word(self, name, location, length):
+        # pyttsx3 can only be stopped safely from its own callbacks
+        if self.interrupt_requested:
+            self.engine.stop()
+
+    def _run(self):
+        # The SAPI5 driver on Windows is COM based and needs COM on this thread
+        com = None
+        if os.name == 'nt':
+            try:
+                import comtypes
+                comtypes.CoInitialize()
+                com = comtypes
+            except Exception as e:
+                logger.error(f"Error initializing COM for the TTS engine: {e}")
+        try:
+            self._init()
+            self._serve()
+        finally:
+            if com:
+                com.CoUninitialize()
+
+    def _init(self):
+        try:
+            self.engine = self.engine_factory()
+            self.engine.connect('started-utterance', self._on_started)
+            self.engine.connect('started-word', self._on_word)
+        except Exception as e:
+            logger.error(f"Error initializing TTS engine: {e}")
+            self.engine = None
+        self.ready.set()
+
+    def _serve(self):
+        while True:
+            _, _, utterance = self.queue.get()
+            if utterance is None:
+                break
+            try:
+                if utterance.cancelled:
+                    continue
+                self.current = utterance
+                if self.engine:
+                    self.interrupt_requested = False
+                    self.engine.say(utterance.text)
+                    self.engine.runAndWait()
+                    self._record(utterance)
+                elif self.fallback:
+                    self.fallback(utterance.text)
+                else:
+                    logger.error(f"No TTS engine, not speaking '{utterance.text}'")
+            except Exception as e:
+                logger.error(f"Error speaking '{utterance.text}': {e}")
+            finally:
+                self.current = None
+                utterance.done.set()
+                self._finished()
+
+    def _record(self, utterance):
+        """Log and keep the time to first audio of a spoken utterance"""
+        latency = utterance.time_to_first_audio
+        if latency is not None:
+            self.first_audio_times.append(latency)
+            logger.info(f"TTS time to first audio: {latency * 1000:.0f} ms ({utterance.text[:30]!r})")
+
+    def _finished(self):
+        with self.lock:
+            self.pending -= 1
+            if self.pending == 0:
+                self.idle.set()
+
+    def say(self, text, priority=PRIORITY_NORMAL):
+        """Queue text to be spoken and return its Utterance handle immediately"""
+        utterance = Utterance(text, priority)
+        with self.lock:
+            self.pending += 1
+            self.idle.clear()
+        self.queue.put((priority, next(self.sequence), utterance))
+        return utterance
+
+    def flush(self):
+        """Drop everything queued but not yet being spoken"""
+        while True:
+            try:
+                _, _, utterance = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if utterance is None:
+                # Keep the shutdown request
+                self.queue.put((PRIORITY_LOW + 1, next(self.sequence), None))
+                return
+            utterance.cancelled = True
+            utterance.done.set()
+            self._finished()
+
+    def interrupt(self):
+        """Stop the current utterance and drop the queue"""
+        self.flush()
+        if self.current:
+            self.interrupt_requested = True
+
+    def is_speaking(self):
+        """Whether anything is queued or being spoken"""
+        return not self.idle.is_set()
+
+    def wait_until_idle(self, timeout=None):
+        """Block until nothing is queued or being spoken"""
+        return self.idle.wait(timeout)
+
+    def get_stats(self):
+        """Time-to-first-audio statistics in milliseconds"""
+        times = self.first_audio_times
+        if not times:
+            return {"utterances": 0}
+        return {
+            "utterances": len(times),
+            "median_ms": statistics.median(times) * 1000,
+            "max_ms": max(times) * 1000
+        }
+
+    def close(self, drain=True, timeout=10):
+        """Stop the worker, by default after finishing what is queued"""
+        if not drain:
+            self.interrupt()
+        self.queue.put((PRIORITY_LOW + 1, next(self.sequence), None))
+        self.thread.join(timeout)
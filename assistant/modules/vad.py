@@ -0,0 +1,214 @@
+"""
+Frame-level voice activity detection and adaptive endpointing
+"""
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Frame length fed to the detectors (10, 20 or 30 ms for WebRTC VAD)
+FRAME_MS = 30
+
+
+class FrameRingBuffer:
+    """Re-frames arbitrary PCM chunks into fixed-size frames
+
+    Incoming chunks of any length are pushed in; complete frames are popped
+    out in order. The last few popped frames are kept in a bounded ring so the
+    audio just before speech onset can be included in the segment.
+    """
+
+    def __init__(self, sample_rate, sample_width=2, frame_ms=FRAME_MS, history_ms=300):
+        self.frame_bytes = int(sample_rate * frame_ms / 1000) * sample_width
+        self.frame_seconds = frame_ms / 1000
+        self.ready = deque()
+        self.history = deque(maxlen=max(1, int(history_ms // frame_ms)))
+        self.pending = b""
+
+    def push(self, chunk):
+        """Add PCM data, queueing every complete frame it produces"""
+        self.pending += chunk
+        while len(self.pending) >= self.frame_bytes:
+            self.ready.append(self.pending[:self.frame_bytes])
+            self.pending = self.pending[self.frame_bytes:]
+
+    def pop(self):
+        """Next complete frame, or None if more data is needed"""
+        if not self.ready:
+            return None
+        frame = self.ready.popleft()
+        self.history.append(frame)
+        return frame
+
+    def pre_roll(self):
+        """The most recently popped frames, oldest first"""
+        return list(self.history)
+
+    def clear(self):
+        self.ready.clear()
+        self.history.clear()
+        self.pending = b""
+
+
+class SpeechDetector:
+    """Decides whether a single frame contains speech"""
+
+    name = "base"
+
+    def is_speech(self, frame):
+        raise NotImplementedError
+
+
+class WebRTCDetector(SpeechDetector):
+    """Google's WebRTC VAD (GMM based, very cheap); needs the webrtcvad package"""
+
+    name = "webrtc"
+
+    def __init__(self, sample_rate, aggressiveness=2):
+        try:
+            import webrtcvad
+        except ImportError:
+            raise RuntimeError("webrtcvad is not installed; run 'pip install webrtcvad'")
+        if sample_rate not in (8000, 16000, 32000, 48000):
+            raise RuntimeError(f"WebRTC VAD does not support {sample_rate} Hz audio")
+        self.vad = webrtcvad.Vad(aggressiveness)
+        self.sample_rate = sample_rate
+
+    def is_speech(self, frame):
+        return self.vad.is_speech(frame, self.sample_rate)
+
+
+class SpectralDetector(SpeechDetector):
+    """Speech-band energy against a tracked noise floor, gated by spectral flatness
+
+    Noise is usually spread evenly across the spectrum (flat) while voiced
+    speech concentrates energy in the 300-3400 Hz band, so this copes with
+    steady background noise better than a plain energy threshold.
+    """
+
+    name = "spectral"
+
+    def __init__(self, sample_rate, snr_db=9.0, max_flatness=0.5):
+        import numpy as np
+        self.np = np
+        self.sample_rate = sample_rate
+        self.snr = 10 ** (snr_db / 10)
+        self.max_flatness = max_flatness
+        self.noise_floor = None
+        self._band = None
+
+    def _band_mask(self, frame_length):
+        """Boolean mask of FFT bins inside the speech band"""
+        if self._band is None or len(self._band) != frame_length // 2 + 1:
+            freqs = self.np.fft.rfftfreq(frame_length, 1.0 / self.sample_rate)
+            self._band = (freqs >= 300) & (freqs <= 3400)
+        return self._band
+
+    def is_speech(self, frame):
+        np = self.np
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        if not len(samples):
+            return False
+        spectrum = np.abs(np.fft.rfft(samples * np.hanning(len(samples)))) ** 2 + 1e-10
+        band = spectrum[self._band_mask(len(samples))]
+        energy = float(band.mean())
+        flatness = float(np.exp(np.log(band).mean()) / band.mean())
+
+        if self.noise_floor is None:
+            self.noise_floor = energy
+        speech = energy > self.noise_floor * self.snr and flatness < self.max_flatness
+
+        # Track the noise floor: follow quickly downwards, slowly upwards, never during speech
+        if not speech:
+            rate = 0.3 if energy < self.noise_floor else 0.05
+            self.noise_floor += rate * (energy - self.noise_floor)
+        return speech
+
+
+SPEECH_DETECTORS = {
+    WebRTCDetector.name: WebRTCDetector,
+    SpectralDetector.name: SpectralDetector,
+}
+
+
+def create_detector(name, sample_rate):
+    """Create a speech detector, using the spectral detector if name is unavailable"""
+    try:
+        return SPEECH_DETECTORS[name](sample_rate)
+    except (KeyError, RuntimeError) as e:
+        if name == SpectralDetector.name:
+            raise
+        logger.warning(f"VAD '{name}' unavailable ({e}), using spectral detector")
+        return SpectralDetector(sample_rate)
+
+
+class Endpointer:
+    """Turns per-frame speech decisions into utterance start and end
+
+    Speech starts once most of a short window of frames is voiced. The amount
+    of trailing silence that ends an utterance adapts to the speaker: pauses
+    seen inside utterances are tracked, and the end-of-utterance silence is set
+    a little above them, within [min_silence, max_silence].
+    """
+
+    def __init__(self, detector, frame_seconds=FRAME_MS / 1000, start_window=5, start_voiced=3,
+                 initial_silence=0.4, min_silence=0.25, max_silence=0.8, min_speech=0.2):
+        self.detector = detector
+        self.frame_seconds = frame_seconds
+        self.start_window = start_window
+        self.start_voiced = start_voiced
+        self.min_silence = min_silence
+        self.max_silence = max_silence
+        self.min_speech = min_speech
+
+        # Typical pause inside an utterance, learned across turns
+        self.pause_estimate = initial_silence / 1.5
+        self.reset()
+
+    def reset(self):
+        """Prepare for the next utterance"""
+        self.recent = deque(maxlen=self.start_window)
+        self.in_speech = False
+        self.speech_frames = 0
+        self.silence_frames = 0
+
+    @property
+    def end_silence(self):
+        """Seconds of silence that currently end an utterance"""
+        return min(self.max_silence, max(self.min_silence, 1.5 * self.pause_estimate))
+
+    def process(self, frame):
+        """Feed one frame
+
+        Returns:
+            'start' when speech begins, 'end' when the utterance is over,
+            'discard' when what started was too short to be speech, else None
+        """
+        voiced = self.detector.is_speech(frame)
+
+        if not self.in_speech:
+            self.recent.append(voiced)
+            if sum(self.recent) >= self.start_voiced:
+                self.in_speech = True
+                self.speech_frames = sum(self.recent)
+                self.silence_frames = 0
+                return "start"
+            return None
+
+        if voiced:
+            if self.silence_frames:
+                # A pause that speech resumed after: learn from its length
+                pause = self.silence_frames * self.frame_seconds
+                self.pause_estimate = 0.8 * self.pause_estimate + 0.2 * pause
+            self.silence_frames = 0
+            self.speech_frames += 1
+            return None
+
+        self.silence_frames += 1
+        if self.silence_frames * self.frame_seconds >= self.end_silence:
+            if self.speech_frames * self.frame_seconds < self.min_speech:
+                # Too short to be an utterance (a click or cough): keep waiting
+                self.reset()
+                return "discard"
+            return "end"
+        return None
@@ -0,0 +1,110 @@
+"""
+Low-CPU keyword spotters for wake-word listening
+"""
+import os
+import json
+import struct
+import logging
+from .asr_backends import VOSK_MODEL_PATH
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordSpotter:
+    """Decides, frame by frame, whether the wake word has just been said
+
+    Frames are frame_ms long, 16-bit mono PCM at the session sample rate.
+    """
+
+    name = "base"
+    frame_ms = 30
+
+    def process(self, frame):
+        """Feed one frame; True when the wake word was detected"""
+        raise NotImplementedError
+
+    def reset(self):
+        """Forget partial state, e.g. after a stretch of silence"""
+
+
+class PorcupineSpotter(KeywordSpotter):
+    """Picovoice Porcupine: a tiny always-on keyword model (needs pvporcupine and an access key)
+
+    keyword is one of pvporcupine.KEYWORDS (e.g. "jarvis") or the path of a
+    custom .ppn keyword file. The access key is read from PICOVOICE_ACCESS_KEY.
+    """
+
+    name = "porcupine"
+
+    def __init__(self, sample_rate, keyword="jarvis", sensitivity=0.5):
+        try:
+            import pvporcupine
+        except ImportError:
+            raise RuntimeError("pvporcupine is not installed; run 'pip install pvporcupine'")
+        access_key = os.environ.get("PICOVOICE_ACCESS_KEY")
+        if not access_key:
+            raise RuntimeError("Set PICOVOICE_ACCESS_KEY to use Porcupine")
+        if keyword.endswith(".ppn"):
+            keyword_args = {"keyword_paths": [keyword]}
+        elif keyword in pvporcupine.KEYWORDS:
+            keyword_args = {"keywords": [keyword]}
+        else:
+            raise RuntimeError(f"'{keyword}' is not a built-in Porcupine keyword")
+        self.porcupine = pvporcupine.create(access_key=access_key, sensitivities=[sensitivity], **keyword_args)
+        if self.porcupine.sample_rate != sample_rate:
+            raise RuntimeError(f"Porcupine needs {self.porcupine.sample_rate} Hz audio, got {sample_rate} Hz")
+        self.frame_ms = 1000 * self.porcupine.frame_length / sample_rate
+        self.unpack = struct.Struct(f"<{self.porcupine.frame_length}h").unpack
+
+    def process(self, frame):
+        return self.porcupine.process(self.unpack(frame)) >= 0
+
+
+class VoskSpotter(KeywordSpotter):
+    """Vosk restricted to a one-phrase grammar, so decoding stays cheap"""
+
+    name = "vosk"
+
+    def __init__(self, sample_rate, keyword="zenith", model_path=VOSK_MODEL_PATH):
+        try:
+            import vosk
+        except ImportError:
+            raise RuntimeError("vosk is not installed; run 'pip install vosk'")
+        if not os.path.isdir(model_path):
+            raise RuntimeError(f"Vosk model not found at {model_path}")
+        vosk.SetLogLevel(-1)
+        self.keyword = keyword.lower()
+        self.model = vosk.Model(model_path)
+        self.recognizer = vosk.KaldiRecognizer(self.model, sample_rate, json.dumps([self.keyword, "[unk]"]))
+
+    def process(self, frame):
+        if self.recognizer.AcceptWaveform(frame):
+            text = json.loads(self.recognizer.Result()).get("text", "")
+        else:
+            text = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        if self.keyword in text:
+            self.recognizer.Reset()
+            return True
+        return False
+
+    def reset(self):
+        self.recognizer.Reset()
+
+
+KEYWORD_SPOTTERS = {
+    PorcupineSpotter.name: PorcupineSpotter,
+    VoskSpotter.name: VoskSpotter,
+}
+
+
+def create_spotter(name, sample_rate, keyword=None):
+    """Create a keyword spotter
+
+    Raises:
+        RuntimeError: If the spotter or its model is unavailable
+    """
+    if name not in KEYWORD_SPOTTERS:
+        raise RuntimeError(f"Unknown keyword spotter '{name}'")
+    if keyword:
+        return KEYWORD_SPOTTERS[name](sample_rate, keyword)
+    return KEYWORD_SPOTTERS[name](sample_rate)
@@ -0,0 +1,252 @@
+"""
+Weather forecasts from pluggable providers, cached per city
+"""
+import os
+import re
+import time
+import logging
+from .http_client import get_client
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Provider used by get_weather_service: "auto" (OpenWeatherMap when WEATHER_API_KEY
+# is set, otherwise Open-Meteo), "openweathermap" or "open-meteo"
+WEATHER_PROVIDER = "auto"
+
+# Forecasts are reused for this long per city
+WEATHER_CACHE_TTL = 600  # seconds
+
+OPENWEATHERMAP_URL = "https://api.openweathermap.org/data/2.5/weather"
+OPEN_METEO_GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
+OPEN_METEO_FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+
+# WMO weather interpretation codes used by Open-Meteo
+WMO_DESCRIPTIONS = {
+    0: "clear sky", 1: "mainly clear", 2: "partly cloudy", 3: "overcast",
+    45: "fog", 48: "freezing fog",
+    51: "light drizzle", 53: "drizzle", 55: "heavy drizzle",
+    61: "light rain", 63: "rain", 65: "heavy rain",
+    66: "freezing rain", 67: "heavy freezing rain",
+    71: "light snow", 73: "snow", 75: "heavy snow", 77: "snow grains",
+    80: "light showers", 81: "showers", 82: "violent showers",
+    85: "snow showers", 86: "heavy snow showers",
+    95: "thunderstorm", 96: "thunderstorm with hail", 99: "thunderstorm with heavy hail"
+}
+
+# Words around the city name in a weather command
+WEATHER_FILLER = re.compile(
+    r"\b(what'?s|what is|how'?s|how is|tell me|the|weather|forecast|like|in|for|at|today|now|right|please)\b"
+)
+
+
+class Forecast:
+    """Current conditions and today's range for a city (temperatures in °C, wind in km/h)"""
+
+    def __init__(self, city, description, temperature, feels_like=None, high=None, low=None,
+                 humidity=None, wind_speed=None, provider=None):
+        self.city = city
+        self.description = description
+        self.temperature = temperature
+        self.feels_like = feels_like
+        self.high = high
+        self.low = low
+        self.humidity = humidity
+        self.wind_speed = wind_speed
+        self.provider = provider
+        self.fetched = time.time()
+
+    def summary(self):
+        """The forecast as a sentence to speak"""
+        parts = [f"In {self.city} it's {round(self.temperature)} degrees with {self.description}"]
+        if self.feels_like is not None and abs(self.feels_like - self.temperature) >= 2:
+            parts[0] += f", feeling like {round(self.feels_like)}"
+        parts[0] += "."
+        if self.high is not None and self.low is not None:
+            parts.append(f"Today's high is {round(self.high)} and the low is {round(self.low)}.")
+        if self.humidity is not None:
+            parts.append(f"Humidity is {round(self.humidity)} percent.")
+        if self.wind_speed is not None:
+            parts.append(f"Wind is {round(self.wind_speed)} kilometers per hour.")
+        return " ".join(parts)
+
+    def __repr__(self):
+        return f"Forecast({self.city!r}, {self.description!r}, {self.temperature})"
+
+
+class WeatherProvider:
+    """Fetches a Forecast for a city
+
+    Subclasses implement fetch(). Base URLs are constructor arguments so a
+    local stand-in server can take the place of the real service.
+    """
+
+    name = "base"
+
+    def __init__(self, client=None):
+        self.client = client
+
+    def _get_json(self, url, params):
+        response = (self.client or get_client()).get(url, params=params)
+        if response.status_code == 404:
+            raise LookupError(f"Unknown city for {self.name}")
+        response.raise_for_status()
+        return response.json()
+
+    def fetch(self, city):
+        """Return the Forecast for city
+
+        Raises:
+            LookupError: If the provider does not know the city
+            requests.RequestException, ValueError: If the service fails or answers garbage
+        """
+        raise NotImplementedError
+
+
+class OpenWeatherMapProvider(WeatherProvider):
+    """OpenWeatherMap current weather (one request, needs WEATHER_API_KEY)"""
+
+    name = "openweathermap"
+
+    def __init__(self, api_key=None, url=OPENWEATHERMAP_URL, client=None):
+        super().__init__(client)
+        self.api_key = api_key or os.environ.get("WEATHER_API_KEY")
+        if not self.api_key:
+            raise RuntimeError("OpenWeatherMap needs an API key. Run setup_api_keys.py to set WEATHER_API_KEY")
+        self.url = url
+
+    def fetch(self, city):
+        data = self._get_json(self.url, {"q": city, "appid": self.api_key, "units": "metric"})
+        main = data["main"]
+        return Forecast(
+            city=data.get("name") or city,
+            description=data["weather"][0]["description"],
+            temperature=main["temp"],
+            feels_like=main.get("feels_like"),
+            # main.temp_max/temp_min are the spread of current readings across the
+            # area, not today's forecast range, so no high or low is reported
+            high=None,
+            low=None,
+            humidity=main.get("humidity"),
+            wind_speed=data.get("wind", {}).get("speed", 0) * 3.6,  # m/s
+            provider=self.name
+        )
+
+
+class OpenMeteoProvider(WeatherProvider):
+    """Open-Meteo geocoding plus forecast (no API key; coordinates are remembered per city)"""
+
+    name = "open-meteo"
+
+    def __init__(self, geocoding_url=OPEN_METEO_GEOCODING_URL, forecast_url=OPEN_METEO_FORECAST_URL, client=None):
+        super().__init__(client)
+        self.geocoding_url = geocoding_url
+        self.forecast_url = forecast_url
+        self.locations = {}  # city -> (name, latitude, longitude)
+
+    def locate(self, city):
+        """(name, latitude, longitude) of the best match for city"""
+        key = city.lower()
+        if key not in self.locations:
+            data = self._get_json(self.geocoding_url, {"name": city, "count": 1})
+            if not data.get("results"):
+                raise LookupError(f"Unknown city for {self.name}: {city}")
+            place = data["results"][0]
+            self.locations[key] = (place["name"], place["latitude"], place["longitude"])
+        return self.locations[key]
+
+    def fetch(self, city):
+        name, latitude, longitude = self.locate(city)
+        data = self._get_json(self.forecast_url, {
+            "latitude": latitude,
+            "longitude": longitude,
+            "current": "temperature_2m,apparent_temperature,relative_humidity_2m,weather_code,wind_speed_10m",
+            "daily": "temperature_2m_max,temperature_2m_min",
+            "forecast_days": 1,
+            "timezone": "auto"
+        })
+        current = data["current"]
+        daily = data.get("daily", {})
+        return Forecast(
+            city=name,
+            description=WMO_DESCRIPTIONS.get(current.get("weather_code"), "mixed conditions"),
+            temperature=current["temperature_2m"],
+            feels_like=current.get("apparent_temperature"),
+            high=(daily.get("temperature_2m_max") or [None])[0],
+            low=(daily.get("temperature_2m_min") or [None])[0],
+            humidity=current.get("relative_humidity_2m"),
+            wind_speed=current.get("wind_speed_10m"),  # km/h by default
+            provider=self.name
+        )
+
+
+WEATHER_PROVIDERS = {
+    "openweathermap": OpenWeatherMapProvider,
+    "open-meteo": OpenMeteoProvider,
+}
+
+def create_provider(name="auto", **kwargs):
+    """Create a weather provider by name
+
+    Raises:
+        RuntimeError: If the provider is unknown or not configured
+    """
+    if name == "auto":
+        name = "openweathermap" if os.environ.get("WEATHER_API_KEY") else "open-meteo"
+    if name not in WEATHER_PROVIDERS:
+        raise RuntimeError(f"Unknown weather provider '{name}'. Choose from: {', '.join(WEATHER_PROVIDERS)}")
+    return WEATHER_PROVIDERS[name](**kwargs)
+
+
+def normalize_city(city):
+    """Cache key of a city name"""
+    return " ".join(re.sub(r"[^\w\s-]", " ", city.lower()).split())
+
+def extract_city(command):
+    """City named in a weather command ("what's the weather in New Delhi today" -> "new delhi")"""
+    return normalize_city(WEATHER_FILLER.sub(" ", command.lower()))
+
+
+class WeatherService:
+    """Forecasts from a provider, reused per city for ttl seconds"""
+
+    def __init__(self, provider, ttl=WEATHER_CACHE_TTL, clock=time.monotonic):
+        self.provider = provider
+        self.cache = TTLCache(ttl=ttl, max_items=32, clock=clock)
+
+    def is_cached(self, city):
+        return normalize_city(city) in self.cache
+
+    def get_forecast(self, city):
+        """Forecast for city, from the cache when fresh; None if it cannot be fetched"""
+        key = normalize_city(city)
+        if not key:
+            return None
+        forecast = self.cache.get(key)
+        if forecast is not None:
+            # The entry may expire between get and age
+            age = self.cache.age(key)
+            logger.info(f"Weather for {key} from cache" + (f" ({age:.0f} s old)" if age is not None else ""))
+            return forecast
+        try:
+            forecast = self.provider.fetch(city)
+        except Exception as e:
+            logger.warning(f"{self.provider.name} weather for {city} failed: {e}")
+            return None
+        self.cache.put(key, forecast)
+        return forecast
+
+
+# Service shared by the assistant
+_service = None
+
+def get_weather_service():
+    """Get the shared weather service, or None if no provider can be created"""
+    global _service
+    if _service is None:
+        try:
+            _service = WeatherService(create_provider(WEATHER_PROVIDER))
+        except RuntimeError as e:
+            logger.warning(f"Weather provider unavailable: {e}")
+            return None
+    return _service
@@ -1,55 +1,215 @@
 import webbrowser
 import re
-import requests
 import json
-from bs4 import BeautifulSoup
+import html as html_lib
 from ..modules.speech_utils import speak
+from .http_client import get_client, Prefetch
+from .ttl_cache import TTLCache
+from .page_text import read_page_text
+from .search_aggregator import get_search_aggregator, spoken_answer
 
-def get_youtube_video_url(search_query, video_index=0):
-    """Get the video URL from YouTube search results based on index"""
+def prewarm_connection(url="https://www.google.com"):
+    """Open a keep-alive connection to a host ahead of the real request"""
     try:
-        # Clean up the search query
-        search_query = re.sub(r'[^\w\s]', '', search_query)
-        search_query = re.sub(r'\s+', '+', search_query)
-        
-        # Create search URL
-        search_url = f"https://www.youtube.com/results?search_query={search_query}"
-        
-        # Send request to get search results
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(search_url, headers=headers)
-        
-        if response.status_code == 200:
-            # Modern approach to extract video IDs
-            video_ids = re.findall(r"watch\?v=(\S{11})", response.text)
-            
-            # Remove duplicates while preserving order
-            unique_video_ids = []
-            for video_id in video_ids:
-                if video_id not in unique_video_ids:
-                    unique_video_ids.append(video_id)
-            
-            if unique_video_ids and len(unique_video_ids) > video_index:
-                # Get the video URL at the specified index
-                video_url = f"https://www.youtube.com/watch?v={unique_video_ids[video_index]}"
-                return video_url
-            
-            # Fallback to old method if no videos found
-            soup = BeautifulSoup(response.text, 'html.parser')
-            video_elements = soup.find_all('a', href=re.compile(r'/watch\?v='))
-            
-            if video_elements and len(video_elements) > video_index:
-                # Get the video URL at the specified index
-                href = video_elements[video_index]['href']
-                if href.startswith('/watch'):
-                    video_url = f"https://www.youtube.com{href}"
-                    return video_url
+        get_client().head(url, timeout=3)
+    except Exception as e:
+        print(f"Error pre-warming connection: {e}")
+
+# Parsed YouTube results per normalized query, so follow-ups need no new fetch
+YOUTUBE_CACHE_TTL = 600  # seconds
+_youtube_results = TTLCache(ttl=YOUTUBE_CACHE_TTL, max_items=32)
+
+# Query and index of the video played last ("play the next video")
+_last_youtube = {"query": None, "index": 0}
+
+# Words and numbers that pick a video from the results (0-based index)
+ORDINAL_INDEX = {
+    'first': 0, '1st': 0,
+    'second': 1, '2nd': 1,
+    'third': 2, '3rd': 2,
+    'fourth': 3, '4th': 3,
+    'fifth': 4, '5th': 4,
+    'one': 0, 'two': 1, 'three': 2, 'four': 3, 'five': 4
+}
+
+# Words that refer to the previously played video
+FOLLOWUP_WORDS = {"next", "another", "again", "same", "repeat"}
+
+# Words a follow-up may contain without naming a new search ("play that video again")
+FOLLOWUP_FILLER = {"that", "this", "a", "an", "me"}
+
+# Characters of page text read out as a search summary
+SUMMARY_CHARS = 200
+
+# Parser for page text: "auto" (lxml if installed), "lxml" or "html.parser"
+HTML_PARSER = "auto"
+
+# Words that introduce the query of a search command
+SEARCH_COMMAND = re.compile(r'^(please\s+)?(search(\s+the\s+web|\s+google)?(\s+for)?|google|look\s+up)\s+')
+
+# Start of the JSON YouTube embeds in its pages
+YT_INITIAL_DATA = re.compile(r'(?:var ytInitialData|window\["ytInitialData"\])\s*=\s*')
+
+# A video result in the embedded JSON, for pages where it cannot be decoded whole
+VIDEO_RENDERER = re.compile(r'"videoRenderer":\{"videoId":"([\w-]{11})"')
+VIDEO_TITLE = re.compile(r'"title":\{"runs":\[\{"text":"((?:[^"\\]|\\.)*)"')
+VIDEO_LENGTH = re.compile(r'"lengthText":\{.*?"simpleText":"([\d:]+)"')
+
+def normalize_query(query):
+    """Lower-case query with punctuation removed and single spaces"""
+    query = re.sub(r'[^\w\s]', '', query.lower())
+    return re.sub(r'\s+', ' ', query).strip()
+
+def _json_string(raw):
+    """Decode the escapes of a JSON string body"""
+    try:
+        return json.loads(f'"{raw}"')
+    except ValueError:
+        return raw
+
+def _initial_data(html):
+    """The ytInitialData object of a YouTube page, decoded without parsing the HTML"""
+    match = YT_INITIAL_DATA.search(html)
+    if not match:
+        return None
+    try:
+        data, _ = json.JSONDecoder().raw_decode(html, match.end())
+    except ValueError:
+        return None
+    return data
+
+def _video_renderers(data):
+    """videoRenderer objects of ytInitialData in page order"""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            renderer = node.get("videoRenderer")
+            if isinstance(renderer, dict) and renderer.get("videoId"):
+                yield renderer
+            stack.extend(reversed([value for key, value in node.items() if key != "videoRenderer"]))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+def _text(field):
+    """Text of a YouTube text object ({"simpleText": ...} or {"runs": [...]})"""
+    if not isinstance(field, dict):
+        return None
+    if "simpleText" in field:
+        return field["simpleText"]
+    runs = field.get("runs")
+    return "".join(run.get("text", "") for run in runs) if runs else None
+
+def _scan_video_renderers(html):
+    """Results found by scanning the embedded JSON text with regular expressions"""
+    results = []
+    seen = set()
+    matches = list(VIDEO_RENDERER.finditer(html))
+    for i, match in enumerate(matches):
+        video_id = match.group(1)
+        if video_id in seen:
+            continue
+        seen.add(video_id)
+        # Details of this video come before the next videoRenderer
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(html)
+        block = html[match.end():end]
+        title = VIDEO_TITLE.search(block)
+        length = VIDEO_LENGTH.search(block)
+        results.append({
+            'id': video_id,
+            'title': _json_string(title.group(1)) if title else None,
+            'duration': length.group(1) if length else None
+        })
+    return results
+
+def parse_youtube_results(html):
+    """Video results of a YouTube results page in order
+    
+    IDs, titles and durations all come from the ytInitialData JSON embedded in
+    the page, so neither a DOM parse nor a fetch of each watch page is needed.
+    
+    Returns:
+        list of {'id', 'title', 'duration'} dicts (title/duration may be None)
+    """
+    results = []
+    seen = set()
+    data = _initial_data(html)
+    if data is not None:
+        for renderer in _video_renderers(data):
+            video_id = renderer["videoId"]
+            if video_id in seen:
+                continue
+            seen.add(video_id)
+            results.append({
+                'id': video_id,
+                'title': _text(renderer.get("title")),
+                'duration': _text(renderer.get("lengthText"))
+            })
+        if results:
+            return results
+    
+    results = _scan_video_renderers(html)
+    if results:
+        return results
+    
+    # Fallback: any watch links in the page
+    for video_id in re.findall(r"watch\?v=([\w-]{11})", html):
+        if video_id not in seen:
+            seen.add(video_id)
+            results.append({'id': video_id, 'title': None, 'duration': None})
+    return results
+
+def get_youtube_results(search_query):
+    """Parsed results for a search query, fetched once per YOUTUBE_CACHE_TTL"""
+    key = normalize_query(search_query)
+    results = _youtube_results.get(key)
+    if results is not None:
+        return results
+    
+    # Create search URL
+    search_url = f"https://www.youtube.com/results?search_query={key.replace(' ', '+')}"
+    
+    # Send request to get search results
+    response = get_client().get(search_url)
+    if response.status_code != 200:
+        return []
+    results = parse_youtube_results(response.text)
+    if results:
+        _youtube_results.put(key, results)
+    return results
+
+def get_youtube_video(search_query, video_index=0):
+    """The search result at video_index ({'id', 'title', 'duration', 'url'}), or None"""
+    try:
+        results = get_youtube_results(search_query)
+        if len(results) > video_index:
+            video = dict(results[video_index])
+            video['url'] = f"https://www.youtube.com/watch?v={video['id']}"
+            return video
     except Exception as e:
         print(f"Error getting video URL: {e}")
     return None
 
+def get_youtube_video_url(search_query, video_index=0):
+    """Get the video URL from YouTube search results based on index"""
+    video = get_youtube_video(search_query, video_index)
+    return video['url'] if video else None
+
+def _cached_video(video_id):
+    """A result with this id from any cached search, or None"""
+    for results in _youtube_results.values():
+        for result in results:
+            if result['id'] == video_id and result['title']:
+                return result
+    return None
+
+def page_title(html):
+    """Title of a YouTube page from its <title>, without parsing the whole page"""
+    title_match = re.search(r'<title>(.*?)</title>', html, re.S)
+    if not title_match:
+        return None
+    return html_lib.unescape(title_match.group(1)).replace(' - YouTube', '').strip()
+
 def get_video_info(video_url):
     """Get information about a YouTube video"""
     try:
@@ -59,25 +219,23 @@ def get_video_info(video_url):
         # Extract video ID
         video_id = re.search(r'watch\?v=(\S{11})', video_url).group(1)
         
+        # Videos from a cached search are known already
+        cached = _cached_video(video_id)
+        if cached:
+            return {
+                'id': video_id,
+                'url': video_url,
+                'title': cached['title']
+            }
+        
         # Get video info
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(video_url, headers=headers)
+        response = get_client().get(video_url)
         
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Try to get title
-            title = None
-            title_tag = soup.find('title')
-            if title_tag:
-                title = title_tag.text.replace(' - YouTube', '')
-            
             return {
                 'id': video_id,
                 'url': video_url,
-                'title': title
+                'title': page_title(response.text)
             }
     except Exception as e:
         print(f"Error getting video info: {e}")
@@ -87,18 +245,8 @@ def extract_video_index(command):
     """Extract video index from command (e.g., 'first', 'second', '1st', '2nd', etc.)"""
     command = command.lower()
     
-    # Dictionary mapping words to numbers
-    number_words = {
-        'first': 0, '1st': 0,
-        'second': 1, '2nd': 1,
-        'third': 2, '3rd': 2,
-        'fourth': 3, '4th': 3,
-        'fifth': 4, '5th': 4,
-        'one': 0, 'two': 1, 'three': 2, 'four': 3, 'five': 4
-    }
-    
     # Look for number words in the command
-    for word, index in number_words.items():
+    for word, index in ORDINAL_INDEX.items():
         if word in command:
             return index
             
@@ -119,41 +267,84 @@ def extract_youtube_query(command):
         "find", "video", "videos", "on youtube", "of", "the"
     ]
     
-    query = command
-    for phrase in phrases_to_remove:
-        query = query.replace(phrase, " ")
+    # Whole words only, so "another" keeps its "the"
+    pattern = r'\b(' + '|'.join(re.escape(phrase) for phrase in phrases_to_remove) + r')\b'
+    query = re.sub(pattern, " ", command)
     
     # Clean up the query
     query = re.sub(r'\s+', ' ', query).strip()
     
     return query
 
-def play_youtube_video(command):
-    """Play a YouTube video based on the command"""
-    # Extract search query
-    search_query = extract_youtube_query(command)
+def resolve_youtube_followup(command):
+    """Query and index for a follow-up such as "play the second video" or "next video"
     
+    Returns:
+        (query, index) of the video to play from the last search, or None if
+        the command is not a follow-up (or there is nothing to follow up on)
+    """
+    last_query = _last_youtube["query"]
+    if not last_query or last_query not in _youtube_results:
+        return None
+    if "video" not in command.lower():
+        return None
+    words = [word for word in extract_youtube_query(command).split() if word not in FOLLOWUP_FILLER]
+    if not words or any(word not in ORDINAL_INDEX and word not in FOLLOWUP_WORDS and not word.isdigit()
+                        for word in words):
+        return None
+    
+    if "next" in words or "another" in words:
+        return last_query, _last_youtube["index"] + 1
+    if any(word in FOLLOWUP_WORDS for word in words):
+        return last_query, _last_youtube["index"]
+    return last_query, extract_video_index(command)
+
+def youtube_request(command):
+    """Query, video index and whether the command follows up on the last search"""
+    followup = resolve_youtube_followup(command)
+    if followup:
+        return followup[0], followup[1], True
+    return extract_youtube_query(command), extract_video_index(command), False
+
+def prefetch_youtube(command):
+    """Start looking up the video a command asks for, or None if it names no video"""
+    search_query, video_index, _ = youtube_request(command)
+    if not search_query:
+        return None
+    return Prefetch(f"YouTube '{search_query}'", get_youtube_video, search_query, video_index)
+
+def play_youtube_video(command, prefetch=None):
+    """Play a YouTube video based on the command
+    
+    Args:
+        command (str): The spoken command
+        prefetch (Prefetch): Lookup already started by prefetch_youtube, if any
+    """
+    # Picked from the results of the previous search on a follow-up
+    search_query, video_index, followup = youtube_request(command)
     if not search_query:
         speak("What would you like to play on YouTube?")
         return False
     
-    speak(f"Searching for {search_query} on YouTube...")
+    # Fetch while the acknowledgement is spoken
+    if prefetch is None:
+        prefetch = prefetch_youtube(command)
+    if not followup:
+        speak(f"Searching for {search_query} on YouTube...")
+    # The results page already has the title: one request per command
+    video = prefetch.result()
     
-    # Extract video index if specified
-    video_index = extract_video_index(command)
-    video_url = get_youtube_video_url(search_query, video_index)
-    
-    if video_url:
-        # Get video info
-        video_info = get_video_info(video_url)
+    if video:
+        _last_youtube["query"] = normalize_query(search_query)
+        _last_youtube["index"] = video_index
         
-        if video_info and video_info['title']:
-            speak(f"Playing '{video_info['title']}' on YouTube")
+        if video['title']:
+            speak(f"Playing '{video['title']}' on YouTube")
         else:
             speak("Playing the video on YouTube")
             
         # Open the video in the browser
-        webbrowser.open(video_url)
+        webbrowser.open(video['url'])
         return True
     else:
         speak("Sorry, I couldn't find the video. Opening search results instead...")
@@ -175,44 +366,49 @@ def clean_text(text):
 def extract_search_result(url):
     """Extract readable content from a webpage"""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-            
-        # Get text and clean it
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        # Get first 200 characters for a summary
-        summary = text[:200] + "..."
+        # Stream the page and stop reading once the summary has enough text
+        response = get_client().get(url, stream=True)
+        text, _ = read_page_text(response, SUMMARY_CHARS, HTML_PARSER)
+
+        summary = text + "..."
         return clean_text(summary)
     except Exception as e:
         print(f"Error extracting content: {e}")
         return None
 
-def search_web(query, speak_result=False):
+def get_search_url(query):
+    # For demonstration, we'll use a simple Google search
+    return f"https://www.google.com/search?q={query}"
+
+def extract_search_query(command):
+    """The query of a search command ("search the web for python decorators" -> "python decorators")"""
+    query = SEARCH_COMMAND.sub("", command.lower().strip())
+    return re.sub(r'\s+(on the web|online|on google)$', '', query).strip() or command
+
+def search_summary(query):
+    """Spoken answer from the search sources that reply within the deadline, or None"""
+    answer = spoken_answer(get_search_aggregator().search(query))
+    return clean_text(answer) if answer else None
+
+def prefetch_summary(query):
+    """Start fetching the spoken summary of a search in the background"""
+    return Prefetch(f"Search '{query}'", search_summary, query)
+
+def search_web(query, speak_result=False, summary=None):
     """
     Search the web and optionally speak the results
     
     Args:
         query (str): Search query
         speak_result (bool): Whether to speak the search results
+        summary (Prefetch): Summary fetch already started by prefetch_summary, if any
     """
     try:
-        # For demonstration, we'll use a simple Google search
-        search_url = f"https://www.google.com/search?q={query}"
+        search_url = get_search_url(query)
         
         if speak_result:
             # Try to get readable content
-            content = extract_search_result(search_url)
+            content = (summary or prefetch_summary(query)).result()
             if content:
                 speak(content)
             else:
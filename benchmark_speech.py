@@ -0,0 +1,487 @@
+import os
+import sys
+import glob
+import json
+import math
+import time
+import wave
+import argparse
+import statistics
+import speech_recognition as sr
+from assistant.modules.speech_utils import (
+    speak, speak_stream, iter_sentences, split_for_speech, play_pipelined, synthesize_google, get_google_tts
+)
+from assistant.modules.google_tts import decode_wav
+from assistant.modules.tts_worker import SpeechWorker
+from assistant.modules.asr_backends import ASR_BACKENDS, create_backend, word_error_rate
+from assistant.modules.audio_capture import CaptureSession
+from assistant.modules.audio_sources import WavReplaySource
+from assistant.modules.command_routing import get_command_category
+from assistant.modules.vad import SPEECH_DETECTORS
+from assistant.modules.wake_word import KEYWORD_SPOTTERS, create_spotter
+
+DEFAULT_PROMPTS = [
+    "User: What can you help me with today?\nAssistant:",
+    "User: Tell me something interesting about space.\nAssistant:",
+    "User: How should I start learning Python?\nAssistant:",
+]
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+DEFAULT_PASSAGES = [
+    "Python is a high-level, general-purpose programming language. Its design philosophy emphasizes "
+    "code readability with the use of significant indentation. Python is dynamically typed and "
+    "garbage-collected, and it supports multiple programming paradigms, including structured, "
+    "object-oriented and functional programming. It is often described as a batteries included "
+    "language due to its comprehensive standard library.",
+    "CPU usage is at 23 percent with 8 cores running at 2.4 gigahertz. Memory usage is at 61 percent, "
+    "with 9.8 gigabytes used out of 16 gigabytes. The system drive has 120 gigabytes free, and the "
+    "battery is at 80 percent and charging.",
+]
+
+def summarize(label, samples):
+    """Print the median and spread of a list of timings in seconds"""
+    if not samples:
+        print(f"{label}: no samples")
+        return
+    print(
+        f"{label}: median {statistics.median(samples) * 1000:.0f} ms, "
+        f"p90 {percentile(samples, 0.9) * 1000:.0f} ms, "
+        f"min {min(samples) * 1000:.0f} ms, max {max(samples) * 1000:.0f} ms"
+    )
+
+def bench_generation(args):
+    """Compare time-to-first-audio of blocking and streamed GPT-2 responses"""
+    from assistant.modules.huggingface_utils import HuggingFaceHelper
+
+    hf = HuggingFaceHelper()
+    speak_fn = speak if args.speak else (lambda sentence: None)
+    blocking, streaming = [], []
+
+    for _ in range(args.runs):
+        for prompt in DEFAULT_PROMPTS:
+            # Blocking: the whole generation finishes before anything is spoken
+            start = time.perf_counter()
+            text = hf.generate_response(prompt, max_length=args.max_length)
+            sentences = list(iter_sentences([text[len(prompt):]]))
+            blocking.append(time.perf_counter() - start)
+            for sentence in sentences:
+                speak_fn(sentence)
+
+            # Streaming: the first sentence is spoken while the rest is generated
+            chunks = hf.generate_response(prompt, max_length=args.max_length, stream=True)
+            first_audio = speak_stream(chunks, speak_fn=speak_fn)
+            if first_audio is not None:
+                streaming.append(first_audio)
+
+    summarize("Blocking time to first audio", blocking)
+    summarize("Streaming time to first audio", streaming)
+
+def bench_tts(args):
+    """Compare time to first audio and total time of whole-string and chunked speech"""
+    passages = DEFAULT_PASSAGES
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            passages = [p.strip() for p in f.read().split("\n\n") if p.strip()]
+
+    results = {"whole": ([], []), "chunked": ([], [])}
+    if args.voice == "local":
+        worker = SpeechWorker(rate=150)
+        for _ in range(args.runs):
+            for passage in passages:
+                for mode, chunks in (("whole", [passage]), ("chunked", split_for_speech(passage))):
+                    start = time.perf_counter()
+                    utterances = [worker.say(chunk) for chunk in chunks]
+                    utterances[-1].wait()
+                    if utterances[0].time_to_first_audio is not None:
+                        results[mode][0].append(utterances[0].time_to_first_audio)
+                    results[mode][1].append(time.perf_counter() - start)
+        worker.close()
+    else:
+        def play(audio):
+            if args.play:
+                get_google_tts().play(audio)
+                return
+            # Headless: stand in for playback with the clip length
+            pcm, sample_rate, sample_width, channels = decode_wav(audio)
+            time.sleep(len(pcm) / (sample_rate * sample_width * channels))
+
+        for _ in range(args.runs):
+            for passage in passages:
+                for mode, chunks in (("whole", [passage]), ("chunked", split_for_speech(passage))):
+                    first_audio, total = play_pipelined(chunks, synthesize_google, play)
+                    results[mode][0].append(first_audio)
+                    results[mode][1].append(total)
+
+    for mode, (first_audio, total) in results.items():
+        summarize(f"{mode:<8} time to first audio", first_audio)
+        summarize(f"{mode:<8} total time", total)
+
+def load_recordings(directory):
+    """Load (name, AudioData, reference transcript) for every WAV with a .txt beside it"""
+    recordings = []
+    for wav_path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        transcript_path = os.path.splitext(wav_path)[0] + ".txt"
+        if not os.path.exists(transcript_path):
+            print(f"Skipping {wav_path}: no transcript")
+            continue
+        with open(transcript_path, encoding="utf-8") as f:
+            reference = f.read().strip()
+        with sr.AudioFile(wav_path) as source:
+            audio = sr.Recognizer().record(source)
+        recordings.append((os.path.basename(wav_path), audio, reference))
+    return recordings
+
+def bench_asr(args):
+    """Compare word error rate and real-time factor of ASR backends on recordings"""
+    recordings = load_recordings(args.recordings)
+    if not recordings:
+        print(f"No recordings with transcripts found in {args.recordings}")
+        return
+
+    print(f"{'backend':<10} {'WER':>6} {'RTF':>6} {'median ms':>10}")
+    for name in args.backends:
+        try:
+            backend = create_backend(name, fallback=None)
+        except sr.RequestError as e:
+            print(f"{name:<10} unavailable: {e}")
+            continue
+
+        errors, factors, latencies = [], [], []
+        for file_name, audio, reference in recordings:
+            duration = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+            start = time.perf_counter()
+            try:
+                hypothesis = backend.transcribe(audio)
+            except sr.RequestError as e:
+                print(f"{name}: {file_name} failed: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            errors.append(word_error_rate(reference, hypothesis))
+            factors.append(elapsed / duration)
+            latencies.append(elapsed)
+            if args.verbose:
+                print(f"  {name} {file_name}: '{hypothesis}' (reference '{reference}')")
+
+        if errors:
+            print(
+                f"{name:<10} {statistics.mean(errors):>6.2f} {statistics.mean(factors):>6.2f} "
+                f"{statistics.median(latencies) * 1000:>10.0f}"
+            )
+
+def bench_vad(args):
+    """Compare end-of-utterance latency and false cuts of energy and VAD endpointing
+
+    Each WAV needs a .json file beside it with "speech_end", the time in
+    seconds at which the speaker finished the command.
+    """
+    labelled = []
+    for wav_path in sorted(glob.glob(os.path.join(args.recordings, "*.wav"))):
+        label_path = os.path.splitext(wav_path)[0] + ".json"
+        if os.path.exists(label_path):
+            with open(label_path, encoding="utf-8") as f:
+                labelled.append((wav_path, json.load(f)["speech_end"]))
+    if not labelled:
+        print(f"No recordings with .json labels found in {args.recordings}")
+        return
+
+    with wave.open(labelled[0][0], "rb") as wav:
+        sample_rate = wav.getframerate()
+
+    print(f"{'endpointer':<10} {'median EOU ms':>14} {'p90 EOU ms':>11} {'false cuts':>11}")
+    for mode in ["energy"] + args.detectors:
+        if mode != "energy":
+            # CaptureSession would silently fall back to the spectral detector
+            try:
+                SPEECH_DETECTORS[mode](sample_rate)
+            except RuntimeError as e:
+                print(f"{mode:<10} unavailable: {e}")
+                continue
+        latencies, false_cuts = [], 0
+        for wav_path, speech_end in labelled:
+            session = CaptureSession(source=WavReplaySource(wav_path, speed=0), vad=None if mode == "energy" else mode)
+            session.open(calibration_duration=0)
+            audio = session.listen()
+            session.close()
+            if audio is None or session.position < speech_end - args.tolerance:
+                false_cuts += 1
+            else:
+                latencies.append(session.position - speech_end)
+
+        if latencies:
+            print(
+                f"{mode:<10} {statistics.median(latencies) * 1000:>14.0f} {percentile(latencies, 0.9) * 1000:>11.0f} "
+                f"{false_cuts:>5}/{len(labelled)}"
+            )
+        else:
+            print(f"{mode:<10} {'-':>14} {'-':>11} {false_cuts:>5}/{len(labelled)}")
+
+def bench_wake(args):
+    """Compare CPU use of wake-word listening with recognizing every utterance
+
+    CPU time is measured per second of audio over every WAV in the directory
+    (ambient recordings show idle cost). WAVs with a .json file holding
+    "wake_end", the time the wake word finished, also give detection latency.
+    """
+    wav_paths = sorted(glob.glob(os.path.join(args.recordings, "*.wav")))
+    if not wav_paths:
+        print(f"No recordings found in {args.recordings}")
+        return
+    try:
+        spotter = create_spotter(args.engine, 16000, args.keyword)
+    except RuntimeError as e:
+        print(f"Keyword spotter unavailable: {e}")
+        return
+    backend = create_backend(args.backend, fallback=None)
+
+    audio_seconds = 0.0
+    wake_cpu = always_cpu = 0.0
+    recognitions = 0
+    latencies, misses = [], 0
+    for wav_path in wav_paths:
+        label_path = os.path.splitext(wav_path)[0] + ".json"
+        wake_end = None
+        if os.path.exists(label_path):
+            with open(label_path, encoding="utf-8") as f:
+                wake_end = json.load(f).get("wake_end")
+
+        # Wake-word mode: only the keyword spotter runs until it fires
+        session = CaptureSession(source=WavReplaySource(wav_path, speed=0)).open(calibration_duration=0)
+        start = time.process_time()
+        detections = []
+        while session.wait_for_wake_word(spotter):
+            detections.append(session.position)
+        wake_cpu += time.process_time() - start
+        audio_seconds += session.position
+        session.close()
+        if wake_end is not None:
+            if detections:
+                latencies.append(detections[0] - wake_end)
+            else:
+                misses += 1
+
+        # Current loop: every utterance is endpointed and sent to the recognizer
+        session = CaptureSession(source=WavReplaySource(wav_path, speed=0)).open(calibration_duration=0)
+        start = time.process_time()
+        while True:
+            audio = session.listen()
+            if audio is None:
+                break
+            recognitions += 1
+            try:
+                backend.transcribe(audio)
+            except sr.RequestError:
+                pass
+        always_cpu += time.process_time() - start
+        session.close()
+
+    print(f"Audio: {audio_seconds:.1f} s in {len(wav_paths)} recordings")
+    print(f"Wake word ({args.engine}): {100 * wake_cpu / audio_seconds:.2f}% CPU")
+    print(f"Always recognize ({args.backend}): {100 * always_cpu / audio_seconds:.2f}% CPU, {recognitions} recognitions")
+    if latencies or misses:
+        summarize("Wake word detection latency", latencies)
+        print(f"Missed wake words: {misses}/{len(latencies) + misses}")
+
+def bench_replay(args):
+    """Replay recordings through the whole speech front end and time each stage
+
+    Every WAV is streamed into a capture session at --speed (1.0 is real
+    time), which calibrates, endpoints and recognizes it, and the transcript
+    is routed to a command category. Optional files beside each WAV: .txt
+    with the transcript (for WER), .json with "speech_end" in seconds (for
+    endpointing latency) and "category" (for routing accuracy).
+    """
+    wav_paths = sorted(glob.glob(os.path.join(args.recordings, "*.wav")))
+    if not wav_paths:
+        print(f"No recordings found in {args.recordings}")
+        return
+    backend = create_backend(args.backend, fallback=None)
+
+    stages = {"calibration": [], "endpointing": [], "recognition": [], "routing": [], "total": []}
+    errors, routed, correct = [], 0, 0
+    for wav_path in wav_paths:
+        base = os.path.splitext(wav_path)[0]
+        labels = {}
+        if os.path.exists(base + ".json"):
+            with open(base + ".json", encoding="utf-8") as f:
+                labels = json.load(f)
+
+        session = CaptureSession(source=WavReplaySource(wav_path, speed=args.speed), vad=args.vad)
+        start = time.perf_counter()
+        session.open(calibration_duration=args.calibration)
+        stages["calibration"].append(time.perf_counter() - start)
+
+        audio = session.listen()
+        heard_at = time.perf_counter()
+        session.close()
+        if audio is None:
+            print(f"  {os.path.basename(wav_path)}: no speech detected")
+            continue
+        # Trailing audio consumed after the speaker stopped, converted to wall time;
+        # calibration reads whole chunks that listen() does not count
+        endpointing = None
+        if "speech_end" in labels:
+            calibrated = int(args.calibration / session.seconds_per_buffer) * session.seconds_per_buffer
+            position = calibrated + session.position
+            endpointing = max(0.0, position - labels["speech_end"]) / (args.speed or 1.0)
+            stages["endpointing"].append(endpointing)
+
+        try:
+            text = backend.transcribe(audio)
+        except sr.RequestError as e:
+            print(f"  {os.path.basename(wav_path)}: recognition failed ({e})")
+            continue
+        recognized_at = time.perf_counter()
+        stages["recognition"].append(recognized_at - heard_at)
+
+        category = get_command_category(text) if text else None
+        stages["routing"].append(time.perf_counter() - recognized_at)
+        if endpointing is not None:
+            stages["total"].append(endpointing + time.perf_counter() - heard_at)
+
+        if os.path.exists(base + ".txt"):
+            with open(base + ".txt", encoding="utf-8") as f:
+                errors.append(word_error_rate(f.read().strip(), text))
+        if "category" in labels:
+            routed += 1
+            correct += category == labels["category"]
+        if args.verbose:
+            print(f"  {os.path.basename(wav_path)}: '{text}' -> {category}")
+
+    for stage, samples in stages.items():
+        summarize(f"{stage:<12}", samples)
+    if errors:
+        print(f"WER: {statistics.mean(errors):.2f} over {len(errors)} recordings")
+    if routed:
+        print(f"Routing accuracy: {correct}/{routed}")
+
+# Extra intent labels used when a run asks for more intents than the dataset has
+EXTRA_INTENTS = [
+    "set_reminder", "send_message", "read_email", "set_alarm", "open_calendar", "tell_joke",
+    "translate_text", "calculate", "navigate", "order_food", "call_contact", "shopping_list",
+]
+
+def bench_intent(args):
+    """Time batched zero-shot intent scoring against one forward pass per intent
+
+    Commands come from the training dataset. Latency is measured for each
+    intent count; with --calibrate the softmax temperature is fitted on half
+    of the commands and its effect on the other half is reported.
+    """
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+    from assistant.modules.huggingface_utils import ZeroShotIntentClassifier
+
+    with open(args.dataset, encoding="utf-8") as f:
+        dataset = json.load(f)
+    categories = list(dataset["categories"])
+    commands = dataset["commands"][::max(1, len(dataset["commands"]) // args.commands)][:args.commands]
+    classifier = ZeroShotIntentClassifier(
+        AutoTokenizer.from_pretrained(args.model),
+        AutoModelForSequenceClassification.from_pretrained(args.model)
+    )
+    classifier.classify("warm up", categories)
+
+    print(f"{'intents':>7} {'batched ms':>11} {'per-intent ms':>14} {'speed-up':>9}")
+    for count in args.counts:
+        intents = (categories + EXTRA_INTENTS)[:count]
+        batched, sequential = [], []
+        for command in commands:
+            start = time.perf_counter()
+            classifier.classify(command["text"], intents)
+            batched.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            for intent in intents:
+                classifier.entailment_logits(command["text"], [intent])
+            sequential.append(time.perf_counter() - start)
+        print(
+            f"{count:>7} {statistics.median(batched) * 1000:>11.0f} {statistics.median(sequential) * 1000:>14.0f} "
+            f"{statistics.median(sequential) / statistics.median(batched):>8.1f}x"
+        )
+
+    if args.calibrate:
+        labelled = [(c["text"], c["category"]) for c in commands if c["category"] in categories]
+        fit, held_out = labelled[::2], labelled[1::2]
+
+        def evaluate():
+            losses, correct = [], 0
+            for text, category in held_out:
+                scores = classifier.classify(text, categories)["scores"]
+                losses.append(-math.log(max(scores[category], 1e-12)))
+                correct += max(scores, key=scores.get) == category
+            return statistics.mean(losses), correct
+
+        classifier.temperature = 1.0
+        loss, correct = evaluate()
+        print(f"temperature 1.00: NLL {loss:.3f}, accuracy {correct}/{len(held_out)}")
+        temperature = classifier.calibrate(fit, categories)
+        loss, correct = evaluate()
+        print(f"temperature {temperature:.2f}: NLL {loss:.3f}, accuracy {correct}/{len(held_out)}")
+
+def main():
+    """Benchmark the speech front end and back end"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generation = subparsers.add_parser("generation", help=bench_generation.__doc__)
+    generation.add_argument("--runs", type=int, default=3)
+    generation.add_argument("--max-length", type=int, default=60)
+    generation.add_argument("--speak", action="store_true", help="Speak the sentences instead of timing only")
+    generation.set_defaults(func=bench_generation)
+
+    tts = subparsers.add_parser("tts", help=bench_tts.__doc__)
+    tts.add_argument("--voice", default="local", choices=["local", "google"])
+    tts.add_argument("--file", help="Text file of passages separated by blank lines")
+    tts.add_argument("--runs", type=int, default=1)
+    tts.add_argument("--play", action="store_true", help="Play Google audio instead of waiting for its length")
+    tts.set_defaults(func=bench_tts)
+
+    asr = subparsers.add_parser("asr", help=bench_asr.__doc__)
+    asr.add_argument("recordings", help="Directory of WAV files with matching .txt transcripts")
+    asr.add_argument("--backends", nargs="+", default=list(ASR_BACKENDS), choices=list(ASR_BACKENDS))
+    asr.add_argument("--verbose", action="store_true")
+    asr.set_defaults(func=bench_asr)
+
+    vad = subparsers.add_parser("vad", help=bench_vad.__doc__.splitlines()[0])
+    vad.add_argument("recordings", help="Directory of WAV files with .json speech_end labels")
+    vad.add_argument("--detectors", nargs="+", default=list(SPEECH_DETECTORS), choices=list(SPEECH_DETECTORS))
+    vad.add_argument("--tolerance", type=float, default=0.05, help="Seconds an endpoint may precede speech_end")
+    vad.set_defaults(func=bench_vad)
+
+    wake = subparsers.add_parser("wake", help=bench_wake.__doc__.splitlines()[0])
+    wake.add_argument("recordings", help="Directory of WAV files, optionally with .json wake_end labels")
+    wake.add_argument("--engine", default="vosk", choices=list(KEYWORD_SPOTTERS))
+    wake.add_argument("--keyword", default=None, help="Wake word (engine default if omitted)")
+    wake.add_argument("--backend", default="google", choices=list(ASR_BACKENDS))
+    wake.set_defaults(func=bench_wake)
+
+    replay = subparsers.add_parser("replay", help=bench_replay.__doc__.splitlines()[0])
+    replay.add_argument("recordings", help="Directory of WAV files, optionally with .txt and .json labels")
+    replay.add_argument("--speed", type=float, default=1.0, help="Replay speed (1.0 real time, 0 unthrottled)")
+    replay.add_argument("--backend", default="google", choices=list(ASR_BACKENDS))
+    replay.add_argument("--vad", default="spectral", help="VAD for endpointing, or 'none' for the energy threshold")
+    replay.add_argument("--calibration", type=float, default=0.5, help="Seconds of audio used for calibration")
+    replay.add_argument("--verbose", action="store_true")
+    replay.set_defaults(func=bench_replay)
+
+    intent = subparsers.add_parser("intent", help=bench_intent.__doc__.splitlines()[0])
+    intent.add_argument("--dataset", default=os.path.join("assistant", "training_data", "command_dataset.json"))
+    intent.add_argument("--model", default="facebook/bart-large-mnli")
+    intent.add_argument("--commands", type=int, default=20, help="Number of dataset commands to classify")
+    intent.add_argument("--counts", type=int, nargs="+", default=[2, 4, 8, 16], help="Intent counts to time")
+    intent.add_argument("--calibrate", action="store_true", help="Fit the softmax temperature and compare")
+    intent.set_defaults(func=bench_intent)
+
+    args = parser.parse_args()
+    if getattr(args, "vad", None) == "none":
+        args.vad = None
+    try:
+        args.func(args)
+    except KeyboardInterrupt:
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
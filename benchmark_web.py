@@ -0,0 +1,298 @@
+import os
+import re
+import sys
+import glob
+import time
+import argparse
+from bs4 import BeautifulSoup
+from assistant.modules import http_client, web_search
+from assistant.modules.http_client import HTTPClient
+from assistant.modules.http_fixtures import FixtureStore, ReplayServer, record, replay
+from assistant.modules.weather import get_weather_service
+from assistant.modules.news import NewsService, HeadlineStore
+from assistant.modules.search_aggregator import get_search_aggregator
+from assistant.modules.web_search import parse_youtube_results, page_title, SUMMARY_CHARS
+from assistant.modules.page_text import extract_text, available_parsers, STREAM_CHUNK
+from benchmark_speech import summarize
+
+def legacy_resolve(results_html, watch_html):
+    """The previous resolution: regex the results page (full parse if that fails), then parse the watch page"""
+    video_ids = list(dict.fromkeys(re.findall(r"watch\?v=(\S{11})", results_html)))
+    if not video_ids:
+        soup = BeautifulSoup(results_html, 'html.parser')
+        video_ids = [a['href'][9:20] for a in soup.find_all('a', href=re.compile(r'/watch\?v='))]
+    title = None
+    if watch_html is not None:
+        title_tag = BeautifulSoup(watch_html, 'html.parser').find('title')
+        if title_tag:
+            title = title_tag.text.replace(' - YouTube', '')
+    return (video_ids[0] if video_ids else None), title
+
+def bench_youtube(args):
+    """Compare YouTube resolution from embedded JSON with results regex plus watch page parse
+
+    Each recorded results page NAME.html may have the watch page of its first
+    result saved as NAME.watch.html. Network cost is modeled as --rtt per request.
+    """
+    pages = [p for p in sorted(glob.glob(os.path.join(args.pages, "*.html"))) if not p.endswith(".watch.html")]
+    if not pages:
+        print(f"No recorded results pages found in {args.pages}")
+        return
+    rtt = args.rtt / 1000
+
+    legacy_parse, legacy_total, new_parse, new_total = [], [], [], []
+    titled = 0
+    for path in pages:
+        with open(path, encoding="utf-8") as f:
+            results_html = f.read()
+        watch_path = path[:-len(".html")] + ".watch.html"
+        watch_html = None
+        if os.path.exists(watch_path):
+            with open(watch_path, encoding="utf-8") as f:
+                watch_html = f.read()
+
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            legacy_resolve(results_html, watch_html)
+            elapsed = time.perf_counter() - start
+            legacy_parse.append(elapsed)
+            legacy_total.append(elapsed + 2 * rtt)
+
+            start = time.perf_counter()
+            results = parse_youtube_results(results_html)
+            elapsed = time.perf_counter() - start
+            new_parse.append(elapsed)
+            new_total.append(elapsed + rtt)
+        titled += bool(results and results[0]['title'])
+
+    print(f"{len(pages)} pages, titles found in results for {titled}")
+    summarize("Legacy parse (results + watch page)", legacy_parse)
+    summarize("Embedded JSON parse", new_parse)
+    summarize(f"Legacy total (2 requests at {args.rtt:.0f} ms)", legacy_total)
+    summarize(f"Embedded JSON total (1 request at {args.rtt:.0f} ms)", new_total)
+
+def legacy_extract(html):
+    """The previous summary extraction: full parse, drop scripts, flatten all text"""
+    soup = BeautifulSoup(html, 'html.parser')
+    for script in soup(["script", "style"]):
+        script.decompose()
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)[:SUMMARY_CHARS]
+
+def bench_extract(args):
+    """Compare bytes read and CPU time of streaming page text extraction with a full parse"""
+    pages = sorted(glob.glob(os.path.join(args.pages, "*.html")))
+    if not pages:
+        print(f"No saved pages found in {args.pages}")
+        return
+
+    legacy_cpu, stream_cpu = [], []
+    legacy_bytes = stream_bytes = 0
+    for path in pages:
+        with open(path, "rb") as f:
+            page = f.read()
+        chunks = [page[i:i + args.chunk] for i in range(0, len(page), args.chunk)]
+
+        for _ in range(args.runs):
+            start = time.process_time()
+            legacy_text = legacy_extract(page.decode("utf-8", errors="replace"))
+            legacy_cpu.append(time.process_time() - start)
+
+            start = time.process_time()
+            text, bytes_read = extract_text(chunks, SUMMARY_CHARS)
+            stream_cpu.append(time.process_time() - start)
+        legacy_bytes += len(page)
+        stream_bytes += bytes_read
+
+        if args.verbose:
+            print(f"{os.path.basename(path)}: read {bytes_read} of {len(page)} bytes")
+            print(f"  full parse: {legacy_text[:80]}")
+            print(f"  streaming:  {text[:80]}")
+
+    print(f"{len(pages)} pages, {args.chunk} byte chunks")
+    print(f"Bytes read: full parse {legacy_bytes}, streaming {stream_bytes} "
+          f"({100 * stream_bytes / max(legacy_bytes, 1):.0f}%)")
+    summarize("Full parse CPU", legacy_cpu)
+    summarize("Streaming CPU", stream_cpu)
+
+def bench_parsers(args):
+    """Run the web search HTML code paths over saved pages with each installed parser"""
+    pages = sorted(glob.glob(os.path.join(args.pages, "*.html")))
+    if not pages:
+        print(f"No saved pages found in {args.pages}")
+        return
+    parsers = available_parsers()
+    print(f"{len(pages)} pages, parsers: {', '.join(parsers)}")
+
+    timings = {name: [] for name in parsers}
+    youtube_times, title_times = [], []
+    mismatches = 0
+    for path in pages:
+        with open(path, "rb") as f:
+            page = f.read()
+        html = page.decode("utf-8", errors="replace")
+        chunks = [page[i:i + args.chunk] for i in range(0, len(page), args.chunk)]
+
+        texts = {}
+        for name in parsers:
+            for _ in range(args.runs):
+                start = time.process_time()
+                texts[name], _ = extract_text(chunks, args.chars, parser=name)
+                timings[name].append(time.process_time() - start)
+        if len(set(texts.values())) > 1:
+            mismatches += 1
+            print(f"{os.path.basename(path)}: parsers disagree")
+            for name, text in texts.items():
+                print(f"  {name}: {text[:80]}")
+
+        for _ in range(args.runs):
+            start = time.process_time()
+            parse_youtube_results(html)
+            youtube_times.append(time.process_time() - start)
+
+            start = time.process_time()
+            page_title(html)
+            title_times.append(time.process_time() - start)
+
+    for name in parsers:
+        summarize(f"Page text ({name})", timings[name])
+    summarize("YouTube results (embedded JSON)", youtube_times)
+    summarize("Page title", title_times)
+    print(f"Extraction differs between parsers on {mismatches} of {len(pages)} pages")
+    return mismatches
+
+# (kind, query) pairs covering the web path: YouTube, weather, news and a plain search
+DEFAULT_WEB_QUERIES = [
+    ("youtube", "lofi beats"),
+    ("youtube", "python tutorial"),
+    ("weather", "London"),
+    ("search", "weather in London today"),
+    ("news", "feeds"),
+    ("search", "latest news headlines today"),
+    ("search", "python programming language"),
+]
+
+def run_web_query(kind, query):
+    """Fetch and parse what a command of this kind would, returning the text it would speak"""
+    if kind == "youtube":
+        web_search._youtube_results.clear()
+        video = web_search.get_youtube_video(query)
+        return video['title'] if video else None
+    if kind == "news":
+        # An empty in-memory store, so every configured feed is fetched and parsed
+        service = NewsService(store=HeadlineStore(path=None), client=http_client.get_client())
+        service.poll()
+        return service.summary()
+    if kind == "weather":
+        service = get_weather_service()
+        if service is None:
+            return None  # no provider configured; the cause is logged
+        service.cache.clear()
+        forecast = service.get_forecast(query)
+        return forecast.summary() if forecast else None
+    # Every configured search source, ranked within SEARCH_DEADLINE
+    return web_search.search_summary(query)
+
+def web_queries(args):
+    if not args.query:
+        return DEFAULT_WEB_QUERIES
+    return [tuple(item.split(":", 1)) if ":" in item else ("search", item) for item in args.query]
+
+def bench_record(args):
+    """Fetch the web queries live once, saving every response as a fixture"""
+    client = HTTPClient()
+    store = record(client, args.fixtures)
+    http_client._client = client
+    try:
+        for kind, query in web_queries(args):
+            print(f"{kind} '{query}': {run_web_query(kind, query)}")
+    finally:
+        http_client._client = None
+    print(f"{len(store)} responses recorded in {args.fixtures}")
+
+def bench_web(args):
+    """Run the web queries against recorded fixtures with simulated latency and bandwidth"""
+    store = FixtureStore(args.fixtures)
+    if args.deadline:
+        get_search_aggregator().deadline = args.deadline
+    bandwidth = args.bandwidth * 1000 if args.bandwidth else None
+    with ReplayServer(store, latency=args.latency / 1000, bandwidth=bandwidth) as stand_in:
+        client = HTTPClient()
+        replay(client, stand_in)
+        http_client._client = client
+        timings = {}
+        answers = {}
+        try:
+            for _ in range(args.runs):
+                for kind, query in web_queries(args):
+                    start = time.perf_counter()
+                    answer = run_web_query(kind, query)
+                    timings.setdefault(kind, []).append(time.perf_counter() - start)
+                    answers.setdefault((kind, query), set()).add(answer)
+        finally:
+            http_client._client = None
+
+    print(f"{len(store)} fixtures, latency {args.latency:.0f} ms, "
+          f"bandwidth {f'{args.bandwidth:.0f} kB/s' if args.bandwidth else 'unlimited'}")
+    for (kind, query), results in answers.items():
+        print(f"{kind} '{query}': {' | '.join(str(result) for result in results)}")
+    for kind, samples in timings.items():
+        summarize(f"{kind} end to end", samples)
+    unstable = [key for key, results in answers.items() if len(results) > 1]
+    if stand_in.missing:
+        print(f"{len(stand_in.missing)} requests had no recorded response (re-run record)")
+    if unstable:
+        print(f"{len(unstable)} queries gave different answers between runs")
+    return len(stand_in.missing) + len(unstable)
+
+def main():
+    """Benchmark the web features"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    youtube = subparsers.add_parser("youtube", help=bench_youtube.__doc__.splitlines()[0])
+    youtube.add_argument("pages", help="Directory of recorded YouTube results pages")
+    youtube.add_argument("--rtt", type=float, default=150, help="Milliseconds per HTTP request")
+    youtube.add_argument("--runs", type=int, default=5)
+    youtube.set_defaults(func=bench_youtube)
+
+    extract = subparsers.add_parser("extract", help=bench_extract.__doc__)
+    extract.add_argument("pages", help="Directory of saved web pages")
+    extract.add_argument("--chunk", type=int, default=STREAM_CHUNK, help="Bytes per streamed read")
+    extract.add_argument("--runs", type=int, default=5)
+    extract.add_argument("--verbose", action="store_true", help="Print both summaries of each page")
+    extract.set_defaults(func=bench_extract)
+
+    parsers = subparsers.add_parser("parsers", help=bench_parsers.__doc__)
+    parsers.add_argument("pages", help="Directory of saved web pages")
+    parsers.add_argument("--chars", type=int, default=SUMMARY_CHARS,
+                         help="Characters of text to extract (raise to parse whole pages)")
+    parsers.add_argument("--chunk", type=int, default=STREAM_CHUNK, help="Bytes per streamed read")
+    parsers.add_argument("--runs", type=int, default=5)
+    parsers.set_defaults(func=bench_parsers)
+
+    recorder = subparsers.add_parser("record", help=bench_record.__doc__)
+    recorder.add_argument("fixtures", help="Directory to save responses in")
+    recorder.add_argument("--query", action="append", help="KIND:QUERY (youtube, weather, news or search), repeatable")
+    recorder.set_defaults(func=bench_record)
+
+    web = subparsers.add_parser("web", help=bench_web.__doc__)
+    web.add_argument("fixtures", help="Directory of recorded responses")
+    web.add_argument("--query", action="append", help="KIND:QUERY (youtube, weather, news or search), repeatable")
+    web.add_argument("--latency", type=float, default=100, help="Milliseconds before each response")
+    web.add_argument("--bandwidth", type=float, default=None, help="Kilobytes per second (default unlimited)")
+    web.add_argument("--deadline", type=float, default=None, help="Seconds for searches (default SEARCH_DEADLINE)")
+    web.add_argument("--runs", type=int, default=5)
+    web.set_defaults(func=bench_web)
+
+    args = parser.parse_args()
+    try:
+        failures = args.func(args)
+    except KeyboardInterrupt:
+        return 1
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,11 +2,22 @@ import os
 import sys
 import logging
 from datetime import datetime
-from assistant.modules.speech_utils import recognize_speech, speak
+from assistant.modules.speech_utils import (
+    recognize_speech, speak, speak_stream, wait_for_speech, wait_for_wake_word, prerender_common_phrases,
+    prerender_phrase, close_capture_session, close_speech_worker, STREAMING_RECOGNITION, WAKE_WORD_MODE
+)
 from assistant.modules.system_controls import control_system
-from assistant.modules.web_search import search_web
+from assistant.modules.command_routing import get_command_category
+from assistant.modules.web_search import (
+    search_web, prewarm_connection, play_youtube_video, prefetch_youtube, resolve_youtube_followup,
+    prefetch_summary, extract_search_query
+)
+from assistant.modules.http_client import get_client
+from assistant.modules.weather import extract_city
+from assistant.modules.news import get_news_service
 from assistant.modules.advanced_features import AdvancedFeatures
-from assistant.modules.ai_orchestrator import AIOrchestrator
+from assistant.modules.ai_orchestrator import AIOrchestrator, SELF_SPOKEN_CATEGORIES
+from assistant.modules.response_policy import RESPONSE_TEMPLATES
 
 # Set up logging
 logging.basicConfig(
@@ -25,56 +36,41 @@ logging.getLogger('urllib3').setLevel(logging.WARNING)
 logging.getLogger('nltk').setLevel(logging.WARNING)
 logging.getLogger('transformers').setLevel(logging.WARNING)
 
-def get_command_category(command):
-    """Determine the category of a command based on keywords"""
-    command = command.lower()
-    
-    # News commands (high priority)
-    if any(word in command for word in ["news", "headlines", "latest news"]):
-        return "info_request"
-    
-    # Weather commands (high priority)
-    if "weather" in command:
-        return "info_request"
-    
-    # Screenshot commands
-    if any(word in command for word in ["screenshot", "capture", "take a picture", "screen capture"]):
-        return "screenshot"
-    
-    # Media control commands
-    if any(word in command for word in ["pause", "stop", "next", "previous", "volume", "mute"]):
-        return "media_control"
-    
-    # Video commands
-    if any(word in command for word in ["play video", "watch video", "movie"]):
-        return "video_control"
-    
-    # Audio commands
-    if any(word in command for word in ["play music", "play song", "audio"]):
-        return "audio_control"
-    
-    # System commands
-    if any(word in command for word in ["open", "start", "launch", "close"]):
-        return "system_control"
-    
-    # Information commands
-    if any(word in command for word in ["cpu", "memory", "system"]):
-        return "info_request"
-    
-    # Web search (default fallback)
-    return "web_search"
+def start_web_fetch(command, category, advanced_features):
+    """Start the fetch a web-backed command needs, so it runs during enhancement and acknowledgement"""
+    lowered = command.lower()
+    if category == "youtube":
+        return prefetch_youtube(command)
+    if category == "web_search":
+        return prefetch_summary(extract_search_query(command))
+    if category == "info_request":
+        if "news" in lowered or "headlines" in lowered:
+            return advanced_features.prefetch_news()
+        if "weather" in lowered and extract_city(command):
+            return advanced_features.prefetch_weather(extract_city(command))
+    return None
 
 def process_command(command, advanced_features, ai_orchestrator):
     """Process user command with AI enhancement"""
     try:
+        ai_orchestrator.begin_turn()
+        
         # Get command category directly without AI preprocessing for these common commands
         if "news" in command.lower() or "headlines" in command.lower():
             category = "info_request"
+        elif "youtube" in command.lower() or resolve_youtube_followup(command):
+            category = "youtube"
         else:
             # Preprocess command with AI
             analysis = ai_orchestrator.preprocess_command(command)
             category = analysis["category"]
         
+        # Start web fetches as soon as the category is known
+        prefetch = start_web_fetch(command, category, advanced_features)
+        
+        # Keep or throw away work started from the partial transcript
+        ai_orchestrator.commit_speculation(category)
+        
         # Enhanced command processing
         enhanced = ai_orchestrator.enhance_command(command, category)
         sentiment = enhanced["sentiment"]
@@ -86,21 +82,23 @@ def process_command(command, advanced_features, ai_orchestrator):
         # Process command based on category
         success = False
         
-        if category == "info_request":
+        if category == "youtube":
+            success = play_youtube_video(command, prefetch)
+        elif category == "info_request":
             if "news" in command.lower() or "headlines" in command.lower():
-                speak("Getting the latest news...")
-                success = advanced_features.get_news()
+                success = advanced_features.get_news(prefetch)
             elif "weather" in command.lower():
-                city = command.lower().replace("weather", "").replace("in", "").strip()
+                city = extract_city(command)
                 if not city:
                     speak("Which city would you like to know the weather for?")
                     city = recognize_speech()
                 if city:
-                    success = advanced_features.get_weather_info(city)
+                    success = advanced_features.get_weather_info(city, prefetch)
             elif any(word in command for word in ["cpu", "memory", "system"]):
                 success = advanced_features.get_system_info()
         elif category == "web_search":
-            success = search_web(command)
+            # Answer from the search sources within SEARCH_DEADLINE, then open the results
+            success = search_web(extract_search_query(command), speak_result=True, summary=prefetch)
         elif category == "system_control":
             success = control_system(command)
         elif category in ["media_control", "audio_control", "video_control"]:
@@ -108,11 +106,15 @@ def process_command(command, advanced_features, ai_orchestrator):
         elif category == "screenshot":
             success = advanced_features.take_screenshot()
         
+        # Time from the final command to its action, compared across speculation hits and misses
+        if success:
+            ai_orchestrator.action_started()
+        
         # Generate natural response
         if success:
             response = enhanced["response"]
-            if not category in ["web_search", "info_request"]:  # Skip for web searches as they have their own speech
-                speak(response if response else "Command executed successfully!")
+            if not category in SELF_SPOKEN_CATEGORIES:  # Skip for web searches as they have their own speech
+                speak_stream(response if response else "Command executed successfully!")
         else:
             speak("I apologize, but I couldn't complete that task. Would you like to try something else?")
         
@@ -123,6 +125,24 @@ def process_command(command, advanced_features, ai_orchestrator):
         speak("I encountered an error. Please try again.")
         return False
 
+def register_prewarm_hooks(advanced_features, ai_orchestrator):
+    """Register work to start early when a partial command is recognized"""
+    # Categories process_command acts on (news and weather are handled under info_request)
+    for category in ["web_search", "info_request"]:
+        ai_orchestrator.register_prewarm(category, prewarm_connection)
+    for kind in ["video", "audio"]:
+        ai_orchestrator.register_prewarm(
+            f"{kind}_control",
+            lambda kind=kind: advanced_features.scan_media_library(kind),
+            lambda files, kind=kind: advanced_features.discard_media_scan(kind, files)
+        )
+    # Render the spoken confirmation into the TTS cache (a cached phrase is kept either way)
+    for category in RESPONSE_TEMPLATES:
+        ai_orchestrator.register_prewarm(
+            category,
+            lambda category=category: prerender_phrase(ai_orchestrator.response_policy.render_template(category))
+        )
+
 def main():
     """Main function with improved AI integration"""
     try:
@@ -130,6 +150,13 @@ def main():
         logger.info("Initializing AI Assistant...")
         advanced_features = AdvancedFeatures()
         ai_orchestrator = AIOrchestrator()
+        register_prewarm_hooks(advanced_features, ai_orchestrator)
+        prerender_common_phrases()
+        # Keep headlines fresh so "latest news" is answered from memory
+        get_news_service().start()
+        
+        # In streaming mode interim transcripts drive speculative pre-warming
+        on_partial = ai_orchestrator.speculate if STREAMING_RECOGNITION else None
         
         # Welcome with context-aware greeting
         current_hour = datetime.now().hour
@@ -146,8 +173,13 @@ def main():
         try:
             while True:
                 try:
+                    # In wake-word mode stay idle until the keyword is heard
+                    if WAKE_WORD_MODE and not wait_for_wake_word():
+                        continue
+                    
                     # Get user input
-                    command = recognize_speech()
+                    ai_orchestrator.begin_utterance()
+                    command = recognize_speech(on_partial=on_partial, flush=not WAKE_WORD_MODE)
                     if not command:
                         continue
                     
@@ -157,9 +189,11 @@ def main():
                     # Check for exit
                     if any(word in command.lower() for word in ["exit", "quit", "goodbye", "bye"]):
                         # Generate farewell based on interaction context
-                        context = ai_orchestrator.get_context()
-                        farewell = ai_orchestrator.generate_response("goodbye", context)
-                        speak(farewell if farewell else "Goodbye! Have a great day!")
+                        ai_orchestrator.begin_turn()
+                        farewell = ai_orchestrator.respond(
+                            command, "goodbye", ai_orchestrator.context_memory, stream=True
+                        )
+                        speak_stream(farewell if farewell else "Goodbye! Have a great day!")
                         break
                     
                     # Process command
@@ -179,11 +213,17 @@ def main():
             logger.info("Cleaning up resources...")
             advanced_features.cleanup()
             ai_orchestrator.cleanup()
+            close_capture_session()
+            close_speech_worker()
+            get_news_service().stop()
+            get_client().log_stats()
+            get_client(background=True).log_stats()
             logger.info("Cleanup completed")
             
     except Exception as e:
         logger.error(f"Fatal error: {e}")
         speak("I encountered a fatal error. Please restart the program.")
+        wait_for_speech(timeout=10)
         sys.exit(1)
 
 if __name__ == "__main__":
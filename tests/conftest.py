@@ -0,0 +1,118 @@
+import io
+import json
+import math
+import wave
+import random
+import struct
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+from assistant.modules import http_client, web_search
+from assistant.modules.ttl_cache import TTLCache
+
+# Videos listed on the results page built by the results_page fixture
+VIDEOS = [
+    ("abcdefghij1", "Lofi \"beats\" to study", "1:02:03"),
+    ("abcdefghij2", "Lofi mix", "45:10"),
+    ("abcdefghij3", "Jazz café", "3:33"),
+]
+
+def _start_server(routes):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_GET(self):
+            self.server.connections.add(self.client_address)
+            route = routes.get(self.path.split("?")[0])
+            if route is None:
+                status, headers, body = 404, {}, b"not found"
+            else:
+                status, headers, body = route(self)
+            try:
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client gave up (timeout tests)
+
+        def do_HEAD(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.connections = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+@pytest.fixture
+def start_server():
+    """Serve routes ({path: handler(request) -> (status, headers, body)}) on a local port
+
+    Calling the fixture returns the server and its base URL. Servers are shut
+    down after the test; call server.shutdown() to stop one earlier.
+    """
+    servers = []
+
+    def start(routes):
+        server, base = _start_server(routes)
+        servers.append(server)
+        return server, base
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def make_wav():
+    """Build an in-memory 16 kHz WAV from ('noise'|'tone', seconds[, tone amplitude]) segments"""
+    def build(segments, rate=16000):
+        rng = random.Random(0)
+        samples = []
+        for kind, seconds, *amplitude in segments:
+            amplitude = amplitude[0] if amplitude else 6000
+            for i in range(int(rate * seconds)):
+                if kind == "tone":
+                    samples.append(int(amplitude * math.sin(2 * math.pi * 300 * i / rate)))
+                else:
+                    samples.append(rng.randint(-60, 60))
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(rate)
+            wav.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+        buffer.seek(0)
+        return buffer
+    return build
+
+@pytest.fixture
+def results_page():
+    """A YouTube results page listing VIDEOS as videoRenderer entries of ytInitialData"""
+    renderers = [
+        {"videoRenderer": {
+            "videoId": video_id,
+            "thumbnail": {"thumbnails": [{"url": f"https://i.ytimg.com/vi/{video_id}/hq.jpg"}]},
+            "title": {"runs": [{"text": title}]},
+            "lengthText": {"accessibility": {"accessibilityData": {"label": "x"}}, "simpleText": duration}
+        }}
+        for video_id, title, duration in VIDEOS
+    ]
+    data = {"contents": {"sectionListRenderer": {"contents": [{"itemSectionRenderer": {"contents": renderers}}]}}}
+    return f"<html><script>var ytInitialData = {json.dumps(data, separators=(',', ':'))};</script></html>"
+
+@pytest.fixture
+def use_client(monkeypatch):
+    """Install a client as the shared HTTP client with empty YouTube state, undone after the test"""
+    def install(client):
+        monkeypatch.setattr(http_client, "_client", client)
+        monkeypatch.setattr(web_search, "_youtube_results", TTLCache(ttl=web_search.YOUTUBE_CACHE_TTL, max_items=32))
+        monkeypatch.setattr(web_search, "_last_youtube", {"query": None, "index": 0})
+    return install
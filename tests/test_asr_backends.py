@@ -0,0 +1,22 @@
+import speech_recognition as sr
+from assistant.modules.asr_backends import ASRBackend, ASR_BACKENDS, create_backend, word_error_rate
+
+def test_word_error_rate():
+    assert word_error_rate("play some music", "play some music") == 0.0
+    assert word_error_rate("play some music", "Play some music.") == 0.0
+    assert word_error_rate("play some music", "play music") == 1 / 3
+    assert word_error_rate("take screenshot", "take a screenshot") == 1 / 2
+    assert word_error_rate("open notepad", None) == 1.0
+
+def test_create_backend_falls_back_when_unavailable():
+    class Missing(ASRBackend):
+        name = "missing"
+        def __init__(self):
+            raise sr.RequestError("model not installed")
+
+    ASR_BACKENDS["missing"] = Missing
+    try:
+        backend = create_backend("missing")
+        assert backend.name == "google"
+    finally:
+        del ASR_BACKENDS["missing"]
@@ -0,0 +1,94 @@
+import speech_recognition as sr
+from assistant.modules.audio_capture import CaptureSession, create_recognizer
+
+RATE = 16000
+
+def test_session_returns_each_utterance_without_reopening(make_wav):
+    audio = make_wav([
+        ("noise", 1.0), ("tone", 1.0), ("noise", 1.5),
+        ("tone", 0.5), ("noise", 1.5)
+    ])
+    with CaptureSession(source=sr.AudioFile(audio)) as session:
+        first = session.listen()
+        second = session.listen()
+        third = session.listen()
+
+    assert first is not None and second is not None
+    assert third is None
+    # Phrase plus at most pause_threshold + padding of surrounding noise
+    assert 1.0 <= len(first.frame_data) / (2 * RATE) < 2.5
+    assert 0.5 <= len(second.frame_data) / (2 * RATE) < 2.0
+
+def test_threshold_recalibrates_from_silence_frames(make_wav):
+    recognizer = create_recognizer()
+    recognizer.energy_threshold = 4000
+    audio = make_wav([("noise", 2.0), ("tone", 0.5), ("noise", 1.0)])
+    with CaptureSession(source=sr.AudioFile(audio), recognizer=recognizer) as session:
+        session.open(calibration_duration=0)
+        phrase = session.listen()
+
+    assert phrase is not None
+    assert recognizer.energy_threshold < 4000
+
+def test_barge_in_interrupts_playback(make_wav):
+    for vad in (None, "spectral"):
+        interrupted = []
+        audio = make_wav([("noise", 1.0), ("tone", 1.0), ("noise", 1.5)])
+        session = CaptureSession(
+            source=sr.AudioFile(audio), vad=vad,
+            playback_active=lambda: not interrupted, on_barge_in=lambda: interrupted.append(True)
+        )
+        with session:
+            phrase = session.listen()
+
+        assert phrase is not None
+        assert interrupted == [True]
+
+def test_playback_level_speech_is_ignored(make_wav):
+    interrupted = []
+    audio = make_wav([("noise", 1.0), ("tone", 1.0), ("noise", 1.5)])
+    # The tone is never loud enough to be told apart from our own playback
+    session = CaptureSession(
+        source=sr.AudioFile(audio), playback_active=lambda: True,
+        on_barge_in=lambda: interrupted.append(True), barge_in_ratio=1000
+    )
+    with session:
+        phrase = session.listen()
+
+    assert phrase is None
+    assert not interrupted
+
+def test_rising_playback_level_is_not_taken_for_speech(make_wav):
+    for vad in (None, "spectral"):
+        interrupted = []
+        recognizer = create_recognizer()
+        recognizer.dynamic_energy_threshold = False
+        # Our own voice gets louder; a fixed 3x threshold would take it for the user
+        audio = make_wav([("noise", 0.5), ("tone", 0.5, 1000), ("tone", 1.0, 2000), ("noise", 1.0)])
+        session = CaptureSession(
+            source=sr.AudioFile(audio), recognizer=recognizer, vad=vad,
+            playback_active=lambda: True, on_barge_in=lambda: interrupted.append(True)
+        )
+        session.open(calibration_duration=0)
+        with session:
+            phrase = session.listen()
+
+        assert phrase is None
+        assert not interrupted
+
+def test_speech_louder_than_playback_barges_in(make_wav):
+    for vad in (None, "spectral"):
+        interrupted = []
+        recognizer = create_recognizer()
+        recognizer.dynamic_energy_threshold = False
+        audio = make_wav([("noise", 0.5), ("tone", 0.5, 1000), ("tone", 1.0, 8000), ("noise", 1.5)])
+        session = CaptureSession(
+            source=sr.AudioFile(audio), recognizer=recognizer, vad=vad,
+            playback_active=lambda: not interrupted, on_barge_in=lambda: interrupted.append(True)
+        )
+        session.open(calibration_duration=0)
+        with session:
+            phrase = session.listen()
+
+        assert phrase is not None
+        assert interrupted == [True]
@@ -0,0 +1,49 @@
+from assistant.modules.conversation_context import ConversationContext
+
+class CharTokenizer:
+    """Stand-in tokenizer with one token per character"""
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text):
+        self.calls += 1
+        return [ord(c) for c in text]
+
+def test_render_skips_missing_assistant_reply():
+    context = ConversationContext()
+    context.add("play music")
+    context.add("what time is it", "It is noon")
+    assert context.render() == "User: play music\nUser: what time is it\nAssistant: It is noon"
+
+def test_update_last_fills_reply_incrementally():
+    tokenizer = CharTokenizer()
+    context = ConversationContext(tokenizer=tokenizer)
+    context.add("hello", "Hi!")
+    context.add("take a screenshot")
+    context.update_last("Your screenshot has been saved.")
+    expected = "User: hello\nAssistant: Hi!\nUser: take a screenshot\nAssistant: Your screenshot has been saved."
+    assert context.render() == expected
+    assert context.token_ids() == tokenizer.encode(expected)
+
+def test_ring_buffer_keeps_newest_items():
+    context = ConversationContext(max_items=2)
+    for i in range(4):
+        context.add(f"command {i}", f"reply {i}")
+    assert [item["user"] for item in context.items()] == ["command 2", "command 3"]
+    assert context.render() == "User: command 2\nAssistant: reply 2\nUser: command 3\nAssistant: reply 3"
+
+def test_token_budget_truncates_and_caches_tokens():
+    tokenizer = CharTokenizer()
+    context = ConversationContext(max_items=10, max_tokens=60, tokenizer=tokenizer)
+    for i in range(5):
+        context.add(f"command {i}", f"reply {i}")
+    rendered = context.render()
+    assert context.token_count <= 60
+    assert rendered.endswith("User: command 4\nAssistant: reply 4")
+    assert context.token_ids() == [ord(c) for c in rendered]
+
+    # Rendering again does not tokenize anything
+    calls = tokenizer.calls
+    context.render()
+    context.token_ids()
+    assert tokenizer.calls == calls
@@ -0,0 +1,105 @@
+import io
+import wave
+import threading
+from types import SimpleNamespace
+from google.cloud import texttospeech
+from assistant.modules.google_tts import GoogleTTS, AudioOutput, decode_wav
+
+def make_wav_bytes(seconds, rate=24000):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b"\x01\x00" * int(rate * seconds))
+    return buffer.getvalue()
+
+class StandInTTSClient:
+    """Local stand-in for the TextToSpeechClient: answers with silence, 50 ms per word"""
+
+    def __init__(self):
+        self.requests = []
+
+    def synthesize_speech(self, input, voice, audio_config):
+        self.requests.append((input.text, voice.name, audio_config))
+        return SimpleNamespace(audio_content=make_wav_bytes(0.05 * len(input.text.split()), audio_config.sample_rate_hertz))
+
+class FakeStream:
+    def __init__(self, fmt):
+        self.format = fmt
+        self.written = []
+        self.closed = False
+
+    def write(self, data):
+        self.written.append(data)
+
+    def close(self):
+        self.closed = True
+
+class FakePyAudio:
+    def __init__(self):
+        self.streams = []
+
+    def get_format_from_width(self, width):
+        return width
+
+    def open(self, format, channels, rate, output):
+        stream = FakeStream((format, channels, rate))
+        self.streams.append(stream)
+        return stream
+
+    def terminate(self):
+        pass
+
+def make_output():
+    output = AudioOutput()
+    output.pyaudio = FakePyAudio()
+    return output
+
+def test_client_is_reused_and_linear16_is_requested():
+    client = StandInTTSClient()
+    tts = GoogleTTS("en-IN-Standard-A", texttospeech.SsmlVoiceGender.FEMALE, client=client, output=make_output())
+    first = tts.synthesize("Increasing volume")
+    tts.synthesize("Muting audio")
+
+    assert tts.client is client
+    assert len(client.requests) == 2
+    audio_config = client.requests[0][2]
+    assert audio_config.audio_encoding == texttospeech.AudioEncoding.LINEAR16
+    pcm, rate, width, channels = decode_wav(first)
+    assert (rate, width, channels) == (24000, 2, 1)
+    assert len(pcm) == int(24000 * 0.1) * 2
+
+def test_playback_reuses_one_output_stream():
+    output = make_output()
+    tts = GoogleTTS("en-IN-Standard-A", texttospeech.SsmlVoiceGender.FEMALE,
+                    client=StandInTTSClient(), output=output)
+    for text in ["Pausing playback", "Playing next track"]:
+        tts.play(tts.synthesize(text))
+
+    streams = output.pyaudio.streams
+    assert len(streams) == 1
+    assert sum(len(block) for block in streams[0].written) == int(24000 * 0.1) * 2 + int(24000 * 0.15) * 2
+
+    # A different format reopens the stream
+    output.play(b"\x00\x00" * 1600, 16000)
+    assert len(streams) == 2 and streams[0].closed
+
+def test_interrupt_stops_playback():
+    output = make_output()
+    started = threading.Event()
+
+    class SlowStream(FakeStream):
+        def write(self, data):
+            super().write(data)
+            started.set()
+            threading.Event().wait(0.02)
+
+    output.pyaudio.open = lambda format, channels, rate, output: SlowStream((format, channels, rate))
+    player = threading.Thread(target=output.play, args=(b"\x00\x00" * 24000 * 5, 24000))
+    player.start()
+    started.wait(1)
+    output.interrupt()
+    player.join(1)
+    assert not player.is_alive()
+    assert len(output.stream.written) < 10
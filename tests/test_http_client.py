@@ -0,0 +1,89 @@
+import gzip
+import time
+import requests
+from assistant.modules import http_client
+from assistant.modules.http_client import HTTPClient, Prefetch
+
+def test_connections_are_reused_and_latency_recorded(start_server):
+    server, base = start_server({"/ok": lambda request: (200, {}, b"hello")})
+    client = HTTPClient()
+    try:
+        for _ in range(3):
+            assert client.get(f"{base}/ok").text == "hello"
+    finally:
+        server.shutdown()
+
+    assert len(server.connections) == 1
+    stats = client.get_stats()[base.split("//")[1]]
+    assert stats["requests"] == 3 and stats["failures"] == 0 and stats["bytes"] == 15
+
+def test_compressed_responses_are_decoded(start_server):
+    body = b"news " * 1000
+
+    def gzipped(request):
+        assert "gzip" in request.headers["Accept-Encoding"]
+        return 200, {"Content-Encoding": "gzip"}, gzip.compress(body)
+
+    server, base = start_server({"/gzip": gzipped})
+    try:
+        assert HTTPClient().get(f"{base}/gzip").content == body
+    finally:
+        server.shutdown()
+
+def test_transient_errors_are_retried(start_server):
+    attempts = []
+
+    def flaky(request):
+        attempts.append(1)
+        return (503, {}, b"busy") if len(attempts) < 3 else (200, {}, b"done")
+
+    server, base = start_server({"/flaky": flaky})
+    try:
+        response = HTTPClient(retries=2, backoff=0.01).get(f"{base}/flaky")
+    finally:
+        server.shutdown()
+    assert response.status_code == 200 and len(attempts) == 3
+
+def test_slow_responses_time_out(start_server):
+    def slow(request):
+        time.sleep(0.5)
+        return 200, {}, b"late"
+
+    server, base = start_server({"/slow": slow})
+    client = HTTPClient(timeout=(1, 0.1), retries=0)
+    try:
+        client.get(f"{base}/slow")
+        assert False, "expected a timeout"
+    except requests.RequestException:
+        pass
+    finally:
+        server.shutdown()
+    assert client.get_stats()[base.split("//")[1]]["failures"] == 1
+
+def test_prefetch_overlaps_other_work():
+    def fetch(value):
+        time.sleep(0.2)
+        return value
+
+    prefetch = Prefetch("test", fetch, 42)
+    time.sleep(0.25)  # the acknowledgement or enhancement
+    assert prefetch.done() and prefetch.result() == 42
+    assert prefetch.waited < 0.05
+
+    failing = Prefetch("test", lambda: 1 / 0)
+    try:
+        failing.result()
+        assert False, "expected the fetch error"
+    except ZeroDivisionError:
+        pass
+
+def test_background_client_gets_the_longer_budget(monkeypatch):
+    monkeypatch.setattr(http_client, "_client", None)
+    monkeypatch.setattr(http_client, "_background_client", None)
+    interactive, background = http_client.get_client(), http_client.get_client(background=True)
+
+    assert interactive is http_client.get_client() and background is not interactive
+    assert interactive.timeout == http_client.DEFAULT_TIMEOUT
+    assert background.timeout == http_client.BACKGROUND_TIMEOUT
+    assert interactive.session.get_adapter("https://").max_retries.total == http_client.DEFAULT_RETRIES
+    assert background.session.get_adapter("https://").max_retries.total == http_client.BACKGROUND_RETRIES
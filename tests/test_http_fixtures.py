@@ -0,0 +1,59 @@
+import time
+import tempfile
+from assistant.modules import web_search
+from assistant.modules.http_client import HTTPClient
+from assistant.modules.http_fixtures import FixtureStore, ReplayServer, record, replay
+
+def test_recorded_responses_replay_offline(start_server):
+    routes = {
+        "/page": lambda request: (200, {"Content-Type": "text/html; charset=utf-8"}, "<p>café</p>".encode()),
+        "/old": lambda request: (301, {"Location": "/page"}, b""),
+    }
+    server, base = start_server(routes)
+    directory = tempfile.mkdtemp()
+    client = HTTPClient()
+    try:
+        record(client, directory)
+        assert client.get(f"{base}/old").text == "<p>café</p>"
+    finally:
+        server.shutdown()
+    assert len(FixtureStore(directory)) == 2
+
+    # The original server is gone: everything now comes from the fixtures
+    with ReplayServer(FixtureStore(directory)) as stand_in:
+        client = HTTPClient()
+        replay(client, stand_in)
+        response = client.get(f"{base}/old")
+        assert response.status_code == 200 and response.text == "<p>café</p>"
+        assert response.url == f"{base}/page"
+        assert client.get(f"{base}/unrecorded").status_code == 404
+    assert stand_in.served == 2 and stand_in.missing == [("GET", f"{base}/unrecorded")]
+
+def test_latency_and_bandwidth_are_simulated():
+    store = FixtureStore(tempfile.mkdtemp())
+    store.put("GET", "https://example.com/", 200, {}, b"x" * 20000)
+    with ReplayServer(store, latency=0.1, bandwidth=100000) as stand_in:
+        client = HTTPClient()
+        replay(client, stand_in)
+        start = time.perf_counter()
+        assert len(client.get("https://example.com/").content) == 20000
+        elapsed = time.perf_counter() - start
+    assert 0.28 < elapsed < 0.6  # 0.1 s latency + 0.2 s transfer
+
+def test_web_search_runs_from_fixtures(results_page, use_client):
+    store = FixtureStore(tempfile.mkdtemp())
+    store.put("GET", "https://www.youtube.com/results?search_query=lofi+mix", 200,
+              {"Content-Type": "text/html; charset=utf-8"}, results_page.encode())
+    store.put("GET", "https://www.google.com/search?q=weather%20in%20London%20today", 200,
+              {"Content-Type": "text/html; charset=utf-8"}, b"<main><p>London: 18 degrees, light rain.</p></main>")
+
+    with ReplayServer(store) as stand_in:
+        client = HTTPClient()
+        replay(client, stand_in)
+        use_client(client)
+        video = web_search.get_youtube_video("lofi mix", 2)
+        summary = web_search.extract_search_result(web_search.get_search_url("weather in London today"))
+
+    assert video["title"] == "Jazz café"
+    assert summary == "London: 18 degrees, light rain...."
+    assert not stand_in.missing
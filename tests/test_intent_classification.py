@@ -0,0 +1,76 @@
+import math
+import types
+import torch
+from assistant.modules.huggingface_utils import ZeroShotIntentClassifier
+
+class WordTokenizer:
+    """Stand-in tokenizer: one id per word, counting how often it is called"""
+    model_max_length = 32
+    bos_token_id, eos_token_id, pad_token_id = 0, 2, 1
+
+    def __init__(self):
+        self.vocab = {}
+        self.texts = []
+
+    def __call__(self, text, add_special_tokens=True):
+        self.texts.append(text)
+        words = text.lower().strip(".").split()
+        return {"input_ids": [self.vocab.setdefault(word, len(self.vocab) + 3) for word in words]}
+
+class OverlapModel:
+    """Stand-in NLI model: entailment logit = words shared by premise and hypothesis"""
+    def __init__(self):
+        self.config = types.SimpleNamespace(label2id={"CONTRADICTION": 0, "NEUTRAL": 1, "ENTAILMENT": 2})
+        self.batches = []
+
+    def eval(self):
+        return self
+
+    def __call__(self, input_ids, attention_mask):
+        self.batches.append(tuple(input_ids.shape))
+        logits = torch.zeros((input_ids.shape[0], 3))
+        for row, (ids, mask) in enumerate(zip(input_ids.tolist(), attention_mask.tolist())):
+            ids = ids[:sum(mask)]
+            split = ids.index(2)  # premise ends at the first </s>
+            premise, hypothesis = set(ids[1:split]), set(ids[split + 2:-1])
+            logits[row, 2] = float(len(premise & hypothesis))
+        return types.SimpleNamespace(logits=logits)
+
+INTENTS = ["play_music", "check_weather", "set_reminder"]
+
+def test_all_intents_are_scored_in_one_batch():
+    tokenizer, model = WordTokenizer(), OverlapModel()
+    classifier = ZeroShotIntentClassifier(tokenizer, model)
+
+    result = classifier.classify("please play some music", INTENTS)
+
+    assert result["intent"] == "play_music"
+    assert len(model.batches) == 1 and model.batches[0][0] == len(INTENTS)
+    # Overlap logits 2, 0, 0 ("play", "music"): a plain softmax across intents
+    expected = math.exp(2) / (math.exp(2) + 2)
+    assert abs(result["confidence"] - expected) < 1e-6
+    assert abs(sum(result["scores"].values()) - 1) < 1e-6
+
+def test_hypotheses_are_tokenized_once():
+    tokenizer = WordTokenizer()
+    classifier = ZeroShotIntentClassifier(tokenizer, OverlapModel())
+    classifier.classify("play some music", INTENTS)
+    classifier.classify("what is the weather", INTENTS)
+
+    hypotheses = [text for text in tokenizer.texts if text.startswith("This command")]
+    assert hypotheses == [
+        "This command is about play music.", "This command is about check weather.",
+        "This command is about set reminder."
+    ]
+
+def test_calibration_fits_the_temperature():
+    classifier = ZeroShotIntentClassifier(WordTokenizer(), OverlapModel())
+    examples = [("play music", "play_music"), ("check the weather", "check_weather"),
+                ("set a reminder", "set_reminder"), ("play the weather song", "play_music")]
+
+    temperature = classifier.calibrate(examples, INTENTS)
+
+    assert temperature != 1.0 and classifier.temperature == temperature
+    sharp = classifier.classify("play music", INTENTS)["confidence"]
+    classifier.temperature = 1.0
+    assert sharp != classifier.classify("play music", INTENTS)["confidence"]
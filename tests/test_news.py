@@ -0,0 +1,79 @@
+import os
+import time
+import tempfile
+from assistant.modules.http_client import HTTPClient
+from assistant.modules.news import HeadlineStore, NewsService, iter_feed_items, describe_age
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>World</title>
+<item><title>Rivers rise after storms</title><link>https://news.example/rivers</link>
+<guid>rivers-1</guid><pubDate>Mon, 19 Oct 2026 09:00:00 GMT</pubDate></item>
+<item><title>Markets &amp;amp; banks steady</title><link>https://news.example/markets</link>
+<guid>markets-1</guid><pubDate>Mon, 19 Oct 2026 08:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Science</title>
+<entry><title>Comet visible this week</title><link href="https://science.example/comet"/>
+<id>comet-7</id><updated>2026-10-19T10:00:00Z</updated></entry>
+<entry><title>Rivers rise after storms!</title><link href="https://science.example/rivers"/>
+<id>rivers-copy</id><updated>2026-10-19T07:00:00Z</updated></entry>
+</feed>"""
+
+def feed_route(body, etag, requests_seen):
+    def route(request):
+        requests_seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == etag:
+            return 304, {"ETag": etag}, b""
+        return 200, {"Content-Type": "application/rss+xml", "ETag": etag}, body
+    return route
+
+def test_feeds_parse_incrementally():
+    chunks = [RSS[i:i + 7] for i in range(0, len(RSS), 7)]
+    headlines = list(iter_feed_items(chunks, "World"))
+    assert [h["id"] for h in headlines] == ["rivers-1", "markets-1"]
+    assert headlines[1]["title"] == "Markets & banks steady"
+
+    atom = list(iter_feed_items([ATOM], "Science"))
+    assert atom[0]["link"] == "https://science.example/comet" and atom[0]["published"] > atom[1]["published"]
+
+    # Items before malformed XML are kept
+    assert len(list(iter_feed_items([RSS[:RSS.index(b"<item><title>Markets")] + b"<item><oops></item>"], "World"))) == 1
+
+def test_conditional_polls_and_deduplicated_store(start_server):
+    seen = []
+    server, base = start_server({
+        "/world.rss": feed_route(RSS, '"w1"', seen),
+        "/science.atom": feed_route(ATOM, '"s1"', seen),
+    })
+    path = os.path.join(tempfile.mkdtemp(), "headlines.json")
+    feeds = [("World", f"{base}/world.rss"), ("Science", f"{base}/science.atom")]
+    try:
+        service = NewsService(feeds, HeadlineStore(path), client=HTTPClient())
+        assert service.poll() == 3  # the copied rivers story is stored once
+        assert service.poll() == 0
+    finally:
+        server.shutdown()
+
+    # Feeds are polled in parallel, so either copy of the rivers story may be kept
+    assert seen[:2] == [None, None] and sorted(seen[2:]) == ['"s1"', '"w1"']
+    titles = [h["title"] for h in service.store.latest()]
+    assert titles[0] == "Comet visible this week" and "Markets & banks steady" in titles
+    assert len([title for title in titles if title.startswith("Rivers")]) == 1
+
+    # Headlines and validators survive a restart
+    reloaded = HeadlineStore(path)
+    assert len(reloaded) == 3 and reloaded.feeds[f"{base}/world.rss"]["etag"] == '"w1"'
+
+def test_fresh_headlines_are_answered_from_memory():
+    store = HeadlineStore(path=None)
+    store.add({"id": "a", "title": "Comet visible this week", "link": None, "source": "Science", "published": None})
+    store.updated = time.time() - 300
+    service = NewsService(feeds=[("Offline", "http://127.0.0.1:9/feed")], store=store, client=HTTPClient(retries=0))
+
+    assert not service.is_stale()
+    assert service.refresh_if_stale()[0]["title"] == "Comet visible this week"
+    assert service.summary() == (
+        "Here are the latest headlines, updated 5 minutes ago. From Science: Comet visible this week."
+    )
+    assert describe_age(30) == "just now" and describe_age(7200) == "2 hours ago"
@@ -0,0 +1,58 @@
+from assistant.modules.page_text import extract_text, read_page_text, create_text_parser, available_parsers
+from assistant.modules.http_client import HTTPClient
+
+PAGE = (
+    "<html><head><title>Ignored</title><style>body { color: red }</style></head><body>"
+    "<nav><a href='/'>Home</a><ul><li>Menu</li></ul></nav>"
+    "<main><h1>Python</h1><p>Python is a <b>high</b>-level language &amp; more.</p>"
+    "<script>var x = '<p>not text</p>';</script><p>Second   paragraph.</p></main>"
+    "<footer>Copyright</footer></body></html>"
+).encode()
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+def test_visible_main_text_only():
+    text, bytes_read = extract_text([PAGE], max_chars=500)
+    assert text == "Python Python is a high-level language & more. Second paragraph."
+    assert bytes_read == len(PAGE)
+
+def test_chunk_boundaries_do_not_change_text():
+    expected, _ = extract_text([PAGE], max_chars=500)
+    for size in (1, 3, 7, 64):
+        assert extract_text(chunked(PAGE, size), max_chars=500)[0] == expected
+
+def test_stops_reading_once_enough_text():
+    page = b"<html><body><p>" + b"word " * 100 + b"</p>" + b"<p>filler</p>" * 10000 + b"</body></html>"
+    text, bytes_read = extract_text(chunked(page, 1024), max_chars=200)
+    assert len(text) == 200 and text.startswith("word word")
+    assert bytes_read == 1024
+
+def test_streamed_response_is_closed_early(start_server):
+    page = b"<p>" + "café ".encode() * 100 + b"</p>" + b"<p>filler</p>" * 50000
+    server, base = start_server({"/page": lambda request: (200, {"Content-Type": "text/html; charset=utf-8"}, page)})
+    try:
+        response = HTTPClient().get(f"{base}/page", stream=True)
+        text, bytes_read = read_page_text(response, 100)
+    finally:
+        server.shutdown()
+    assert text.startswith("café café") and len(text) == 100
+    assert bytes_read < len(page) // 10
+
+def test_parsers_extract_identical_text():
+    pages = [
+        PAGE,
+        b"<p>Caf&eacute; <i>menu</i><br>today<!-- hidden --></p><svg><text>chart</text></svg><p>open late</p>",
+        b"<div>no main element<div>nested <span>inline</span> text</div></div>",
+    ]
+    assert "html.parser" in available_parsers()
+    for page in pages:
+        texts = {extract_text(chunked(page, 5), 500, parser=name)[0] for name in available_parsers()}
+        assert len(texts) == 1, texts
+
+def test_unknown_parser_is_rejected():
+    try:
+        create_text_parser("nonexistent")
+        assert False, "expected a RuntimeError"
+    except RuntimeError:
+        pass
@@ -0,0 +1,120 @@
+import time
+from assistant.modules.response_policy import ResponsePolicy
+from assistant.modules.conversation_context import ConversationContext
+
+class FakeGenerator:
+    """Stand-in for HuggingFaceHelper that sleeps instead of running GPT-2"""
+    def __init__(self, delay, text="Sure, here you go."):
+        self.delay = delay
+        self.text = text
+        self.calls = 0
+        self.prompts = []
+
+    def generate_response(self, prompt, max_length=100, max_time=None, stream=False, prefix_ids=None):
+        self.calls += 1
+        self.prompts.append((prompt, prefix_ids))
+        if stream:
+            return self._stream(max_time)
+        time.sleep(min(self.delay, max_time) if max_time else self.delay)
+        return f"{prompt} {self.text}\nUser: more"
+
+    def _stream(self, max_time):
+        """Yield the reply word by word, delay apart, stopping at max_time like generate()"""
+        start = time.perf_counter()
+        for word in f" {self.text}\nUser: more".split(" "):
+            time.sleep(self.delay)
+            if max_time and time.perf_counter() - start > max_time:
+                return
+            yield f" {word}" if word else ""
+
+def test_known_category_uses_template():
+    generator = FakeGenerator(0)
+    policy = ResponsePolicy(generator)
+    policy.begin_turn()
+
+    response = policy.respond("take a screenshot", "screenshot")
+
+    assert response == "Your screenshot has been saved."
+    assert generator.calls == 0
+    assert policy.get_stats() == {"template": 1}
+
+def test_unknown_category_generates_within_budget():
+    generator = FakeGenerator(0.01)
+    policy = ResponsePolicy(generator, budget=1.0)
+    policy.begin_turn()
+
+    response = policy.respond("tell me a joke", "chat")
+
+    assert response == "Sure, here you go."
+    assert policy.get_stats() == {"generated": 1}
+
+def test_generation_past_budget_is_cancelled():
+    generator = FakeGenerator(1.0)
+    policy = ResponsePolicy(generator, budget=0.05)
+    policy.begin_turn()
+
+    response = policy.respond("tell me a joke", "chat")
+
+    assert response == "Command executed successfully!"
+    assert policy.get_stats() == {"cancelled": 1}
+
+def test_slow_generator_is_skipped_once_estimated():
+    generator = FakeGenerator(1.0)
+    policy = ResponsePolicy(generator, budget=0.05)
+    policy.generation_estimate = 1.0
+    policy.begin_turn()
+
+    policy.respond("tell me a joke", "chat")
+
+    assert generator.calls == 0
+    assert policy.get_stats() == {"skipped": 1}
+
+def test_streamed_reply_stops_at_the_first_line():
+    generator = FakeGenerator(0.001)
+    policy = ResponsePolicy(generator, budget=1.0)
+    policy.begin_turn()
+
+    chunks = policy.respond("tell me a joke", "chat", stream=True)
+
+    assert "".join(chunks).strip() == "Sure, here you go."
+    assert policy.get_stats() == {"generated": 1}
+
+def test_stream_cut_off_at_the_budget_is_truncated():
+    generator = FakeGenerator(0.03, text="One two three four five six seven eight nine ten.")
+    policy = ResponsePolicy(generator, budget=0.1)
+    policy.begin_turn()
+
+    text = "".join(policy.respond("tell me a story", "chat", stream=True)).strip()
+
+    # Some words made it out before the cut, and no template was appended to them
+    assert text and "One two three four five six seven eight nine ten.".startswith(text)
+    assert text != "One two three four five six seven eight nine ten."
+    assert policy.get_stats() == {"truncated": 1}
+
+def test_stream_without_text_by_the_budget_falls_back_to_template():
+    generator = FakeGenerator(0.2)
+    policy = ResponsePolicy(generator, budget=0.05)
+    policy.begin_turn()
+
+    text = "".join(policy.respond("tell me a story", "chat", stream=True))
+
+    assert text == "Command executed successfully!"
+    assert policy.get_stats() == {"cancelled": 1}
+
+def test_context_token_ids_are_passed_to_the_generator():
+    generator = FakeGenerator(0)
+    policy = ResponsePolicy(generator, budget=1.0)
+    context = ConversationContext()
+    context.add("hello", "Hi!")
+    context.add("tell me a joke")
+    policy.begin_turn()
+
+    response = policy.respond("tell me a joke", "chat", context)
+
+    assert response == "Sure, here you go."
+    assert generator.prompts == [("\nAssistant:", context.token_ids())]
+
+    # A command not yet in the context is appended to the prompt
+    policy.begin_turn()
+    policy.respond("another one", "chat", context)
+    assert generator.prompts[-1] == ("\nUser: another one\nAssistant:", context.token_ids())
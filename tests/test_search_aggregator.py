@@ -0,0 +1,94 @@
+import json
+import time
+from assistant.modules.http_client import HTTPClient
+from assistant.modules.search_aggregator import (
+    SearchAggregator, WikipediaProvider, DuckDuckGoProvider, merge_results, spoken_answer
+)
+from assistant.modules.web_search import extract_search_query
+
+WIKIPEDIA = {"query": {"pages": {
+    "2": {"index": 2, "title": "Monty Python", "extract": "Monty Python were a British comedy troupe."},
+    "1": {"index": 1, "title": "Python (programming language)",
+          "extract": "Python is a high-level, general-purpose programming language."},
+}}}
+
+DUCKDUCKGO = {
+    "Heading": "Python (programming language)",
+    "AbstractText": "Python is a programming language that lets you work quickly.",
+    "AbstractURL": "https://en.wikipedia.org/wiki/Python_(programming_language)",
+    "RelatedTopics": [
+        {"Text": "PyPI - The Python package index.", "FirstURL": "https://duckduckgo.com/PyPI"},
+        {"Name": "Snakes", "Topics": [{"Text": "Pythonidae - A family of snakes.", "FirstURL": "https://duckduckgo.com/Pythonidae"}]},
+    ]
+}
+
+def json_route(data, delay=0.0):
+    def route(request):
+        time.sleep(delay)
+        return 200, {"Content-Type": "application/json"}, json.dumps(data).encode()
+    return route
+
+def make_aggregator(base, deadline):
+    client = HTTPClient(retries=0)
+    return SearchAggregator([
+        WikipediaProvider(f"{base}/wikipedia", client=client),
+        DuckDuckGoProvider(f"{base}/duckduckgo", client=client),
+    ], deadline=deadline)
+
+def test_results_are_merged_and_deduplicated(start_server):
+    server, base = start_server({"/wikipedia": json_route(WIKIPEDIA), "/duckduckgo": json_route(DUCKDUCKGO)})
+    try:
+        results = make_aggregator(base, deadline=2.0).search("python")
+    finally:
+        server.shutdown()
+
+    titles = [result["title"] for result in results]
+    assert titles[0] == "Python (programming language)" and titles.count("Python (programming language)") == 1
+    assert results[0]["sources"] == ["wikipedia", "duckduckgo"]
+    assert set(titles[1:]) == {"Monty Python", "PyPI", "Pythonidae"}
+    assert spoken_answer(results) == (
+        "According to Wikipedia: Python is a high-level, general-purpose programming language."
+    )
+
+def test_slow_source_is_left_behind_at_the_deadline(start_server):
+    server, base = start_server({"/wikipedia": json_route(WIKIPEDIA), "/duckduckgo": json_route(DUCKDUCKGO, delay=1.0)})
+    aggregator = make_aggregator(base, deadline=0.3)
+    try:
+        start = time.perf_counter()
+        results = aggregator.search("python")
+        elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    assert elapsed < 0.5
+    assert [result["sources"] for result in results] == [["wikipedia"], ["wikipedia"]]
+    assert aggregator.last_timings["duckduckgo"] is None and aggregator.last_timings["wikipedia"] < 0.3
+
+def test_failed_source_is_skipped(start_server):
+    server, base = start_server({"/wikipedia": json_route(WIKIPEDIA)})  # duckduckgo answers 404
+    try:
+        results = make_aggregator(base, deadline=2.0).search("python")
+    finally:
+        server.shutdown()
+    assert len(results) == 2
+
+def test_ranking_and_answers():
+    merged = merge_results({
+        "a": [{"title": "One", "url": "https://www.example.com/one/", "snippet": ""},
+              {"title": "Two", "url": "https://example.com/two", "snippet": "Second."}],
+        "b": [{"title": "One again", "url": "http://example.com/one", "snippet": "First. More text here."}],
+    })
+    assert [entry["title"] for entry in merged] == ["One", "Two"]
+    assert merged[0]["snippet"] == "First. More text here."
+
+    long_snippet = "A first sentence that is long enough to keep. " + "word " * 100
+    answer = spoken_answer([{"title": "x", "snippet": long_snippet, "sources": ["wikipedia"]}], max_chars=100)
+    assert answer == "According to Wikipedia: A first sentence that is long enough to keep."
+    answer = spoken_answer([{"title": "x", "snippet": "Short. " + "word " * 100}], max_chars=30)
+    assert answer == "Short. word word word word..."
+    assert spoken_answer([]) is None
+
+def test_search_query_is_extracted():
+    assert extract_search_query("search the web for python decorators") == "python decorators"
+    assert extract_search_query("look up capital of france online") == "capital of france"
+    assert extract_search_query("who is ada lovelace") == "who is ada lovelace"
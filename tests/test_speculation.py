@@ -0,0 +1,138 @@
+import time
+import threading
+from assistant.modules.speculation import Speculator
+
+class FakeLearner:
+    """Stand-in for CommandLearner: categories by keyword"""
+    def predict_category(self, command):
+        if "music" in command:
+            return "audio_control"
+        if "video" in command:
+            return "video_control"
+        return None
+
+class FakeScanner:
+    """Stand-in for AdvancedFeatures' media scan, with a scan that can be held back"""
+    def __init__(self):
+        self.media_scan = {}
+        self.release = threading.Event()
+        self.release.set()
+        self.scans = 0
+
+    def scan(self, kind):
+        self.scans += 1
+        self.release.wait(timeout=2)
+        files = self.media_scan[kind] = [f"{kind}-{self.scans}"]
+        return files
+
+    def discard(self, kind, files):
+        if self.media_scan.get(kind) is files:
+            del self.media_scan[kind]
+
+def make_speculator(scanner):
+    speculator = Speculator(FakeLearner().predict_category)
+    for kind in ["audio", "video"]:
+        speculator.register(f"{kind}_control", lambda kind=kind: scanner.scan(kind),
+                            lambda files, kind=kind: scanner.discard(kind, files))
+    return speculator
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+def test_hit_keeps_the_prewarmed_scan():
+    scanner = FakeScanner()
+    speculator = make_speculator(scanner)
+    speculator.speculate("play some music")
+    assert wait_until(lambda: speculator.current["finished"] is not None)
+
+    assert speculator.predicted_category("play some music") == "audio_control"
+    assert speculator.commit("audio_control")
+    assert scanner.media_scan == {"audio": ["audio-1"]}
+    assert speculator.get_stats()["hits"] == 1 and speculator.get_stats()["hit_rate"] == 1.0
+
+def test_miss_discards_only_its_own_scan():
+    scanner = FakeScanner()
+    scanner.media_scan["video"] = ["video-0"]
+    speculator = make_speculator(scanner)
+    speculator.speculate("play some music")
+    assert wait_until(lambda: speculator.current["finished"] is not None)
+
+    assert not speculator.commit("web_search")
+    assert scanner.media_scan == {"video": ["video-0"]}
+    assert speculator.get_stats()["misses"] == 1
+
+def test_scan_finishing_after_its_discard_is_dropped():
+    scanner = FakeScanner()
+    scanner.release.clear()
+    speculator = make_speculator(scanner)
+    speculator.speculate("play some music")
+    first = speculator.current
+    # The guess changes while the audio scan is still running
+    speculator.speculate("play the video")
+    assert first["discarded"] and first["finished"] is None
+
+    scanner.release.set()
+    assert wait_until(lambda: first["finished"] is not None and speculator.current["finished"] is not None)
+    # The late audio scan was stored by its thread, which then drops it again
+    assert wait_until(lambda: "audio" not in scanner.media_scan)
+    assert speculator.commit("video_control")
+    assert list(scanner.media_scan) == ["video"]
+
+def test_hit_while_prewarm_is_running_counts_as_late():
+    scanner = FakeScanner()
+    scanner.release.clear()
+    speculator = make_speculator(scanner)
+    speculator.speculate("play some music")
+    try:
+        assert speculator.commit("audio_control")
+        assert speculator.get_stats()["late"] == 1
+    finally:
+        scanner.release.set()
+
+def test_unclassified_text_is_ignored():
+    speculator = make_speculator(FakeScanner())
+    speculator.speculate("hmm")
+    assert speculator.current is None
+    assert not speculator.commit("web_search")
+
+def test_partials_after_commit_are_ignored_until_the_next_utterance():
+    scanner = FakeScanner()
+    speculator = make_speculator(scanner)
+    speculator.speculate("play some music")
+    speculator.commit("audio_control")
+
+    # A late interim transcript of the turn that was just committed
+    speculator.speculate("play some music video")
+    assert speculator.current is None
+    assert speculator.predicted_category("play some music video") is None
+
+    speculator.begin_utterance()
+    speculator.speculate("play the video")
+    assert speculator.current["category"] == "video_control"
+
+def test_saved_latency_compares_hit_and_miss_turns_of_a_category():
+    now = [0.0]
+    speculator = Speculator(FakeLearner().predict_category, clock=lambda: now[0])
+
+    def turn(partial, category, seconds):
+        speculator.begin_utterance()
+        if partial:
+            speculator.speculate(partial)
+        speculator.begin_turn()
+        speculator.commit(category)
+        now[0] += seconds
+        return speculator.action_started()
+
+    assert turn("play some music", "audio_control", 1) == 1
+    assert turn(None, "audio_control", 5) == 5
+    assert turn("play some music", "audio_control", 2) == 2
+    assert turn("play some music", "video_control", 3) == 3
+
+    stats = speculator.get_stats()
+    assert abs(stats["avg_hit_ms"] - 1500) < 1e-6
+    assert abs(stats["avg_miss_ms"] - 4000) < 1e-6
+    # Only audio turns were seen both ways
+    assert abs(stats["saved_ms"] - 3500) < 1e-6
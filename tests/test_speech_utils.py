@@ -0,0 +1,69 @@
+import time
+from assistant.modules import speech_utils
+from assistant.modules.speech_utils import iter_sentences, speak_stream, split_for_speech, play_pipelined
+
+def test_iter_sentences_splits_streamed_chunks():
+    chunks = ["Hello the", "re. It is 3", ".5 degrees", " today! Anything", " else"]
+    assert list(iter_sentences(chunks)) == [
+        "Hello there.",
+        "It is 3.5 degrees today!",
+        "Anything else"
+    ]
+
+def test_speak_stream_speaks_each_sentence():
+    spoken = []
+    first_audio = speak_stream(iter(["One. Tw", "o. Three"]), speak_fn=spoken.append)
+    assert spoken == ["One.", "Two.", "Three"]
+    assert first_audio is not None
+
+def test_speak_stream_accepts_plain_text():
+    spoken = []
+    speak_stream("Command executed successfully!", speak_fn=spoken.append)
+    assert spoken == ["Command executed successfully!"]
+
+def test_split_for_speech_keeps_short_text_whole():
+    assert split_for_speech("Good morning! How can I help you today?") == [
+        "Good morning! How can I help you today?"
+    ]
+    assert split_for_speech("   ") == []
+
+def test_split_for_speech_chunks_long_text():
+    text = ("Python is a programming language. " * 3 +
+            "It was created by Guido van Rossum, first released in 1991, "
+            "and is known for readability, a large standard library, and a huge community.")
+    chunks = split_for_speech(text, max_chars=60)
+    assert chunks[0] == "Python is a programming language."
+    assert all(len(chunk) <= 60 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+def test_play_pipelined_overlaps_synthesis_with_playback():
+    played = []
+
+    def synthesize(chunk):
+        time.sleep(0.05)
+        return chunk.upper()
+
+    def play(audio):
+        played.append(audio)
+        time.sleep(0.05)
+
+    first_audio, total = play_pipelined(["one", "two", "three", "four"], synthesize, play)
+    assert played == ["ONE", "TWO", "THREE", "FOUR"]
+    # Only the first synthesis is waited for before audio starts
+    assert first_audio < 0.09
+    # Serial synthesis then playback would take 0.4 s
+    assert total < 0.33
+
+def test_close_releases_google_tts(monkeypatch):
+    class StandInGoogleTTS:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    tts = StandInGoogleTTS()
+    monkeypatch.setattr(speech_utils, "_google_tts", tts)
+    speech_utils.close_speech_worker()
+
+    assert tts.closed
+    assert speech_utils._google_tts is None
@@ -0,0 +1,60 @@
+import os
+import sys
+import tempfile
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from assistant.modules.tts_cache import TTSCache, cache_key, prerender
+
+
+def test_key_depends_on_text_voice_and_rate():
+    key = cache_key("Increasing volume", "en-IN-Standard-A", 1.0)
+    assert key == cache_key("Increasing  volume", "en-IN-Standard-A", 1.0)
+    assert key != cache_key("Increasing volume", "en-IN-Standard-B", 1.0)
+    assert key != cache_key("Increasing volume", "en-IN-Standard-A", 1.2)
+    assert key != cache_key("Decreasing volume", "en-IN-Standard-A", 1.0)
+
+
+def test_hit_after_put_and_persists_across_instances():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TTSCache(directory)
+        assert cache.get("Muting audio", "voice", 1.0) is None
+        path = cache.put("Muting audio", "voice", 1.0, b"audio-bytes")
+        assert cache.get("Muting audio", "voice", 1.0) == path
+        assert path.read_bytes() == b"audio-bytes"
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+
+        reopened = TTSCache(directory)
+        assert reopened.get("Muting audio", "voice", 1.0) == path
+
+
+def test_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TTSCache(directory, max_bytes=25)
+        first = cache.put("one", "voice", 1.0, b"x" * 10)
+        cache.put("two", "voice", 1.0, b"x" * 10)
+        cache.get("one", "voice", 1.0)  # "two" is now least recently used
+        cache.put("three", "voice", 1.0, b"x" * 10)
+
+        assert cache.get("two", "voice", 1.0) is None
+        assert cache.get("one", "voice", 1.0) == first
+        assert cache.get("three", "voice", 1.0) is not None
+        assert cache.total_bytes == 20
+        assert len(os.listdir(directory)) == 2
+
+
+def test_prerender_only_synthesizes_missing_phrases():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TTSCache(directory)
+        cache.put("Pausing playback", "voice", 1.0, b"cached")
+        synthesized = []
+
+        def synthesize(text):
+            synthesized.append(text)
+            return text.encode()
+
+        prerender(cache, ["Pausing playback", "Playing next track"], synthesize, "voice", 1.0).join(5)
+        assert synthesized == ["Playing next track"]
+        assert ("Playing next track", "voice", 1.0) in cache
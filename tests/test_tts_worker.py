@@ -0,0 +1,136 @@
+import os
+import sys
+import time
+import threading
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from assistant.modules.tts_worker import SpeechWorker, PRIORITY_HIGH, PRIORITY_LOW
+
+
+class FakeEngine:
+    """Stand-in for a pyttsx3 engine that 'speaks' one word per word_time seconds"""
+
+    def __init__(self, word_time=0.01):
+        self.word_time = word_time
+        self.callbacks = {}
+        self.queued = []
+        self.spoken = []
+        self.stopped = False
+        self.init_thread = threading.current_thread()
+
+    def connect(self, topic, callback):
+        self.callbacks[topic] = callback
+
+    def say(self, text):
+        self.queued.append(text)
+
+    def stop(self):
+        self.stopped = True
+
+    def runAndWait(self):
+        self.stopped = False
+        for text in self.queued:
+            self.callbacks['started-utterance']('utterance')
+            words = []
+            for location, word in enumerate(text.split()):
+                self.callbacks['started-word']('utterance', location, len(word))
+                if self.stopped:
+                    break
+                time.sleep(self.word_time)
+                words.append(word)
+            self.spoken.append(" ".join(words))
+        self.queued = []
+
+
+def make_worker(word_time=0.01):
+    engines = []
+
+    def factory():
+        engines.append(FakeEngine(word_time))
+        return engines[0]
+
+    worker = SpeechWorker(engine_factory=factory)
+    worker.ready.wait(1)
+    return worker, engines
+
+
+def test_say_returns_immediately_and_engine_is_created_once():
+    worker, engines = make_worker(word_time=0.05)
+    start = time.perf_counter()
+    first = worker.say("one two three")
+    worker.say("four five")
+    assert time.perf_counter() - start < 0.05
+
+    assert worker.wait_until_idle(5)
+    assert first.done.is_set()
+    assert len(engines) == 1
+    assert engines[0].init_thread is worker.thread
+    assert engines[0].spoken == ["one two three", "four five"]
+    assert worker.get_stats()["utterances"] == 2
+    worker.close()
+
+
+def test_priority_orders_queued_utterances():
+    worker, engines = make_worker(word_time=0.05)
+    worker.say("busy speaking now")
+    time.sleep(0.02)
+    worker.say("later", priority=PRIORITY_LOW)
+    worker.say("urgent", priority=PRIORITY_HIGH)
+    worker.say("normal")
+    worker.wait_until_idle(5)
+    assert engines[0].spoken == ["busy speaking now", "urgent", "normal", "later"]
+    worker.close()
+
+
+def test_interrupt_cuts_current_and_drops_queue():
+    worker, engines = make_worker(word_time=0.05)
+    current = worker.say("a long sentence that goes on and on for a while")
+    queued = worker.say("never spoken")
+    time.sleep(0.12)
+    worker.interrupt()
+
+    assert worker.wait_until_idle(2)
+    assert current.done.is_set() and queued.done.is_set()
+    assert queued.cancelled
+    assert len(engines[0].spoken) == 1
+    assert len(engines[0].spoken[0].split()) < 11
+    worker.close()
+
+
+def test_close_drains_queue():
+    worker, engines = make_worker()
+    for i in range(3):
+        worker.say(f"phrase {i}")
+    worker.close()
+    assert not worker.thread.is_alive()
+    assert engines[0].spoken == ["phrase 0", "phrase 1", "phrase 2"]
+
+
+def test_utterances_go_to_the_fallback_without_an_engine():
+    fallback_spoken = []
+
+    def broken_factory():
+        raise RuntimeError("CoInitialize has not been called")
+
+    worker = SpeechWorker(engine_factory=broken_factory, fallback=fallback_spoken.append)
+    worker.say("Increasing volume").wait(1)
+    worker.say("Muting audio").wait(1)
+    worker.close()
+
+    assert worker.engine is None
+    assert fallback_spoken == ["Increasing volume", "Muting audio"]
+
+
+def test_each_dropped_utterance_is_logged_without_an_engine(caplog):
+    def broken_factory():
+        raise RuntimeError("no driver")
+
+    worker = SpeechWorker(engine_factory=broken_factory)
+    assert worker.say("Increasing volume").wait(1)
+    assert worker.say("Muting audio").wait(1)
+    worker.close()
+
+    dropped = [record.getMessage() for record in caplog.records if "not speaking" in record.getMessage()]
+    assert len(dropped) == 2
@@ -0,0 +1,94 @@
+import wave
+import random
+import struct
+import speech_recognition as sr
+from assistant.modules.vad import FrameRingBuffer, Endpointer, SpectralDetector
+from assistant.modules.audio_capture import CaptureSession
+
+class ScriptedDetector:
+    """Stand-in detector that replays a string of 1 (speech) and 0 (silence)"""
+    def __init__(self, script):
+        self.script = iter(script)
+
+    def is_speech(self, frame):
+        return next(self.script) == "1"
+
+def run_endpointer(script, **kwargs):
+    endpointer = Endpointer(ScriptedDetector(script), frame_seconds=0.03, **kwargs)
+    return [endpointer.process(b"") for _ in script], endpointer
+
+def test_frame_ring_buffer_reframes_chunks():
+    framer = FrameRingBuffer(16000, frame_ms=30, history_ms=60)
+    framer.push(b"\x01" * 1000)
+    framer.push(b"\x02" * 1000)
+    frames = []
+    while True:
+        frame = framer.pop()
+        if frame is None:
+            break
+        frames.append(frame)
+    assert [len(f) for f in frames] == [960, 960]
+    assert framer.pre_roll() == frames
+    assert len(framer.pending) == 80
+
+def test_endpointer_start_and_end():
+    events, _ = run_endpointer("00111111111" + "0" * 20)
+    assert events.index("start") == 4
+    assert events.index("end") == 11 + 13  # 0.4 s of silence at 30 ms frames
+
+def test_endpointer_discards_clicks():
+    events, _ = run_endpointer("0111" + "0" * 20, min_speech=0.2)
+    assert "discard" in events and "end" not in events
+
+def test_endpointer_adapts_to_long_pauses():
+    script = "1111" + ("0" * 12 + "1" * 10) * 4 + "0" * 40
+    events, endpointer = run_endpointer(script)
+    speech_end = len(script) - 40
+    assert events.index("end") > speech_end
+    assert endpointer.end_silence > 0.4
+
+def pcm_frames(data, frame_bytes=960):
+    return [data[i:i + frame_bytes] for i in range(0, len(data) - frame_bytes + 1, frame_bytes)]
+
+def test_spectral_detector_hears_tone_over_noise_floor(make_wav):
+    with wave.open(make_wav([("noise", 0.6), ("tone", 0.6), ("noise", 0.6)])) as wav:
+        frames = pcm_frames(wav.readframes(wav.getnframes()))
+    detector = SpectralDetector(16000)
+    decisions = [detector.is_speech(frame) for frame in frames]
+
+    assert not any(decisions[:20])
+    assert all(decisions[21:40])
+    assert not any(decisions[41:])
+
+def test_spectral_detector_ignores_loud_flat_noise(make_wav):
+    with wave.open(make_wav([("noise", 0.6)])) as wav:
+        quiet = wav.readframes(wav.getnframes())
+    rng = random.Random(1)
+    loud = struct.pack("<9600h", *(rng.randint(-3000, 3000) for _ in range(9600)))
+    detector = SpectralDetector(16000)
+    decisions = [detector.is_speech(frame) for frame in pcm_frames(quiet + loud)]
+
+    # Far above the noise floor, but spread evenly across the spectrum
+    assert not any(decisions)
+
+def test_spectral_vad_session_cuts_at_speech_end(make_wav):
+    audio = make_wav([("noise", 1.0), ("tone", 1.0), ("noise", 1.5)])
+    session = CaptureSession(source=sr.AudioFile(audio), vad="spectral")
+    session.open(calibration_duration=0)
+    phrase = session.listen()
+    session.close()
+    assert phrase is not None
+    assert 2.0 <= session.position < 2.6
+
+def test_flush_drops_frames_cut_for_the_vad(make_wav):
+    session = CaptureSession(source=sr.AudioFile(make_wav([("noise", 0.5)])), vad="spectral")
+    session.open(calibration_duration=0)
+    session.thread.join(timeout=1)
+    # Our own speech, already re-framed for the detector before the turn ended
+    with wave.open(make_wav([("tone", 1.0)])) as wav:
+        session.framer.push(wav.readframes(wav.getnframes()))
+    session.flush()
+    assert not session.framer.ready
+    assert 1.4 <= session.position < 1.6
+    assert session.listen() is None
+    session.close()
@@ -0,0 +1,51 @@
+import audioop
+import speech_recognition as sr
+from assistant.modules.audio_capture import CaptureSession
+from assistant.modules.wake_word import KeywordSpotter, create_spotter
+
+class ToneSpotter(KeywordSpotter):
+    """Fires after enough consecutive loud frames, counting the frames it is fed"""
+    frame_ms = 32
+
+    def __init__(self, needed=10):
+        self.needed = needed
+        self.run = 0
+        self.calls = 0
+
+    def process(self, frame):
+        self.calls += 1
+        self.run = self.run + 1 if audioop.rms(frame, 2) > 1000 else 0
+        return self.run >= self.needed
+
+    def reset(self):
+        self.run = 0
+
+def test_spotter_is_not_run_on_silence(make_wav):
+    spotter = ToneSpotter()
+    audio = make_wav([("noise", 3.0)])
+    with CaptureSession(source=sr.AudioFile(audio)) as session:
+        assert session.wait_for_wake_word(spotter) is False
+    assert spotter.calls == 0
+
+def test_wake_word_fires_shortly_after_keyword(make_wav):
+    spotter = ToneSpotter(needed=10)
+    audio = make_wav([("noise", 2.0), ("tone", 0.6), ("noise", 1.0), ("tone", 1.0), ("noise", 1.0)])
+    session = CaptureSession(source=sr.AudioFile(audio)).open(calibration_duration=0)
+    with session:
+        assert session.wait_for_wake_word(spotter) is True
+        detected_at = session.position
+        # Only audio around the keyword reached the spotter
+        assert spotter.calls * 0.032 < 2.0
+
+        # The command after the keyword is still there to listen to
+        assert session.listen() is not None
+
+    # About 10 frames of 32 ms into the tone, reported at the end of that capture chunk
+    assert 2.25 <= detected_at <= 2.32 + 0.26
+
+def test_unknown_spotter_raises():
+    try:
+        create_spotter("nonexistent", 16000)
+    except RuntimeError:
+        return
+    assert False, "expected RuntimeError"
@@ -0,0 +1,99 @@
+import json
+from assistant.modules.http_client import HTTPClient
+from assistant.modules.weather import (
+    Forecast, OpenWeatherMapProvider, OpenMeteoProvider, WeatherService, extract_city
+)
+
+def json_route(data, calls):
+    def route(request):
+        calls.append(request.path)
+        if "nowhere" in request.path:
+            return 404, {}, b'{"message": "city not found"}'
+        return 200, {"Content-Type": "application/json"}, json.dumps(data).encode()
+    return route
+
+OPENWEATHERMAP_DELHI = {
+    "name": "Delhi",
+    "weather": [{"description": "haze"}],
+    "main": {"temp": 31.4, "feels_like": 34.9, "temp_min": 27.0, "temp_max": 35.6, "humidity": 48},
+    "wind": {"speed": 2.5}
+}
+
+def test_openweathermap_forecast_is_parsed(start_server):
+    calls = []
+    server, base = start_server({"/weather": json_route(OPENWEATHERMAP_DELHI, calls)})
+    try:
+        provider = OpenWeatherMapProvider(api_key="key", url=f"{base}/weather", client=HTTPClient())
+        forecast = provider.fetch("delhi")
+    finally:
+        server.shutdown()
+
+    assert (forecast.city, forecast.description, forecast.humidity) == ("Delhi", "haze", 48)
+    assert forecast.wind_speed == 9.0
+    assert forecast.high is None and forecast.low is None
+    assert forecast.summary() == (
+        "In Delhi it's 31 degrees with haze, feeling like 35. "
+        "Humidity is 48 percent. Wind is 9 kilometers per hour."
+    )
+    assert "q=delhi" in calls[0] and "units=metric" in calls[0]
+
+def test_repeated_queries_are_cached_per_city(start_server):
+    calls = []
+    now = [0.0]
+    server, base = start_server({"/weather": json_route(OPENWEATHERMAP_DELHI, calls)})
+    try:
+        provider = OpenWeatherMapProvider(api_key="key", url=f"{base}/weather", client=HTTPClient())
+        service = WeatherService(provider, ttl=600, clock=lambda: now[0])
+        first = service.get_forecast("Delhi")
+        now[0] = 599
+        assert service.is_cached("delhi") and service.get_forecast(" delhi ") is first
+        assert len(calls) == 1
+
+        now[0] = 601
+        assert not service.is_cached("Delhi")
+        assert service.get_forecast("Delhi") is not first
+        assert len(calls) == 2
+        assert service.get_forecast("nowhere") is None
+    finally:
+        server.shutdown()
+
+def test_forecast_expiring_after_the_cache_lookup_is_still_returned():
+    class FixedProvider:
+        name = "fixed"
+
+        def fetch(self, city):
+            return Forecast(city, "haze", 31.4)
+
+    # put at 0, get at 5, and the entry has expired by the time its age is read
+    times = iter([0.0, 5.0, 11.0])
+    service = WeatherService(FixedProvider(), ttl=10, clock=lambda: next(times))
+    first = service.get_forecast("Delhi")
+    assert service.get_forecast("Delhi") is first
+
+def test_open_meteo_locates_city_once(start_server):
+    calls = []
+    geocoding = {"results": [{"name": "London", "latitude": 51.5, "longitude": -0.12}]}
+    forecast_data = {
+        "current": {"temperature_2m": 17.8, "apparent_temperature": 17.0, "relative_humidity_2m": 80,
+                    "weather_code": 61, "wind_speed_10m": 14.2},
+        "daily": {"temperature_2m_max": [19.1], "temperature_2m_min": [12.3]}
+    }
+    server, base = start_server({
+        "/search": json_route(geocoding, calls),
+        "/forecast": json_route(forecast_data, calls),
+    })
+    try:
+        provider = OpenMeteoProvider(f"{base}/search", f"{base}/forecast", client=HTTPClient())
+        forecast = provider.fetch("london")
+        provider.fetch("London")
+    finally:
+        server.shutdown()
+
+    assert forecast.description == "light rain" and forecast.high == 19.1
+    assert [path.split("?")[0] for path in calls] == ["/search", "/forecast", "/forecast"]
+
+def test_city_is_extracted_from_commands():
+    assert extract_city("weather in Delhi") == "delhi"
+    assert extract_city("what's the weather like in New Delhi today") == "new delhi"
+    assert extract_city("weather in Beijing") == "beijing"
+    assert extract_city("weather") == ""
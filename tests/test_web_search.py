@@ -0,0 +1,90 @@
+import time
+from types import SimpleNamespace
+from assistant.modules import web_search
+from assistant.modules.ttl_cache import TTLCache
+
+class CountingClient:
+    def __init__(self, page):
+        self.page = page
+        self.urls = []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        return SimpleNamespace(status_code=200, text=self.page)
+
+class SlowClient(CountingClient):
+    def get(self, url, **kwargs):
+        time.sleep(0.2)
+        return super().get(url, **kwargs)
+
+def test_parse_results_with_titles_and_durations(results_page):
+    results = web_search.parse_youtube_results(results_page)
+    assert [r["id"] for r in results] == ["abcdefghij1", "abcdefghij2", "abcdefghij3"]
+    assert results[0]["title"] == 'Lofi "beats" to study'
+    assert results[2]["title"] == "Jazz café"
+    assert results[1]["duration"] == "45:10"
+
+def test_parse_falls_back_to_scanning_when_json_is_cut_off(results_page):
+    page = results_page
+    results = web_search.parse_youtube_results(page[:page.index("Jazz")])
+    assert [r["id"] for r in results] == ["abcdefghij1", "abcdefghij2", "abcdefghij3"]
+    assert results[1]["title"] == "Lofi mix"
+
+def test_ordinal_followups_resolve_from_cache(results_page, use_client):
+    client = CountingClient(results_page)
+    use_client(client)
+    first = web_search.get_youtube_video_url("Lofi, beats!", 0)
+    second = web_search.get_youtube_video_url("lofi beats", 1)
+    info = web_search.get_video_info(second)
+
+    assert first.endswith("abcdefghij1") and second.endswith("abcdefghij2")
+    assert info["title"] == "Lofi mix"
+    assert len(client.urls) == 1
+
+def test_followup_commands(results_page, use_client):
+    use_client(CountingClient(results_page))
+    assert web_search.resolve_youtube_followup("play the second video") is None
+    web_search.get_youtube_results("lofi beats")
+    web_search._last_youtube.update(query="lofi beats", index=1)
+
+    assert web_search.resolve_youtube_followup("play the next video") == ("lofi beats", 2)
+    assert web_search.resolve_youtube_followup("play the third video") == ("lofi beats", 2)
+    assert web_search.resolve_youtube_followup("play that video again") == ("lofi beats", 1)
+    assert web_search.resolve_youtube_followup("play another video") == ("lofi beats", 2)
+    assert web_search.resolve_youtube_followup("play the same video") == ("lofi beats", 1)
+    assert web_search.resolve_youtube_followup("play another cat video") is None
+    assert web_search.resolve_youtube_followup("play cat videos") is None
+
+def test_filler_words_are_removed_as_whole_words():
+    assert web_search.extract_youtube_query("play another video") == "another"
+    assert web_search.extract_youtube_query("play the theme of forrest gump on youtube") == "theme forrest gump"
+    assert web_search.extract_youtube_query("watch videos for beginners") == "beginners"
+
+def test_video_lookup_overlaps_acknowledgement(results_page, use_client, monkeypatch):
+    client = SlowClient(results_page)
+    use_client(client)
+    spoken, opened = [], []
+    monkeypatch.setattr(web_search, "speak", spoken.append)
+    monkeypatch.setattr(web_search, "webbrowser", SimpleNamespace(open=opened.append))
+
+    prefetch = web_search.prefetch_youtube("play chill beats youtube")
+    time.sleep(0.2)  # command enhancement runs meanwhile
+    start = time.perf_counter()
+    assert web_search.play_youtube_video("play chill beats youtube", prefetch)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.1 and len(client.urls) == 1
+    assert spoken == ["Searching for chill beats on YouTube...", "Playing 'Lofi \"beats\" to study' on YouTube"]
+    assert opened == ["https://www.youtube.com/watch?v=abcdefghij1"]
+
+def test_ttl_cache_expires_entries():
+    now = [0.0]
+    cache = TTLCache(ttl=10, max_items=2, clock=lambda: now[0])
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # "b" is least recently used
+    assert "b" not in cache and cache.get("a") == 1
+
+    now[0] = 10.5
+    assert cache.get("a") is None and cache.values() == []